@@ -1,23 +1,57 @@
 import dash
-from dash import dcc, html, Input, Output, State, callback_context, dash_table
+from dash import dcc, html, Input, Output, State, ALL, MATCH, callback_context, dash_table
 import dash_bootstrap_components as dbc
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import plotly.io as pio
 import numpy as np
 from datetime import datetime, timedelta
 import warnings
+import logging
 import os
 import json
 import re
 from dateutil import parser
-import traceback
+import threading
+import time
+
+from utils.sheet_reader import IncrementalSheetReader
+from utils.sheets_api import (DEFAULT_BASE_URL, RequestBudget, SheetsApiClient, SheetsWorksheet,
+                              create_pooled_session)
+from utils.sources import DEFAULT_STORE, fetch_concurrently, parse_store_sources
+from utils.snapshot import DataSnapshot, SnapshotStore, BackgroundRefresher
+from utils.snapshot_cache import source_fingerprint
+from utils.shared_snapshot import SnapshotCoordinator
+from utils.scoring import PPSA_WEIGHTS, calculate_acv, score_components, tebus_acv
+from utils.grouping import grouped_scores
+from utils.cube import cube_totals, rollup_cube
+from utils.render_cache import RenderCache
+from utils.snapshot_index import SnapshotFilter
+from utils.schema import compact_frame, concat_frames, expanded_frame, memory_report
+from utils.paging import apply_filter_query, page_records, sort_frame
+from utils.metrics import METRICS
+from utils.pipeline_log import configure_logging, get_logger, log_event, pipeline_stage
 
 warnings.filterwarnings('ignore')
 
+# Template dipasang sekali sebagai default; meneruskan template='plotly_white'
+# ke setiap figure membuat plotly memvalidasi ulang seluruh template per chart.
+# Validasi pertama memakan ~200ms, jadi dilakukan di thread warm-up setelah
+# import (lihat akhir modul) dan ditunggu oleh render pertama
+plot_template_lock = threading.Lock()
+
+def ensure_plot_template():
+    if pio.templates.default == 'plotly_white':
+        return
+    with plot_template_lock:
+        if pio.templates.default != 'plotly_white':
+            pio.templates.default = 'plotly_white'
+
+# Log ingest terstruktur: satu event JSON per tahap. LOG_LEVEL=DEBUG menampilkan
+# sample data & mapping kolom, LOG_LEVEL=WARNING adalah mode produksi yang senyap
+configure_logging()
+pipeline_log = get_logger('pipeline')
+
 # Inisialisasi Dash App dengan Bootstrap
 app = dash.Dash(
     __name__,
@@ -34,111 +68,207 @@ app.title = "🚀 PPSA Analytics Dashboard"
 
 # --- FUNGSI DATA YANG DIPERBAIKI & DITAMBAHKAN ---
 
-def load_data_from_gsheet():
-    """Load data from Google Sheets dengan error handling yang lebih baik"""
-    try:
-        print("🔄 Memulai proses pengambilan data dari Google Sheets...")
-        
-        # Untuk deployment di Render, gunakan environment variable
-        service_account_json = os.environ.get('GCP_SERVICE_ACCOUNT')
-        SPREADSHEET_ID = os.environ.get('SPREADSHEET_ID')
-        WORKSHEET_NAME = os.environ.get('WORKSHEET_NAME', 'Sheet1')
-        
-        if not service_account_json:
-            print("❌ GCP_SERVICE_ACCOUNT environment variable tidak ditemukan")
-            # Fallback: coba baca dari file local untuk development
-            try:
-                with open('service_account.json', 'r') as f:
-                    service_account_info = json.load(f)
-                print("✅ Load service account dari file local")
-            except:
-                print("❌ Tidak bisa load service account dari manapun")
-                return pd.DataFrame()
-        else:
-            try:
-                service_account_info = json.loads(service_account_json)
-                print("✅ Service account berhasil di-load dari environment variable")
-            except json.JSONDecodeError as e:
-                print(f"❌ Error parsing service account JSON: {e}")
-                return pd.DataFrame()
-        
-        if not SPREADSHEET_ID:
-            print("❌ SPREADSHEET_ID environment variable is not set.")
-            return pd.DataFrame()
-        
-        print(f"📊 Spreadsheet ID: {SPREADSHEET_ID}")
-        print(f"📋 Worksheet Name: {WORKSHEET_NAME}")
-        
-        scopes = ['https://www.googleapis.com/auth/spreadsheets', 
-                 'https://www.googleapis.com/auth/drive']
-        
-        try:
-            creds = Credentials.from_service_account_info(service_account_info, scopes=scopes)
-            client = gspread.authorize(creds)
-            print("✅ Berhasil mengauthorize Google Sheets API")
-        except Exception as e:
-            print(f"❌ Gagal mengauthorize: {str(e)}")
-            return pd.DataFrame()
-        
-        # Open spreadsheet by ID
-        try:
-            spreadsheet = client.open_by_key(SPREADSHEET_ID)
-            print("✅ Berhasil membuka spreadsheet")
-        except gspread.SpreadsheetNotFound:
-            print(f"❌ Spreadsheet dengan ID {SPREADSHEET_ID} tidak ditemukan")
-            return pd.DataFrame()
-        except Exception as e:
-            print(f"❌ Error membuka spreadsheet: {str(e)}")
-            return pd.DataFrame()
-        
-        # Get worksheet by name or first worksheet
+# Toko yang digabung dalam satu dashboard: STORE_SOURCES (JSON) atau satu
+# SPREADSHEET_ID/WORKSHEET_NAME
+STORE_SOURCES = parse_store_sources(
+    os.environ.get('STORE_SOURCES'),
+    os.environ.get('SPREADSHEET_ID'),
+    os.environ.get('WORKSHEET_NAME', 'Sheet1'),
+    os.environ.get('STORE_NAME', DEFAULT_STORE),
+)
+SOURCE_FETCH_WORKERS = int(os.environ.get('SOURCE_FETCH_WORKERS', '4'))
+
+# Sheets API dipanggil langsung lewat values:batchGet; SHEETS_API_URL bisa
+# diarahkan ke fake server lokal (utils/fake_sheets.py) untuk pengujian
+SHEETS_API_URL = os.environ.get('SHEETS_API_URL', DEFAULT_BASE_URL)
+SHEETS_SCOPES = ['https://www.googleapis.com/auth/spreadsheets.readonly']
+SHEETS_MAX_RETRIES = int(os.environ.get('SHEETS_MAX_RETRIES', '5'))
+# Access token (berlaku 1 jam) di-refresh jika sisa masa berlakunya di bawah margin ini
+SHEETS_TOKEN_REFRESH_MARGIN = int(os.environ.get('SHEETS_TOKEN_REFRESH_MARGIN', '300'))
+
+# Budget request per proses, di bawah kuota baca Sheets API (60 request/menit/user)
+# agar refresh beberapa toko tidak memicu 429
+sheets_budget = RequestBudget(
+    requests_per_minute=int(os.environ.get('SHEETS_REQUESTS_PER_MINUTE', '50')),
+    max_wait=float(os.environ.get('SHEETS_BUDGET_MAX_WAIT', '30')),
+)
+
+def load_service_account_info():
+    """Baca service account dari GCP_SERVICE_ACCOUNT atau file lokal, None jika gagal"""
+    # Untuk deployment di Render, gunakan environment variable
+    service_account_json = os.environ.get('GCP_SERVICE_ACCOUNT')
+    if not service_account_json:
+        # Fallback: coba baca dari file local untuk development
         try:
-            if WORKSHEET_NAME:
-                worksheet = spreadsheet.worksheet(WORKSHEET_NAME)
-                print(f"✅ Menggunakan worksheet: {WORKSHEET_NAME}")
-            else:
-                worksheet = spreadsheet.get_worksheet(0)
-                print("✅ Menggunakan worksheet pertama")
-        except gspread.WorksheetNotFound:
-            print(f"❌ Worksheet '{WORKSHEET_NAME}' tidak ditemukan. Mencoba worksheet pertama...")
-            try:
-                worksheet = spreadsheet.get_worksheet(0)
-                print("✅ Berhasil menggunakan worksheet pertama")
-            except Exception as e:
-                print(f"❌ Tidak bisa mengakses worksheet manapun: {str(e)}")
-                return pd.DataFrame()
-        except Exception as e:
-            print(f"❌ Error mengakses worksheet: {str(e)}")
-            return pd.DataFrame()
-        
-        # Get all data
+            with open('service_account.json', 'r') as f:
+                service_account_info = json.load(f)
+            log_event(pipeline_log, 'sheets.credentials', source='service_account.json')
+            return service_account_info
+        except Exception:
+            log_event(pipeline_log, 'sheets.credentials', logging.ERROR,
+                      message="GCP_SERVICE_ACCOUNT tidak diatur dan service_account.json tidak bisa dibaca")
+            return None
+    try:
+        service_account_info = json.loads(service_account_json)
+        log_event(pipeline_log, 'sheets.credentials', source='GCP_SERVICE_ACCOUNT')
+        return service_account_info
+    except json.JSONDecodeError as e:
+        log_event(pipeline_log, 'sheets.credentials', logging.ERROR,
+                  message="Error parsing service account JSON", error_message=str(e))
+        return None
+
+def create_sheets_client():
+    """Buat SheetsApiClient dengan pool koneksi sendiri, kembalikan None jika gagal"""
+    service_account_info = load_service_account_info()
+    session = create_pooled_session(pool_size=max(SOURCE_FETCH_WORKERS, 1) * 2)
+    if service_account_info is None:
+        if SHEETS_API_URL == DEFAULT_BASE_URL:
+            return None
+        # Fake server lokal tidak memerlukan autentikasi
+        log_event(pipeline_log, 'sheets.client', logging.WARNING, base_url=SHEETS_API_URL,
+                  message="Menggunakan Sheets API tanpa autentikasi")
+        creds = None
+    else:
         try:
-            data = worksheet.get_all_values()
-            print(f"✅ Berhasil mengambil data: {len(data)} baris")
+            # Hanya dimuat di proses yang benar-benar mengambil data (leader)
+            from google.oauth2.service_account import Credentials
+            creds = Credentials.from_service_account_info(service_account_info, scopes=SHEETS_SCOPES)
         except Exception as e:
-            print(f"❌ Gagal mengambil data dari worksheet: {str(e)}")
-            return pd.DataFrame()
-        
-        if not data or len(data) <= 1:
-            print("⚠️ Data kosong atau hanya header saja")
-            return pd.DataFrame()
-            
-        # Create DataFrame
-        df = pd.DataFrame(data[1:], columns=data[0])
-        print(f"✅ DataFrame berhasil dibuat: {len(df)} records, {len(df.columns)} columns")
-        print(f"📊 Kolom yang tersedia: {list(df.columns)}")
-        
-        # Show sample data
-        if not df.empty:
-            print("📋 Sample data (5 baris pertama):")
-            print(df.head().to_string())
-            
-        return df
-        
-    except Exception as e:
-        print(f"❌ Gagal mengambil data: {str(e)}")
-        print(f"🔍 Traceback: {traceback.format_exc()}")
+            log_event(pipeline_log, 'sheets.client', logging.ERROR, message="Gagal mengauthorize",
+                      error_message=str(e))
+            return None
+    return SheetsApiClient(session, base_url=SHEETS_API_URL, budget=sheets_budget,
+                           max_retries=SHEETS_MAX_RETRIES, credentials=creds,
+                           token_refresh_margin=SHEETS_TOKEN_REFRESH_MARGIN)
+
+# Satu client per worker: service account cukup diparse sekali, access token
+# dipakai sampai mendekati kedaluwarsa dan koneksi TLS tetap terbuka antar refresh
+sheets_client = None
+sheets_client_lock = threading.Lock()
+sheet_worksheets = {}
+
+def get_sheets_client():
+    """Client Sheets API milik worker ini; dibuat saat pertama kali dibutuhkan"""
+    global sheets_client
+    with sheets_client_lock:
+        if sheets_client is None:
+            sheets_client = create_sheets_client()
+        return sheets_client
+
+def open_worksheet(source):
+    """Siapkan worksheet milik satu toko, kembalikan None jika gagal.
+
+    Tidak ada request di sini: nama worksheet dicek pada request data pertama,
+    sehingga full load hanya perlu satu request values:batchGet. Worksheet
+    disimpan per toko agar nama worksheet yang sudah dicek tidak dicek ulang.
+    """
+    if not source.spreadsheet_id:
+        log_event(pipeline_log, 'sheets.worksheet', logging.ERROR, store=source.store,
+                  message="Spreadsheet untuk toko belum dikonfigurasi")
+        return None
+    
+    worksheet = sheet_worksheets.get(source.store)
+    if worksheet is not None:
+        return worksheet
+    
+    log_event(pipeline_log, 'sheets.worksheet', store=source.store, spreadsheet_id=source.spreadsheet_id,
+              worksheet=source.worksheet_name)
+    client = get_sheets_client()
+    if client is None:
+        return None
+    worksheet = sheet_worksheets[source.store] = SheetsWorksheet(client, source.spreadsheet_id, source.worksheet_name)
+    return worksheet
+
+# Nama kolom di sheet yang dikenali process_data(); alias pertama yang ada yang dipakai
+DATE_COLUMNS = ['TANGGAL', 'TANGGAL INPUT', 'DATE', 'TGL']
+SHIFT_COLUMNS = ['SHIFT', 'SHIF', 'SIFT']
+NAMA_COLUMNS = ['NAMA KASIR', 'KASIR', 'NAMA', 'CASHIER', 'OPERATOR']
+NUMERIC_MAPPINGS = [
+    # PSM columns
+    ('PSM Target', ['PSM TARGET', 'TARGET PSM', 'PSM_TARGET']),
+    ('PSM Actual', ['PSM ACTUAL', 'ACTUAL PSM', 'PSM_ACTUAL']),
+    ('BOBOT PSM', ['BOBOT PSM', 'BOBOT_PSM', 'PSM BOBOT']),
+    
+    # PWP columns  
+    ('PWP Target', ['PWP TARGET', 'TARGET PWP', 'PWP_TARGET']),
+    ('PWP Actual', ['PWP ACTUAL', 'ACTUAL PWP', 'PWP_ACTUAL']),
+    ('BOBOT PWP', ['BOBOT PWP', 'BOBOT_PWP', 'PWP BOBOT']),
+    
+    # SG columns
+    ('SG Target', ['SG TARGET', 'TARGET SG', 'SG_TARGET']),
+    ('SG Actual', ['SG ACTUAL', 'ACTUAL SG', 'SG_ACTUAL']),
+    ('BOBOT SG', ['BOBOT SG', 'BOBOT_SG', 'SG BOBOT']),
+    
+    # APC columns
+    ('APC Target', ['APC TARGET', 'TARGET APC', 'APC_TARGET']),
+    ('APC Actual', ['APC ACTUAL', 'ACTUAL APC', 'APC_ACTUAL']),
+    ('BOBOT APC', ['BOBOT APC', 'BOBOT_APC', 'APC BOBOT']),
+    
+    # Tebus columns
+    ('TARGET TEBUS 2500', ['TARGET TEBUS', 'TEBUS TARGET', 'TARGET_TEBUS']),
+    ('ACTUAL TEBUS 2500', ['ACTUAL TEBUS', 'TEBUS ACTUAL', 'ACTUAL_TEBUS']),
+]
+
+def find_column(columns, aliases):
+    """Alias pertama yang ada di columns, atau None"""
+    for name in aliases:
+        if name in columns:
+            return name
+    return None
+
+def pipeline_source_columns(header):
+    """Kolom sheet yang dibaca process_data(); hanya kolom ini yang diunduh dari Sheets"""
+    alias_groups = [DATE_COLUMNS, SHIFT_COLUMNS, NAMA_COLUMNS] + [aliases for _, aliases in NUMERIC_MAPPINGS]
+    found = (find_column(header, aliases) for aliases in alias_groups)
+    return [name for name in found if name is not None]
+
+# Reader per toko menyimpan jumlah baris & checksum tail untuk fetch incremental berikutnya
+sheet_readers = {
+    source.store: IncrementalSheetReader(
+        tail_rows=int(os.environ.get('INCREMENTAL_TAIL_ROWS', '20')),
+        full_reload_every=int(os.environ.get('FULL_RELOAD_EVERY', '12')),
+        select_columns=pipeline_source_columns,
+    )
+    for source in STORE_SOURCES
+}
+
+def load_data_from_gsheet(source):
+    """Load data from Google Sheets dengan error handling yang lebih baik.
+
+    Error request (SheetsApiError, RequestBudgetExceeded) dicatat oleh event
+    'ingest.load_sheet' lalu diteruskan, sehingga toko tersebut dihitung gagal
+    dan data lamanya tetap dipakai.
+    """
+    worksheet = open_worksheet(source)
+    if worksheet is None:
+        return pd.DataFrame()
+    
+    # Get all data
+    reader = sheet_readers[source.store]
+    with pipeline_stage(pipeline_log, 'ingest.load_sheet', store=source.store, mode='full') as event:
+        df = reader.fetch_full(worksheet)
+        event.update(sheet_rows=reader.row_count, rows=len(df), columns=len(df.columns),
+                     sheet_columns=len(reader.header or []))
+    
+    if df.empty:
+        log_event(pipeline_log, 'ingest.load_sheet', logging.WARNING, store=source.store,
+                  message="Data kosong atau hanya header saja")
         return pd.DataFrame()
+    
+    # Sample data hanya diformat jika level DEBUG aktif
+    if pipeline_log.isEnabledFor(logging.DEBUG):
+        log_event(pipeline_log, 'ingest.sample', logging.DEBUG, store=source.store,
+                  columns=list(df.columns), sample=df.head().to_dict('records'))
+    return df
+
+# Format tanggal yang dicoba berurutan; urutan menentukan hasil untuk tanggal ambigu
+DATE_FORMATS = [
+    '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y',  # DD/MM/YYYY variants
+    '%m/%d/%Y', '%m-%d-%Y', '%m.%d.%Y',  # MM/DD/YYYY variants  
+    '%Y/%m/%d', '%Y-%m-%d', '%Y.%m.%d',  # YYYY/MM/DD variants
+    '%d/%m/%y', '%d-%m-%y', '%d.%m.%y',  # DD/MM/YY variants
+    '%m/%d/%y', '%m-%d-%y', '%m.%d.%y',  # MM/DD/YY variants
+]
 
 def parse_date_flexible(date_str):
     """Fungsi robust untuk parsing berbagai format tanggal"""
@@ -148,34 +278,64 @@ def parse_date_flexible(date_str):
     # Convert to string jika belum
     date_str = str(date_str).strip()
     
-    # Coba berbagai format tanggal
-    formats = [
-        '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y',  # DD/MM/YYYY variants
-        '%m/%d/%Y', '%m-%d-%Y', '%m.%d.%Y',  # MM/DD/YYYY variants  
-        '%Y/%m/%d', '%Y-%m-%d', '%Y.%m.%d',  # YYYY/MM/DD variants
-        '%d/%m/%y', '%d-%m-%y', '%d.%m.%y',  # DD/MM/YY variants
-        '%m/%d/%y', '%m-%d-%y', '%m.%d.%y',  # MM/DD/YY variants
-    ]
-    
     # Coba dengan pandas to_datetime dengan format spesifik
-    for fmt in formats:
+    for fmt in DATE_FORMATS:
         try:
             return pd.to_datetime(date_str, format=fmt, errors='raise')
-        except:
+        except Exception:
             continue
     
     # Coba dengan dateutil parser (lebih fleksibel)
     try:
         return parser.parse(date_str, dayfirst=True)
-    except:
+    except Exception:
         pass
     
     # Coba pandas tanpa format spesifik
     try:
         return pd.to_datetime(date_str, errors='coerce')
-    except:
+    except Exception:
         return pd.NaT
 
+def parse_date_column(series, return_failures=False):
+    """Parsing kolom tanggal secara vectorized, hasilnya sama dengan parse_date_flexible per baris.
+
+    Setiap string unik hanya diparse sekali. Format di DATE_FORMATS dicoba
+    berurutan dengan satu `to_datetime` per format atas nilai yang belum
+    berhasil, jadi kolom dengan satu format dominan selesai dalam satu pass.
+    Sisa nilai yang tidak cocok dengan format manapun diparse per nilai.
+    Dengan `return_failures=True` kembalikan juga jumlah sel tidak kosong
+    yang gagal diparse.
+    """
+    missing = series.isna()
+    codes, uniques = pd.factorize(series.where(~missing, '').astype(str).str.strip())
+    uniques = pd.Index(uniques)
+    parsed = np.full(len(uniques), pd.NaT, dtype=object)
+    
+    pending = uniques != ''
+    for fmt in DATE_FORMATS:
+        if not pending.any():
+            break
+        candidates = uniques[pending]
+        result = pd.to_datetime(candidates, format=fmt, errors='coerce')
+        ok = ~result.isna()
+        if ok.any():
+            positions = np.flatnonzero(pending)[ok]
+            parsed[positions] = result[ok].to_numpy(dtype=object)
+            pending[positions] = False
+    
+    for position in np.flatnonzero(pending):
+        parsed[position] = parse_date_flexible(uniques[position])
+    
+    # Nilai kosong/NaN mendapat code terakhir (NaT)
+    parsed = np.append(parsed, pd.NaT)
+    codes = np.where(missing.to_numpy() | (codes < 0), len(parsed) - 1, codes)
+    dates = pd.Series(pd.to_datetime(parsed[codes]), index=series.index, name=series.name)
+    if not return_failures:
+        return dates
+    failed = np.append((uniques != '') & pd.isna(parsed[:-1]), False)
+    return dates, int(failed[codes].sum())
+
 def clean_numeric_value(value):
     """Bersihkan dan konversi nilai numerik dari berbagai format"""
     if pd.isna(value) or value == '' or value is None:
@@ -198,37 +358,118 @@ def clean_numeric_value(value):
     # Coba konversi ke float
     try:
         return float(cleaned) if cleaned != '' else 0.0
-    except:
+    except Exception:
         return 0.0
 
-def process_data(df):
-    """Process data dengan validasi dan cleaning yang lebih robust"""
+# Set NUMERIC_COMPAT_MODE=1 untuk memakai hasil yang bit-exact dengan clean_numeric_value
+NUMERIC_COMPAT_MODE = os.environ.get('NUMERIC_COMPAT_MODE', '0') == '1'
+
+# Kolom baru dianggap format Indonesia ('1.234,50') jika cukup banyak sel yang mendukungnya;
+# satu sel salah ketik tidak boleh mengubah cara parse seluruh kolom
+DECIMAL_COMMA_MIN_CELLS = 20
+DECIMAL_COMMA_MIN_FRACTION = 0.01
+
+def detect_decimal_separator(cleaned, counts):
+    """Deteksi konvensi desimal satu kolom dari sel yang punya koma dan titik sekaligus.
+
+    `cleaned` berisi nilai unik yang sudah dibersihkan dan `counts` jumlah sel
+    per nilai unik, sehingga suara dihitung per sel. Kembalikan tuple
+    (separator, mask nilai unik berpola '1.234,50'). Separator ',' (format
+    Indonesia) hanya dipilih jika sel berpola itu mayoritas di antara sel
+    dengan koma dan titik, minimal DECIMAL_COMMA_MIN_CELLS sel dan minimal
+    DECIMAL_COMMA_MIN_FRACTION dari sel tidak kosong; selain itu '.' (format
+    '1,234.50', sama dengan aturan clean_numeric_value).
+    """
+    both = (cleaned.str.contains(',', regex=False) & cleaned.str.contains('.', regex=False)).to_numpy()
+    comma_last = both & (cleaned.str.rfind(',') > cleaned.str.rfind('.')).to_numpy()
+    comma_cells = int(counts[comma_last].sum())
+    filled_cells = int(counts[(cleaned != '').to_numpy()].sum())
+    if (comma_cells >= DECIMAL_COMMA_MIN_CELLS
+            and comma_cells >= DECIMAL_COMMA_MIN_FRACTION * filled_cells
+            and comma_cells * 2 > int(counts[both].sum())):
+        return ',', comma_last
+    return '.', comma_last
+
+def clean_numeric_column(series, compat=False, return_failures=False):
+    """Versi vectorized dari clean_numeric_value untuk satu kolom.
+
+    Setiap nilai unik hanya dibersihkan sekali. Dengan `compat=True` setiap nilai
+    unik dilewatkan ke clean_numeric_value sehingga hasilnya bit-exact; mode
+    default memakai operasi string pandas dan konvensi desimal per kolom.
+    Dengan `return_failures=True` kembalikan juga jumlah sel tidak kosong yang
+    gagal diparse dan menjadi 0, ditambah sel berpola '1.234,50' di kolom yang
+    tetap memakai '.' desimal (None pada mode compat).
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    uniques = pd.Series(np.asarray(uniques, dtype=object))
+    failures = None
+    
+    if compat:
+        cleaned_values = uniques.map(clean_numeric_value).to_numpy(dtype='float64')
+    else:
+        cleaned = uniques.astype(str).str.strip().str.replace(r'[^\d.,-]', '', regex=True)
+        has_comma = cleaned.str.contains(',', regex=False)
+        has_dot = cleaned.str.contains('.', regex=False)
+        
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        separator, comma_last = detect_decimal_separator(cleaned, counts)
+        if separator == '.':
+            # Koma + titik: koma adalah pemisah ribuan; hanya koma: koma adalah desimal
+            cleaned = cleaned.where(~(has_comma & has_dot), cleaned.str.replace(',', '', regex=False))
+            cleaned = cleaned.str.replace(',', '.', regex=False)
+        else:
+            # Titik adalah pemisah ribuan jika bersama koma atau berpola 1.234.567
+            thousands = has_dot & (has_comma | cleaned.str.fullmatch(r'-?\d{1,3}(\.\d{3})+'))
+            cleaned = cleaned.where(~thousands, cleaned.str.replace('.', '', regex=False))
+            cleaned = cleaned.str.replace(',', '.', regex=False)
+        
+        numeric = pd.to_numeric(cleaned, errors='coerce')
+        if return_failures:
+            failed = (numeric.isna() & (uniques.astype(str).str.strip() != '')).to_numpy()
+            if separator == '.':
+                # Diparse seperti clean_numeric_value, tapi kemungkinan besar salah format
+                failed = failed | comma_last
+            failures = int(counts[failed].sum())
+        cleaned_values = numeric.fillna(0.0).to_numpy(dtype='float64')
+    
+    # NaN / None mendapat code terakhir (0.0)
+    cleaned_values = np.append(cleaned_values, 0.0)
+    codes = np.where(codes < 0, len(cleaned_values) - 1, codes)
+    cleaned_series = pd.Series(cleaned_values[codes], index=series.index, name=series.name)
+    return (cleaned_series, failures) if return_failures else cleaned_series
+
+@METRICS.timed('ingest')
+def process_data(df, store=DEFAULT_STORE):
+    """Process data dengan validasi dan cleaning yang lebih robust.
+
+    Setiap tahap mencatat satu event JSON (durasi, jumlah baris, kegagalan
+    parsing); mapping kolom dan sample data hanya dicatat pada level DEBUG.
+
+    `df` (frame string mentah dari sheet) dikonsumsi: setiap kolom mentah
+    di-pop begitu hasil standarisasinya jadi, sehingga string mentah sudah
+    dilepas sebelum scoring dan tidak pernah ada salinan kedua.
+    """
     if df.empty:
-        print("⚠️ DataFrame kosong, tidak ada data untuk diproses")
+        log_event(pipeline_log, 'ingest.process_data', logging.WARNING, store=store, rows_in=0,
+                  message="DataFrame kosong, tidak ada data untuk diproses")
         return df
     
-    print(f"🔄 Memproses data: {len(df)} records")
+    started = time.perf_counter()
+    log_event(pipeline_log, 'ingest.process_data.start', logging.DEBUG, store=store, rows_in=len(df))
     
-    # Buat copy untuk menghindari warning
-    df_processed = df.copy()
+    # Hanya kolom hasil standarisasi yang ditulis ke frame baru; df mentah tidak disalin
+    df_processed = pd.DataFrame(index=df.index)
     
     # Process dates dengan fungsi yang lebih robust
-    date_columns = ['TANGGAL', 'TANGGAL INPUT', 'DATE', 'TGL']
-    date_col_found = None
-    
-    for col in date_columns:
-        if col in df_processed.columns:
-            date_col_found = col
-            print(f"📅 Menggunakan kolom tanggal: {col}")
-            break
+    date_col_found = find_column(df.columns, DATE_COLUMNS)
     
     if date_col_found:
-        print(f"🔄 Memproses kolom tanggal: {date_col_found}")
-        df_processed['TANGGAL'] = df_processed[date_col_found].apply(parse_date_flexible)
-        
-        # Cek berapa banyak tanggal yang berhasil di-parse
-        successful_dates = df_processed['TANGGAL'].notna().sum()
-        print(f"✅ Berhasil memparsing {successful_dates}/{len(df_processed)} tanggal")
+        with pipeline_stage(pipeline_log, 'ingest.parse_dates', store=store, column=date_col_found) as event:
+            df_processed['TANGGAL'], event['failures'] = parse_date_column(df.pop(date_col_found),
+                                                                          return_failures=True)
+            # Cek berapa banyak tanggal yang berhasil di-parse
+            successful_dates = int(df_processed['TANGGAL'].notna().sum())
+            event.update(rows=len(df_processed), parsed=successful_dates)
         
         if successful_dates > 0:
             df_processed['HARI'] = df_processed['TANGGAL'].dt.day_name()
@@ -241,23 +482,18 @@ def process_data(df):
             }
             df_processed['HARI'] = df_processed['HARI'].map(hari_map)
         else:
-            print("⚠️ Tidak ada tanggal yang berhasil di-parse")
+            log_event(pipeline_log, 'ingest.parse_dates', logging.WARNING, store=store,
+                      message="Tidak ada tanggal yang berhasil di-parse")
     else:
-        print("⚠️ Tidak menemukan kolom tanggal")
+        log_event(pipeline_log, 'ingest.parse_dates', logging.WARNING, store=store,
+                  message="Tidak menemukan kolom tanggal", candidates=DATE_COLUMNS)
         df_processed['TANGGAL'] = pd.NaT
     
     # Process shift column dengan mapping yang lebih robust
-    shift_columns = ['SHIFT', 'SHIF', 'SIFT']
-    shift_col_found = None
-    
-    for col in shift_columns:
-        if col in df_processed.columns:
-            shift_col_found = col
-            print(f"🔄 Menggunakan kolom shift: {col}")
-            break
+    shift_col_found = find_column(df.columns, SHIFT_COLUMNS)
     
     if shift_col_found:
-        df_processed['SHIFT'] = df_processed[shift_col_found].astype(str).str.strip()
+        df_processed['SHIFT'] = df.pop(shift_col_found).astype(str).str.strip()
         
         # Mapping shift yang lebih komprehensif
         shift_map = {
@@ -268,193 +504,166 @@ def process_data(df):
         
         df_processed['SHIFT'] = df_processed['SHIFT'].map(shift_map)
         df_processed['SHIFT'] = df_processed['SHIFT'].fillna('Unknown')
-        print(f"📊 Distribusi Shift: {df_processed['SHIFT'].value_counts().to_dict()}")
+        if pipeline_log.isEnabledFor(logging.DEBUG):
+            log_event(pipeline_log, 'ingest.shift', logging.DEBUG, store=store, column=shift_col_found,
+                      distribution=df_processed['SHIFT'].value_counts().to_dict())
     
     # Process numeric columns dengan fungsi cleaning
-    numeric_mappings = [
-        # PSM columns
-        ('PSM Target', ['PSM TARGET', 'TARGET PSM', 'PSM_TARGET']),
-        ('PSM Actual', ['PSM ACTUAL', 'ACTUAL PSM', 'PSM_ACTUAL']),
-        ('BOBOT PSM', ['BOBOT PSM', 'BOBOT_PSM', 'PSM BOBOT']),
-        
-        # PWP columns  
-        ('PWP Target', ['PWP TARGET', 'TARGET PWP', 'PWP_TARGET']),
-        ('PWP Actual', ['PWP ACTUAL', 'ACTUAL PWP', 'PWP_ACTUAL']),
-        ('BOBOT PWP', ['BOBOT PWP', 'BOBOT_PWP', 'PWP BOBOT']),
-        
-        # SG columns
-        ('SG Target', ['SG TARGET', 'TARGET SG', 'SG_TARGET']),
-        ('SG Actual', ['SG ACTUAL', 'ACTUAL SG', 'SG_ACTUAL']),
-        ('BOBOT SG', ['BOBOT SG', 'BOBOT_SG', 'SG BOBOT']),
-        
-        # APC columns
-        ('APC Target', ['APC TARGET', 'TARGET APC', 'APC_TARGET']),
-        ('APC Actual', ['APC ACTUAL', 'ACTUAL APC', 'APC_ACTUAL']),
-        ('BOBOT APC', ['BOBOT APC', 'BOBOT_APC', 'APC BOBOT']),
-        
-        # Tebus columns
-        ('TARGET TEBUS 2500', ['TARGET TEBUS', 'TEBUS TARGET', 'TARGET_TEBUS']),
-        ('ACTUAL TEBUS 2500', ['ACTUAL TEBUS', 'TEBUS ACTUAL', 'ACTUAL_TEBUS']),
-    ]
-    
-    print("🔄 Memproses kolom numerik...")
-    for standard_name, possible_names in numeric_mappings:
-        col_found = None
-        for name in possible_names:
-            if name in df_processed.columns:
-                col_found = name
-                break
-        
-        if col_found:
-            print(f"   ✅ {col_found} -> {standard_name}")
-            df_processed[standard_name] = df_processed[col_found].apply(clean_numeric_value)
-        else:
-            print(f"   ⚠️ {standard_name} tidak ditemukan, mengisi dengan 0")
-            df_processed[standard_name] = 0.0
+    with pipeline_stage(pipeline_log, 'ingest.clean_numeric', store=store, rows=len(df_processed)) as event:
+        failures, missing_columns = {}, []
+        for standard_name, possible_names in NUMERIC_MAPPINGS:
+            col_found = find_column(df.columns, possible_names)
+            
+            if col_found:
+                log_event(pipeline_log, 'ingest.column_mapping', logging.DEBUG, source=col_found, target=standard_name)
+                df_processed[standard_name], failed = clean_numeric_column(
+                    df.pop(col_found), compat=NUMERIC_COMPAT_MODE, return_failures=True)
+                if failed:
+                    failures[standard_name] = failed
+            else:
+                missing_columns.append(standard_name)
+                df_processed[standard_name] = 0.0
+        event.update(columns=len(NUMERIC_MAPPINGS) - len(missing_columns), failures=failures,
+                     missing_columns=missing_columns)
+    if missing_columns:
+        log_event(pipeline_log, 'ingest.clean_numeric', logging.WARNING, store=store,
+                  message="Kolom numerik tidak ditemukan, diisi dengan 0", missing_columns=missing_columns)
     
     # Process nama kasir
-    nama_columns = ['NAMA KASIR', 'KASIR', 'NAMA', 'CASHIER', 'OPERATOR']
-    nama_col_found = None
-    
-    for col in nama_columns:
-        if col in df_processed.columns:
-            nama_col_found = col
-            print(f"👤 Menggunakan kolom nama: {col}")
-            break
+    nama_col_found = find_column(df.columns, NAMA_COLUMNS)
     
     if nama_col_found:
-        df_processed['NAMA KASIR'] = df_processed[nama_col_found].astype(str).str.strip()
+        df_processed['NAMA KASIR'] = df.pop(nama_col_found).astype(str).str.strip()
         df_processed['NAMA KASIR'] = df_processed['NAMA KASIR'].replace({'nan': 'Unknown', 'None': 'Unknown'})
-        print(f"📊 Jumlah kasir unik: {df_processed['NAMA KASIR'].nunique()}")
     else:
-        print("⚠️ Tidak menemukan kolom nama kasir")
+        log_event(pipeline_log, 'ingest.cashier', logging.WARNING, store=store,
+                  message="Tidak menemukan kolom nama kasir", candidates=NAMA_COLUMNS)
         df_processed['NAMA KASIR'] = 'Unknown'
     
-    # Calculate ACV (Achievement vs Target)
-    print("🔄 Menghitung ACV dan scores...")
-    def calculate_acv(actual, target):
-        return (actual / target * 100) if target != 0 else 0.0
-
-    # Calculate achievement percentages
-    df_processed['(%) PSM ACV'] = df_processed.apply(
-        lambda row: calculate_acv(row['PSM Actual'], row['PSM Target']), axis=1
-    )
-    df_processed['(%) PWP ACV'] = df_processed.apply(
-        lambda row: calculate_acv(row['PWP Actual'], row['PWP Target']), axis=1
-    )
-    df_processed['(%) SG ACV'] = df_processed.apply(
-        lambda row: calculate_acv(row['SG Actual'], row['SG Target']), axis=1
-    )
-    df_processed['(%) APC ACV'] = df_processed.apply(
-        lambda row: calculate_acv(row['APC Actual'], row['APC Target']), axis=1
-    )
-    df_processed['(%) ACV TEBUS 2500'] = df_processed.apply(
-        lambda row: calculate_acv(row['ACTUAL TEBUS 2500'], row['TARGET TEBUS 2500']), axis=1
-    )
-
-    # Calculate weighted scores
-    df_processed['SCORE PSM'] = (df_processed['(%) PSM ACV'] * df_processed['BOBOT PSM']) / 100
-    df_processed['SCORE PWP'] = (df_processed['(%) PWP ACV'] * df_processed['BOBOT PWP']) / 100
-    df_processed['SCORE SG'] = (df_processed['(%) SG ACV'] * df_processed['BOBOT SG']) / 100
-    df_processed['SCORE APC'] = (df_processed['(%) APC ACV'] * df_processed['BOBOT APC']) / 100
+    # Dimensi toko untuk dashboard multi-toko
+    df_processed['STORE'] = store
+    
+    # Calculate ACV (Achievement vs Target) dan weighted scores dalam satu kernel
+    components = ['PSM', 'PWP', 'SG', 'APC']
+    with pipeline_stage(pipeline_log, 'ingest.scoring', store=store, rows=len(df_processed)):
+        scored = score_components(
+            targets={comp: df_processed[f'{comp} Target'].to_numpy() for comp in components},
+            actuals={comp: df_processed[f'{comp} Actual'].to_numpy() for comp in components},
+            weights={comp: df_processed[f'BOBOT {comp}'].to_numpy() for comp in components},
+        )
+        for comp in components:
+            df_processed[f'(%) {comp} ACV'] = scored['acv'][comp]
+        df_processed['(%) ACV TEBUS 2500'] = calculate_acv(
+            df_processed['ACTUAL TEBUS 2500'].to_numpy(), df_processed['TARGET TEBUS 2500'].to_numpy()
+        )
+        for comp in components:
+            df_processed[f'SCORE {comp}'] = scored['score'][comp]
 
     # Calculate total PPSA score
-    score_cols = ['SCORE PSM', 'SCORE PWP', 'SCORE SG', 'SCORE APC']
-    available_score_cols = [col for col in score_cols if col in df_processed.columns]
-    
-    if available_score_cols:
-        df_processed['TOTAL SCORE PPSA'] = df_processed[available_score_cols].sum(axis=1)
-        print(f"✅ Total score dihitung dari kolom: {available_score_cols}")
-    else:
-        df_processed['TOTAL SCORE PPSA'] = 0.0
-        print("⚠️ Tidak ada kolom score yang tersedia untuk menghitung total")
+    available_score_cols = [f'SCORE {comp}' for comp in components]
+    df_processed['TOTAL SCORE PPSA'] = scored['total']
     
     # Remove rows dengan data yang tidak valid
     initial_count = len(df_processed)
     
-    # Hapus baris dimana semua komponen score adalah 0
+    # Hapus baris dimana semua komponen score adalah 0; tanpa salinan jika semua baris valid
     score_sum = df_processed[available_score_cols].sum(axis=1) if available_score_cols else pd.Series([0] * len(df_processed))
-    df_processed = df_processed[score_sum > 0]
+    valid_rows = score_sum > 0
+    if not valid_rows.all():
+        df_processed = df_processed[valid_rows]
     
     final_count = len(df_processed)
     removed_count = initial_count - final_count
     
-    if removed_count > 0:
-        print(f"🧹 Menghapus {removed_count} baris dengan data tidak valid")
-    
-    print(f"✅ Data processing selesai: {final_count} records valid")
-    return df_processed
+    # Buang kolom mentah sheet, dimensi menjadi categorical, measure diperkecil
+    with pipeline_stage(pipeline_log, 'ingest.compact', store=store, rows=final_count) as event:
+        compacted = compact_frame(df_processed)
+        event['bytes'] = int(compacted.memory_usage(index=False, deep=True).sum())
+    if pipeline_log.isEnabledFor(logging.DEBUG):
+        # memory_report menghitung ukuran string mentah (deep), mahal untuk data besar
+        report = memory_report(df_processed, compacted)
+        log_event(pipeline_log, 'ingest.memory', logging.DEBUG, store=store,
+                  before_bytes=int(report['before_bytes'].sum()), after_bytes=int(report['after_bytes'].sum()))
+    
+    log_event(pipeline_log, 'ingest.process_data', store=store, rows_in=initial_count, rows_out=final_count,
+              dropped_rows=removed_count, cashiers=int(compacted['NAMA KASIR'].nunique()),
+              unknown_shift=int((compacted['SHIFT'] == 'Unknown').sum()) if 'SHIFT' in compacted.columns else None,
+              duration_ms=round((time.perf_counter() - started) * 1000, 1))
+    return compacted
 
-def calculate_overall_ppsa_breakdown(df):
-    """Calculate overall PPSA breakdown"""
+@METRICS.timed('calculate')
+def calculate_overall_ppsa_breakdown(df, cube=None):
+    """Calculate overall PPSA breakdown, dari aggregate cube jika tersedia"""
     if df.empty:
         return {'total': 0.0, 'psm': 0.0, 'pwp': 0.0, 'sg': 0.0, 'apc': 0.0}
     
-    weights = {'PSM': 20, 'PWP': 25, 'SG': 30, 'APC': 25}
-    scores = {'psm': 0.0, 'pwp': 0.0, 'sg': 0.0, 'apc': 0.0}
-    
-    # For PSM, PWP, SG - use SUM aggregation
-    for comp in ['PSM', 'PWP', 'SG']:
-        total_target = df[f'{comp} Target'].sum()
-        total_actual = df[f'{comp} Actual'].sum()
-        if total_target > 0:
-            acv = (total_actual / total_target) * 100
-            scores[comp.lower()] = (acv * weights[comp]) / 100
-    
-    # For APC - use AVERAGE aggregation
-    avg_target_apc = df['APC Target'].mean()
-    avg_actual_apc = df['APC Actual'].mean()
-    if avg_target_apc > 0:
-        acv_apc = (avg_actual_apc / avg_target_apc) * 100
-        scores['apc'] = (acv_apc * weights['APC']) / 100
+    # PSM, PWP, SG memakai SUM; APC memakai AVERAGE (diakumulasi dalam float64)
+    if cube is not None and not cube.empty:
+        totals = cube_totals(cube)
+        targets = {comp: totals[f'{comp} Target'] for comp in ['PSM', 'PWP', 'SG']}
+        actuals = {comp: totals[f'{comp} Actual'] for comp in ['PSM', 'PWP', 'SG']}
+        targets['APC'] = totals['APC Target'] / totals['count']
+        actuals['APC'] = totals['APC Actual'] / totals['count']
+    else:
+        targets = {comp: df[f'{comp} Target'].astype('float64').sum() for comp in ['PSM', 'PWP', 'SG']}
+        actuals = {comp: df[f'{comp} Actual'].astype('float64').sum() for comp in ['PSM', 'PWP', 'SG']}
+        targets['APC'] = df['APC Target'].astype('float64').mean()
+        actuals['APC'] = df['APC Actual'].astype('float64').mean()
     
+    scored = score_components(targets, actuals)
+    scores = {comp.lower(): float(score) for comp, score in scored['score'].items()}
     scores['total'] = sum(scores.values())
     return scores
 
-def calculate_aggregate_scores_per_cashier(df):
+# Grouping yang dipakai tab-tab performa; semuanya dihitung oleh grouped_scores()
+PERFORMANCE_GROUPINGS = {
+    'shift': ['SHIFT'],
+    'daily': ['TANGGAL'],
+    'weekday': ['HARI'],
+    'cashier': ['NAMA KASIR'],
+}
+
+# Kolom hasil grouped_scores() yang ditampilkan per shift / per tanggal
+AGGREGATE_COLUMNS = [
+    'PSM Target_sum', 'PSM Actual_sum', 'PWP Target_sum', 'PWP Actual_sum',
+    'SG Target_sum', 'SG Actual_sum', 'APC Target_mean', 'APC Actual_mean',
+    'ACTUAL TEBUS 2500_sum', 'TARGET TEBUS 2500_sum',
+    'TOTAL SCORE PPSA_mean', 'TOTAL SCORE PPSA_median', 'TOTAL SCORE PPSA_std', 'TOTAL SCORE PPSA_count',
+]
+SCORE_COLUMNS = [
+    'ACV PSM (%)', 'SCORE PSM', 'ACV PWP (%)', 'SCORE PWP',
+    'ACV SG (%)', 'SCORE SG', 'ACV APC (%)', 'SCORE APC', 'TOTAL SCORE PPSA',
+]
+
+def select_grouped(df, grouping, grouped=None):
+    """Ambil hasil grouped_scores() untuk satu grouping, hitung jika belum diberikan"""
+    if grouped is not None:
+        return grouped
+    return grouped_scores(df, {grouping: PERFORMANCE_GROUPINGS[grouping]})[grouping]
+
+@METRICS.timed('calculate')
+def calculate_aggregate_scores_per_cashier(df, grouped=None):
     """Calculate aggregate scores per cashier"""
     if df.empty or 'NAMA KASIR' not in df.columns:
         return pd.DataFrame()
     
-    weights = {'PSM': 20, 'PWP': 25, 'SG': 30, 'APC': 25}
-    
-    agg_cols = {
-        'PSM Target': 'sum', 'PSM Actual': 'sum',
-        'PWP Target': 'sum', 'PWP Actual': 'sum',
-        'SG Target': 'sum', 'SG Actual': 'sum',
-        'APC Target': 'mean', 'APC Actual': 'mean'
-    }
-    
-    valid_agg_cols = {col: func for col, func in agg_cols.items() if col in df.columns}
-    aggregated_df = df.groupby('NAMA KASIR')[list(valid_agg_cols.keys())].agg(valid_agg_cols).reset_index()
-
-    def calculate_score_from_agg(row, comp):
-        total_target = row[f'{comp} Target']
-        total_actual = row[f'{comp} Actual']
-        if total_target == 0:
-            return 0.0
-        acv = (total_actual / total_target) * 100
-        return (acv * weights[comp]) / 100
-
-    for comp in ['PSM', 'PWP', 'SG', 'APC']:
-        if f'{comp} Target' in aggregated_df.columns and f'{comp} Actual' in aggregated_df.columns:
-            aggregated_df[f'SCORE {comp}'] = aggregated_df.apply(
-                lambda row: calculate_score_from_agg(row, comp), axis=1
-            )
-    
-    score_cols = [f'SCORE {comp}' for comp in ['PSM', 'PWP', 'SG', 'APC'] 
-                 if f'SCORE {comp}' in aggregated_df.columns]
-    if score_cols:
-        aggregated_df['TOTAL SCORE PPSA'] = aggregated_df[score_cols].sum(axis=1)
-    
-    if 'TOTAL SCORE PPSA' in df.columns:
-        individual_scores = df.groupby('NAMA KASIR')['TOTAL SCORE PPSA'].agg(['std', 'count']).reset_index()
-        individual_scores.columns = ['NAMA KASIR', 'SCORE_STD', 'RECORD_COUNT']
-        aggregated_df = aggregated_df.merge(individual_scores, on='NAMA KASIR', how='left')
-        aggregated_df['CONSISTENCY'] = aggregated_df['SCORE_STD'].fillna(0)
+    aggregated_df = select_grouped(df, 'cashier', grouped).rename(columns={
+        'PSM Target_sum': 'PSM Target', 'PSM Actual_sum': 'PSM Actual',
+        'PWP Target_sum': 'PWP Target', 'PWP Actual_sum': 'PWP Actual',
+        'SG Target_sum': 'SG Target', 'SG Actual_sum': 'SG Actual',
+        'APC Target_mean': 'APC Target', 'APC Actual_mean': 'APC Actual',
+        'TOTAL SCORE PPSA_std': 'SCORE_STD', 'TOTAL SCORE PPSA_count': 'RECORD_COUNT',
+    })
+    columns = ['NAMA KASIR', 'PSM Target', 'PSM Actual', 'PWP Target', 'PWP Actual',
+               'SG Target', 'SG Actual', 'APC Target', 'APC Actual',
+               'SCORE PSM', 'SCORE PWP', 'SCORE SG', 'SCORE APC', 'TOTAL SCORE PPSA',
+               'SCORE_STD', 'RECORD_COUNT']
+    aggregated_df = aggregated_df[[col for col in columns if col in aggregated_df.columns]]
+    aggregated_df['CONSISTENCY'] = aggregated_df['SCORE_STD'].fillna(0)
     
     return aggregated_df.sort_values(by='TOTAL SCORE PPSA', ascending=False).reset_index(drop=True)
 
+@METRICS.timed('calculate')
 def calculate_team_metrics(df):
     """Calculate team-wide metrics for display"""
     if df.empty:
@@ -490,12 +699,13 @@ def calculate_team_metrics(df):
     
     # Tebus performance
     if 'ACTUAL TEBUS 2500' in df.columns and 'TARGET TEBUS 2500' in df.columns:
-        total_target = df['TARGET TEBUS 2500'].sum()
-        total_actual = df['ACTUAL TEBUS 2500'].sum()
+        total_target = df['TARGET TEBUS 2500'].astype('float64').sum()
+        total_actual = df['ACTUAL TEBUS 2500'].astype('float64').sum()
         metrics['tebus_acv'] = (total_actual / total_target * 100) if total_target > 0 else 0
     
     return metrics
 
+@METRICS.timed('calculate')
 def calculate_performance_insights(df):
     """Generate automated insights dari data"""
     insights = []
@@ -522,7 +732,7 @@ def calculate_performance_insights(df):
     # Component analysis
     components = {'PSM': overall_scores['psm'], 'PWP': overall_scores['pwp'], 
                  'SG': overall_scores['sg'], 'APC': overall_scores['apc']}
-    targets = {'PSM': 20, 'PWP': 25, 'SG': 30, 'APC': 25}
+    targets = PPSA_WEIGHTS
     
     best_component = max(components, key=lambda x: components[x]/targets[x])
     worst_component = min(components, key=lambda x: components[x]/targets[x])
@@ -562,6 +772,7 @@ def calculate_performance_insights(df):
     
     return insights
 
+@METRICS.timed('calculate')
 def calculate_correlation_matrix(df):
     """Calculate correlation matrix untuk komponen PPSA"""
     if df.empty:
@@ -575,6 +786,7 @@ def calculate_correlation_matrix(df):
     
     return df[available_cols].corr()
 
+@METRICS.timed('calculate')
 def detect_outliers(df):
     """Detect outliers dalam performa"""
     if df.empty or 'TOTAL SCORE PPSA' not in df.columns:
@@ -597,53 +809,18 @@ def detect_outliers(df):
     
     return outliers.sort_values('TOTAL SCORE PPSA', ascending=False)
 
-def calculate_shift_performance(df):
+@METRICS.timed('calculate')
+def calculate_shift_performance(df, grouped=None):
     """Calculate performance metrics by shift dengan metode perhitungan yang benar"""
     if df.empty or 'SHIFT' not in df.columns:
         return pd.DataFrame()
     
-    weights = {'PSM': 20, 'PWP': 25, 'SG': 30, 'APC': 25}
-    
-    # Group by shift and calculate raw metrics
-    shift_performance = df.groupby('SHIFT').agg({
-        'PSM Target': 'sum', 'PSM Actual': 'sum',
-        'PWP Target': 'sum', 'PWP Actual': 'sum',
-        'SG Target': 'sum', 'SG Actual': 'sum',
-        'APC Target': 'mean', 'APC Actual': 'mean',
-        'ACTUAL TEBUS 2500': 'sum',
-        'TARGET TEBUS 2500': 'sum',
-        'TOTAL SCORE PPSA': ['mean', 'median', 'std', 'count']
-    }).reset_index()
-    
-    # Flatten column names
-    shift_performance.columns = ['_'.join(col).strip() if col[1] else col[0] for col in shift_performance.columns.values]
-    
-    # Calculate ACV for each component
-    for comp in ['PSM', 'PWP', 'SG']:
-        target_col = f'{comp} Target_sum'
-        actual_col = f'{comp} Actual_sum'
-        if target_col in shift_performance.columns and actual_col in shift_performance.columns:
-            acv_col = f'ACV {comp} (%)'
-            shift_performance[acv_col] = (shift_performance[actual_col] / 
-                                        shift_performance[target_col] * 100).fillna(0)
-            score_col = f'SCORE {comp}'
-            shift_performance[score_col] = (shift_performance[acv_col] * weights[comp]) / 100
-    
-    # For APC - use average
-    if 'APC Target_mean' in shift_performance.columns and 'APC Actual_mean' in shift_performance.columns:
-        shift_performance['ACV APC (%)'] = (shift_performance['APC Actual_mean'] / 
-                                          shift_performance['APC Target_mean'] * 100).fillna(0)
-        shift_performance['SCORE APC'] = (shift_performance['ACV APC (%)'] * weights['APC']) / 100
-    
-    # Calculate total PPSA score correctly
-    score_cols = [f'SCORE {comp}' for comp in ['PSM', 'PWP', 'SG', 'APC'] 
-                 if f'SCORE {comp}' in shift_performance.columns]
-    if score_cols:
-        shift_performance['TOTAL SCORE PPSA'] = shift_performance[score_cols].sum(axis=1)
+    # Agregasi per shift (SUM untuk PSM/PWP/SG/Tebus, AVERAGE untuk APC) + score
+    shift_performance = select_grouped(df, 'shift', grouped)
+    shift_performance = shift_performance[['SHIFT'] + AGGREGATE_COLUMNS + SCORE_COLUMNS].copy()
     
     # Calculate ACV for Tebus
-    shift_performance['ACV TEBUS (%)'] = (shift_performance['ACTUAL TEBUS 2500_sum'] / 
-                                        shift_performance['TARGET TEBUS 2500_sum'] * 100).fillna(0)
+    shift_performance['ACV TEBUS (%)'] = tebus_acv(shift_performance)
     
     # Rename columns for clarity
     shift_performance = shift_performance.rename(columns={
@@ -663,53 +840,18 @@ def calculate_shift_performance(df):
     
     return shift_performance
 
-def calculate_daily_performance(df):
+@METRICS.timed('calculate')
+def calculate_daily_performance(df, grouped=None):
     """Calculate performance metrics by day dengan metode perhitungan yang benar"""
     if df.empty or 'TANGGAL' not in df.columns:
         return pd.DataFrame()
     
-    weights = {'PSM': 20, 'PWP': 25, 'SG': 30, 'APC': 25}
-    
-    # Group by date and calculate raw metrics
-    daily_performance = df.groupby('TANGGAL').agg({
-        'PSM Target': 'sum', 'PSM Actual': 'sum',
-        'PWP Target': 'sum', 'PWP Actual': 'sum',
-        'SG Target': 'sum', 'SG Actual': 'sum',
-        'APC Target': 'mean', 'APC Actual': 'mean',
-        'ACTUAL TEBUS 2500': 'sum',
-        'TARGET TEBUS 2500': 'sum',
-        'TOTAL SCORE PPSA': ['mean', 'median', 'std', 'count']
-    }).reset_index()
-    
-    # Flatten column names
-    daily_performance.columns = ['_'.join(col).strip() if col[1] else col[0] for col in daily_performance.columns.values]
-    
-    # Calculate ACV for each component
-    for comp in ['PSM', 'PWP', 'SG']:
-        target_col = f'{comp} Target_sum'
-        actual_col = f'{comp} Actual_sum'
-        if target_col in daily_performance.columns and actual_col in daily_performance.columns:
-            acv_col = f'ACV {comp} (%)'
-            daily_performance[acv_col] = (daily_performance[actual_col] / 
-                                        daily_performance[target_col] * 100).fillna(0)
-            score_col = f'SCORE {comp}'
-            daily_performance[score_col] = (daily_performance[acv_col] * weights[comp]) / 100
-    
-    # For APC - use average
-    if 'APC Target_mean' in daily_performance.columns and 'APC Actual_mean' in daily_performance.columns:
-        daily_performance['ACV APC (%)'] = (daily_performance['APC Actual_mean'] / 
-                                          daily_performance['APC Target_mean'] * 100).fillna(0)
-        daily_performance['SCORE APC'] = (daily_performance['ACV APC (%)'] * weights['APC']) / 100
-    
-    # Calculate total PPSA score correctly
-    score_cols = [f'SCORE {comp}' for comp in ['PSM', 'PWP', 'SG', 'APC'] 
-                 if f'SCORE {comp}' in daily_performance.columns]
-    if score_cols:
-        daily_performance['TOTAL SCORE PPSA'] = daily_performance[score_cols].sum(axis=1)
+    # Agregasi per tanggal (SUM untuk PSM/PWP/SG/Tebus, AVERAGE untuk APC) + score
+    daily_performance = select_grouped(df, 'daily', grouped)
+    daily_performance = daily_performance[['TANGGAL'] + AGGREGATE_COLUMNS + SCORE_COLUMNS].copy()
     
     # Calculate ACV for Tebus
-    daily_performance['ACV TEBUS (%)'] = (daily_performance['ACTUAL TEBUS 2500_sum'] / 
-                                        daily_performance['TARGET TEBUS 2500_sum'] * 100).fillna(0)
+    daily_performance['ACV TEBUS (%)'] = tebus_acv(daily_performance)
     
     # Add day of week
     daily_performance['Day of Week'] = daily_performance['TANGGAL'].dt.day_name()
@@ -724,7 +866,8 @@ def calculate_daily_performance(df):
     
     return daily_performance.sort_values('TANGGAL')
 
-def calculate_day_of_week_performance(df):
+@METRICS.timed('calculate')
+def calculate_day_of_week_performance(df, grouped=None):
     """Calculate performance metrics by day of week"""
     if df.empty or 'HARI' not in df.columns:
         return pd.DataFrame()
@@ -733,22 +876,15 @@ def calculate_day_of_week_performance(df):
     day_order = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
     
     # Group by day and calculate metrics
-    day_performance = df.groupby('HARI').agg({
-        'TOTAL SCORE PPSA': ['mean', 'median', 'std', 'count'],
-        'SCORE PSM': 'mean',
-        'SCORE PWP': 'mean',
-        'SCORE SG': 'mean',
-        'SCORE APC': 'mean',
-        'ACTUAL TEBUS 2500': 'sum',
-        'TARGET TEBUS 2500': 'sum'
-    }).reset_index()
-    
-    # Flatten column names
-    day_performance.columns = ['_'.join(col).strip() if col[1] else col[0] for col in day_performance.columns.values]
+    day_performance = select_grouped(df, 'weekday', grouped)
+    day_performance = day_performance[[
+        'HARI', 'TOTAL SCORE PPSA_mean', 'TOTAL SCORE PPSA_median', 'TOTAL SCORE PPSA_std',
+        'TOTAL SCORE PPSA_count', 'SCORE PSM_mean', 'SCORE PWP_mean', 'SCORE SG_mean',
+        'SCORE APC_mean', 'ACTUAL TEBUS 2500_sum', 'TARGET TEBUS 2500_sum',
+    ]].copy()
     
     # Calculate ACV for Tebus
-    day_performance['ACV TEBUS (%)'] = (day_performance['ACTUAL TEBUS 2500_sum'] / 
-                                      day_performance['TARGET TEBUS 2500_sum'] * 100).fillna(0)
+    day_performance['ACV TEBUS (%)'] = tebus_acv(day_performance)
     
     # Rename columns for clarity
     day_performance = day_performance.rename(columns={
@@ -769,16 +905,45 @@ def calculate_day_of_week_performance(df):
     
     return day_performance
 
-def calculate_tebus_insights(df):
+@METRICS.timed('calculate')
+def calculate_tebus_summary(df, cube=None):
+    """Target, actual dan ACV Tebus per kasir, diurutkan dari ACV tertinggi"""
+    if df.empty or 'NAMA KASIR' not in df.columns:
+        return pd.DataFrame()
+    
+    if cube is not None and not cube.empty:
+        grouped = rollup_cube(cube, {'cashier': PERFORMANCE_GROUPINGS['cashier']})['cashier']
+        tebus_summary = grouped[['NAMA KASIR', 'TARGET TEBUS 2500_sum', 'ACTUAL TEBUS 2500_sum']].rename(columns={
+            'TARGET TEBUS 2500_sum': 'TARGET TEBUS 2500',
+            'ACTUAL TEBUS 2500_sum': 'ACTUAL TEBUS 2500',
+        })
+    else:
+        tebus_summary = df.groupby('NAMA KASIR').agg({
+            'TARGET TEBUS 2500': 'sum',
+            'ACTUAL TEBUS 2500': 'sum'
+        }).reset_index()
+    
+    tebus_summary['ACV TEBUS (%)'] = tebus_acv(tebus_summary, 'ACTUAL TEBUS 2500', 'TARGET TEBUS 2500')
+    return tebus_summary.sort_values('ACV TEBUS (%)', ascending=False)
+
+@METRICS.timed('calculate')
+def calculate_tebus_insights(df, tebus_summary=None):
     """Generate insights specifically for Tebus performance"""
     insights = []
     
     if df.empty:
         return insights
     
+    if tebus_summary is None:
+        tebus_summary = calculate_tebus_summary(df)
+    
     # Overall Tebus performance
-    total_target = df['TARGET TEBUS 2500'].sum()
-    total_actual = df['ACTUAL TEBUS 2500'].sum()
+    if not tebus_summary.empty:
+        total_target = tebus_summary['TARGET TEBUS 2500'].sum()
+        total_actual = tebus_summary['ACTUAL TEBUS 2500'].sum()
+    else:
+        total_target = df['TARGET TEBUS 2500'].astype('float64').sum()
+        total_actual = df['ACTUAL TEBUS 2500'].astype('float64').sum()
     overall_acv = (total_actual / total_target * 100) if total_target > 0 else 0
     
     if overall_acv >= 100:
@@ -796,51 +961,194 @@ def calculate_tebus_insights(df):
         })
     
     # Top Tebus performers
-    if 'NAMA KASIR' in df.columns:
-        tebus_summary = df.groupby('NAMA KASIR').agg({
-            'TARGET TEBUS 2500': 'sum',
-            'ACTUAL TEBUS 2500': 'sum'
-        }).reset_index()
-        
-        tebus_summary['ACV TEBUS (%)'] = (tebus_summary['ACTUAL TEBUS 2500'] / tebus_summary['TARGET TEBUS 2500'] * 100).fillna(0)
-        tebus_summary = tebus_summary.sort_values('ACV TEBUS (%)', ascending=False)
-        
-        if not tebus_summary.empty:
-            top_performer = tebus_summary.iloc[0]
-            insights.append({
-                'type': 'success',
-                'title': f'🌟 Top Tebus Performer: {top_performer["NAMA KASIR"]}',
-                'text': f"Dengan ACV {top_performer['ACV TEBUS (%)']:.1f}%"
-            })
+    if not tebus_summary.empty:
+        top_performer = tebus_summary.iloc[0]
+        insights.append({
+            'type': 'success',
+            'title': f'🌟 Top Tebus Performer: {top_performer["NAMA KASIR"]}',
+            'text': f"Dengan ACV {top_performer['ACV TEBUS (%)']:.1f}%"
+        })
     
     return insights
 
 # Load data dengan error handling yang lebih baik
-print("🚀 Memulai aplikasi Dash...")
-print("📥 Memuat data dari Google Sheets...")
+log_event(pipeline_log, 'app.start', pid=os.getpid(), stores=len(STORE_SOURCES))
 
-try:
-    raw_df = load_data_from_gsheet()
-    if not raw_df.empty:
-        print(f"✅ Data berhasil di-load: {len(raw_df)} records")
-        processed_df = process_data(raw_df.copy())
-        print(f"✅ Data berhasil diproses: {len(processed_df)} records valid")
+# Snapshot hasil process_data() disimpan di disk agar boot berikutnya tidak
+# perlu menunggu Google Sheets dan agar semua worker gunicorn bisa memakai
+# data yang sama lewat mmap
+SNAPSHOT_CACHE_DIR = os.environ.get('SNAPSHOT_CACHE_DIR', 'snapshot_cache')
+SNAPSHOT_FINGERPRINT = source_fingerprint(
+    *[f"{source.store}|{source.spreadsheet_id}|{source.worksheet_name}" for source in STORE_SOURCES]
+)
+SNAPSHOT_POLL_SECONDS = float(os.environ.get('SNAPSHOT_POLL_SECONDS', '5'))
+REFRESH_INTERVAL_SECONDS = int(os.environ.get('REFRESH_INTERVAL_SECONDS', '300'))
+
+def load_store(source, current_store_df):
+    """Ambil dan proses data satu toko; kembalikan (mode, DataFrame toko).
+
+    Jika reader toko sudah punya state, hanya baris baru yang diambil dan
+    diproses lalu ditambahkan ke data toko di snapshot aktif. Jika worksheet
+    tidak bisa dibuka, data toko yang lama tetap dipakai.
+    """
+    reader = sheet_readers[source.store]
+    if current_store_df.empty or not reader.has_state:
+        fresh_df = load_data_from_gsheet(source)
+        if fresh_df.empty:
+            return 'failed', current_store_df
+        return 'full', process_data(fresh_df, store=source.store)
+    
+    worksheet = open_worksheet(source)
+    if worksheet is None:
+        return 'failed', current_store_df
+    
+    with pipeline_stage(pipeline_log, 'ingest.load_sheet', store=source.store) as event:
+        mode, new_rows = reader.fetch(worksheet)
+        event.update(mode=mode, sheet_rows=reader.row_count, rows=len(new_rows))
+    if mode == 'unchanged':
+        return mode, current_store_df
+    if mode == 'full':
+        return mode, process_data(new_rows, store=source.store) if not new_rows.empty else new_rows
+    
+    appended_df = process_data(new_rows, store=source.store)
+    if appended_df.empty:
+        return 'unchanged', current_store_df
+    return mode, concat_frames([current_store_df, appended_df])
+
+def load_and_process():
+    """Ambil data semua toko secara paralel dan gabungkan untuk snapshot berikutnya.
+
+    Waktu refresh mendekati toko yang paling lambat, bukan jumlah semuanya.
+    Jika tidak ada toko yang berubah, snapshot aktif dikembalikan apa adanya;
+    jika semua toko gagal, RuntimeError dinaikkan.
+    """
+    if not STORE_SOURCES:
+        log_event(pipeline_log, 'ingest.refresh', logging.ERROR,
+                  message="SPREADSHEET_ID atau STORE_SOURCES environment variable is not set")
+        return pd.DataFrame()
+    
+    current_df = snapshot_store.get().processed_df
+    current_by_store = {}
+    if not current_df.empty and 'STORE' in current_df.columns:
+        current_by_store = {store: frame for store, frame in current_df.groupby('STORE', observed=True, sort=False)}
+    
+    results = fetch_concurrently(
+        STORE_SOURCES,
+        lambda source: load_store(source, current_by_store.get(source.store, pd.DataFrame())),
+        max_workers=SOURCE_FETCH_WORKERS,
+    )
+    if sheets_client is not None:
+        log_event(pipeline_log, 'sheets.stats', **sheets_client.stats())
+    if all(result is None or result[0] == 'failed' for result in results.values()):
+        # Refresher mencatat refresh sebagai gagal (last_error) dan snapshot lama tetap dipakai
+        raise RuntimeError(f"Semua toko gagal diambil: {', '.join(results)}")
+    changed = any(result is not None and result[0] in ('full', 'append') for result in results.values())
+    if not changed and not current_df.empty:
+        return current_df
+    
+    frames = [result[1] if result is not None else current_by_store.get(store, pd.DataFrame())
+              for store, result in results.items()]
+    return concat_frames(frames)
+
+def save_snapshot_cache(snapshot):
+    """Publish snapshot aktif beserta state reader incremental ke worker lain"""
+    reader_state = {store: reader.export_state() for store, reader in sheet_readers.items()}
+    if shared_snapshot.publish(snapshot, reader_state=reader_state):
+        log_event(pipeline_log, 'snapshot.publish', version=snapshot.version, cache_dir=SNAPSHOT_CACHE_DIR)
+
+def start_refreshing(cache_meta):
+    """Dipanggil di proses leader: lanjutkan fetch incremental dan mulai refresher.
+
+    Fetch pertama selalu berjalan di thread background sehingga worker sudah
+    bisa melayani request (dan health check) selama data dimuat.
+    """
+    if cache_meta is not None:
+        reader_state = cache_meta.get('reader_state') or {}
+        for store, reader in sheet_readers.items():
+            reader.restore_state(reader_state.get(store))
+    # Status dari leader sebelumnya tidak berlaku lagi sampai refresh pertama proses ini selesai
+    shared_snapshot.publish_status('loading', version=snapshot_store.get().version)
+    if REFRESH_INTERVAL_SECONDS > 0:
+        data_refresher.start(run_immediately=True)
+        log_event(pipeline_log, 'snapshot.refresher', interval_s=REFRESH_INTERVAL_SECONDS)
     else:
-        print("❌ Gagal memuat data")
-        processed_df = pd.DataFrame()
+        threading.Thread(target=data_refresher.refresh_once, name="data-refresher", daemon=True).start()
+
+def publish_refresh_status(refresher):
+    """Publish hasil refresh leader (termasuk error) agar follower tidak menunggu selamanya"""
+    shared_snapshot.publish_status('done', error=refresher.last_error, version=snapshot_store.get().version)
+
+# Snapshot aktif dibaca oleh semua fungsi render; refresher menggantinya secara berkala
+snapshot_store = SnapshotStore()
+data_refresher = BackgroundRefresher(snapshot_store, load_and_process, REFRESH_INTERVAL_SECONDS,
+                                     on_swap=save_snapshot_cache, on_finish=publish_refresh_status)
+shared_snapshot = SnapshotCoordinator(snapshot_store, SNAPSHOT_CACHE_DIR, SNAPSHOT_FINGERPRINT,
+                                      poll_seconds=SNAPSHOT_POLL_SECONDS, on_leader=start_refreshing)
+
+try:
+    cache_meta = shared_snapshot.sync_from_disk()
 except Exception as e:
-    print(f"❌ Error dalam proses loading data: {str(e)}")
-    print(f"🔍 Traceback: {traceback.format_exc()}")
-    raw_df = pd.DataFrame()
-    processed_df = pd.DataFrame()
+    log_event(pipeline_log, 'snapshot.cache', logging.WARNING, exc_info=True, status='error',
+              error_message=str(e))
+    cache_meta = None
+
+warm_start = cache_meta is not None
+if warm_start:
+    log_event(pipeline_log, 'snapshot.warm_start', version=cache_meta.get('version'),
+              rows=cache_meta.get('row_count'))
+
+if shared_snapshot.try_acquire_leadership():
+    log_event(pipeline_log, 'snapshot.leader', pid=os.getpid(), takeover=False)
+    start_refreshing(cache_meta)
+elif not warm_start:
+    log_event(pipeline_log, 'snapshot.waiting', pid=os.getpid())
+
+# Follower memantau snapshot baru dari leader dan siap mengambil alih refresh
+shared_snapshot.start()
+
+def data_loading(snapshot):
+    """True selama snapshot pertama belum tersedia dan fetch awal belum selesai"""
+    if not snapshot.empty or not STORE_SOURCES:
+        return False
+    if shared_snapshot.is_leader:
+        return data_refresher.last_finished_at is None
+    # Follower menunggu snapshot pertama dari leader, kecuali leader melaporkan refresh gagal
+    status = shared_snapshot.read_status()
+    return status is None or status.get('state') != 'done' or status.get('error') is None
+
+def refresh_error():
+    """Error refresh terakhir milik leader (dibaca dari status file di proses follower)"""
+    if shared_snapshot.is_leader:
+        return data_refresher.last_error
+    status = shared_snapshot.read_status()
+    return status.get('error') if status else None
 
 # --- LAYOUT DASHBOARD ---
 
 # Header dengan status data loading
-def create_header():
-    data_status = "✅ Data Loaded" if not processed_df.empty else "❌ No Data Available"
-    data_count = f" ({len(processed_df)} records)" if not processed_df.empty else ""
-    data_columns = f", {len(processed_df.columns)} columns" if not processed_df.empty else ""
+def create_header(snapshot, loading=False):
+    processed_df = snapshot.processed_df
+    if loading:
+        data_status, status_color = "⏳ Memuat data dari Google Sheets...", '#f59e0b'
+    elif not processed_df.empty:
+        data_status = f"✅ Data Loaded ({len(processed_df)} records, {len(processed_df.columns)} columns)"
+        status_color = '#10b981'
+    else:
+        data_status, status_color = "❌ No Data Available", '#ef4444'
+        error = refresh_error()
+        if error:
+            data_status += f" ({error[:120]})"
+    
+    # Nama toko dan sumber data diambil dari konfigurasi, bukan hard-code
+    stores = [source.store for source in STORE_SOURCES]
+    if len(stores) == 1:
+        store_title = stores[0]
+        spreadsheet_label = f"Spreadsheet: {STORE_SOURCES[0].spreadsheet_id[:20]}..."
+        worksheet_label = f"Worksheet: {STORE_SOURCES[0].worksheet_name}"
+    else:
+        store_title = f"{len(stores)} Toko" if stores else "Toko belum dikonfigurasi"
+        spreadsheet_label = f"Spreadsheet: {len({source.spreadsheet_id for source in STORE_SOURCES})} sumber"
+        worksheet_label = ", ".join(stores) if stores else "Worksheet: -"
     
     return dbc.Card(
         dbc.CardBody([
@@ -848,18 +1156,17 @@ def create_header():
                 html.H1("🚀 PPSA Analytics Dashboard", 
                        className="main-title mb-3",
                        style={'color': '#667eea', 'fontWeight': '800', 'fontSize': '3rem'}),
-                html.H3("2GC6 BAROS PANDEGLANG", 
+                html.H3(store_title, 
                        className="store-name mb-2",
                        style={'color': '#764ba2', 'fontWeight': '600'}),
                 html.Div([
-                    html.Span(f"{data_status}{data_count}{data_columns}", 
-                             style={'color': '#10b981' if not processed_df.empty else '#ef4444',
-                                   'fontWeight': '600', 'fontSize': '0.9rem'}),
+                    html.Span(data_status, 
+                             style={'color': status_color, 'fontWeight': '600', 'fontSize': '0.9rem'}),
                     html.Span(" | ", className="mx-2"),
-                    html.Span(f"Spreadsheet: {os.environ.get('SPREADSHEET_ID', 'Not set')[:20]}...", 
+                    html.Span(spreadsheet_label, 
                              style={'color': '#64748b', 'fontSize': '0.9rem'}),
                     html.Span(" | ", className="mx-2"),
-                    html.Span(f"Worksheet: {os.environ.get('WORKSHEET_NAME', 'Sheet1')}", 
+                    html.Span(worksheet_label, 
                              style={'color': '#64748b', 'fontSize': '0.9rem'})
                 ], className="mb-3"),
                 html.P(
@@ -876,45 +1183,94 @@ def create_header():
                'borderRadius': '20px', 'border': '1px solid rgba(255, 255, 255, 0.3)'}
     )
 
-header = create_header()
-
-# KPI Cards
+# KPI Cards; value None berarti data masih dimuat
 def create_kpi_card(title, value, color, icon):
+    if value is None:
+        value_component = dbc.Spinner(size="sm", spinner_style={'color': color})
+    else:
+        value_component = f"{value:.1f}"
     return dbc.Card(
         dbc.CardBody([
             html.Div([
                 html.Span(icon, className="me-2"),
                 html.Span(title, style={'fontSize': '0.9rem', 'fontWeight': '700', 'textTransform': 'uppercase'})
             ], className="d-flex align-items-center mb-2"),
-            html.H3(f"{value:.1f}", style={'color': color, 'fontWeight': '800', 'fontSize': '2.5rem', 'margin': '0'})
+            html.H3(value_component, style={'color': color, 'fontWeight': '800', 'fontSize': '2.5rem', 'margin': '0'})
         ]),
         className="m-2 shadow",
         style={'borderRadius': '12px', 'borderLeft': f'4px solid {color}'}
     )
 
 # Overall PPSA Score Card
-overall_scores = calculate_overall_ppsa_breakdown(processed_df) if not processed_df.empty else {'total': 0.0}
-gap_value = overall_scores['total'] - 100
-gap_color = '#10b981' if gap_value >= 0 else '#ef4444'
-
-total_score_card = dbc.Card(
-    dbc.CardBody([
-        html.Div([
-            html.Span("🏆 TOTAL PPSA SCORE", 
-                     style={'fontSize': '1.1rem', 'fontWeight': '700', 'textTransform': 'uppercase',
-                           'color': 'rgba(255,255,255,0.95)'}),
-        ], className="text-center mb-3"),
-        html.H2(f"{overall_scores['total']:.1f}", 
-               className="text-center",
-               style={'color': '#ffffff', 'fontWeight': '900', 'fontSize': '4rem', 'textShadow': '0 4px 20px rgba(0,0,0,0.3)'}),
-        html.Div([
-            html.Span(f"Gap: {gap_value:+.1f}", 
-                     style={'color': '#90EE90' if gap_value >= 0 else '#FFB6C1', 'fontSize': '1.2rem'})
-        ], className="text-center mt-2")
-    ]),
-    className="m-2 shadow",
-    style={'background': 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
-           'borderRadius': '20px', 'color': 'white', 'textAlign': 'center'}
+def create_total_score_card(total):
+    if total is None:
+        total_component = dbc.Spinner(color="light")
+        gap_component = html.Span("Memuat data...", style={'color': 'rgba(255,255,255,0.8)', 'fontSize': '1.2rem'})
+    else:
+        gap_value = total - 100
+        total_component = f"{total:.1f}"
+        gap_component = html.Span(f"Gap: {gap_value:+.1f}", 
+                                  style={'color': '#90EE90' if gap_value >= 0 else '#FFB6C1', 'fontSize': '1.2rem'})
+    return dbc.Card(
+        dbc.CardBody([
+            html.Div([
+                html.Span("🏆 TOTAL PPSA SCORE", 
+                         style={'fontSize': '1.1rem', 'fontWeight': '700', 'textTransform': 'uppercase',
+                               'color': 'rgba(255,255,255,0.95)'}),
+            ], className="text-center mb-3"),
+            html.H2(total_component, 
+                   className="text-center",
+                   style={'color': '#ffffff', 'fontWeight': '900', 'fontSize': '4rem', 'textShadow': '0 4px 20px rgba(0,0,0,0.3)'}),
+            html.Div([gap_component], className="text-center mt-2")
+        ]),
+        className="m-2 shadow",
+        style={'background': 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
+               'borderRadius': '20px', 'color': 'white', 'textAlign': 'center'}
+    )
+
+def create_kpi_summary(snapshot, loading=False):
+    """Baris KPI per komponen dan kartu total PPSA dari snapshot aktif"""
+    overall_scores = {} if loading else calculate_overall_ppsa_breakdown(snapshot.processed_df, snapshot.cube)
+    return [
+        dbc.Row([
+            dbc.Col(create_kpi_card("PSM Score", overall_scores.get('psm'), '#667eea', '📊'), width=3),
+            dbc.Col(create_kpi_card("PWP Score", overall_scores.get('pwp'), '#764ba2', '🛒'), width=3),
+            dbc.Col(create_kpi_card("SG Score", overall_scores.get('sg'), '#f093fb', '🛡️'), width=3),
+            dbc.Col(create_kpi_card("APC Score", overall_scores.get('apc'), '#4facfe', '⚡'), width=3),
+        ], className="mb-4"),
+        
+        # Total Score Card (Centered)
+        dbc.Row([
+            dbc.Col(create_total_score_card(overall_scores.get('total')), width=8, className="mx-auto")
+        ], className="mb-4"),
+    ]
+
+# Filter yang dipakai semua tab; opsi diisi dari snapshot aktif lewat callback
+filter_bar = dbc.Card(
+    dbc.CardBody(dbc.Row([
+        dbc.Col([
+            html.Label("📅 Rentang Tanggal", className="fw-bold mb-1"),
+            dcc.DatePickerRange(id="filter-date", display_format="DD/MM/YYYY", clearable=True),
+        ], md=3),
+        dbc.Col([
+            html.Label("🏬 Toko", className="fw-bold mb-1"),
+            dcc.Dropdown(id="filter-store", multi=True, placeholder="Semua toko"),
+        ], md=3),
+        dbc.Col([
+            html.Label("🕐 Shift", className="fw-bold mb-1"),
+            dcc.Dropdown(id="filter-shift", multi=True, placeholder="Semua shift"),
+        ], md=3),
+        dbc.Col([
+            html.Label("👤 Kasir", className="fw-bold mb-1"),
+            dcc.Dropdown(id="filter-cashier", multi=True, placeholder="Semua kasir"),
+        ], md=3),
+        dbc.Col([
+            html.Span(id="cross-filter-status", className="me-2"),
+            dbc.Button("✖ Reset cross-filter", id="cross-filter-clear", color="link", size="sm"),
+        ], width=12, className="mt-2"),
+    ])),
+    className="mb-4 shadow-sm",
+    style={'borderRadius': '15px'}
 )
 
 # Tabs
@@ -929,7 +1285,7 @@ tabs = dbc.Tabs([
 ], id="tabs", active_tab="tab-1")
 
 # Content containers
-def create_content_container(children, title=None):
+def create_content_container(title, children):
     if title:
         children = [html.H2(title, className="section-header mb-4", 
                            style={'fontSize': '2rem', 'fontWeight': '800', 'color': '#1e293b', 
@@ -943,74 +1299,243 @@ def create_content_container(children, title=None):
                'borderRadius': '20px', 'border': '1px solid rgba(255, 255, 255, 0.3)'}
     )
 
-# Main Layout
-app.layout = dbc.Container([
-    # Header
-    header,
-    
-    # KPI Row
-    dbc.Row([
-        dbc.Col(create_kpi_card("PSM Score", 
-                               overall_scores.get('psm', 0), 
-                               '#667eea', '📊'), width=3),
-        dbc.Col(create_kpi_card("PWP Score", 
-                               overall_scores.get('pwp', 0), 
-                               '#764ba2', '🛒'), width=3),
-        dbc.Col(create_kpi_card("SG Score", 
-                               overall_scores.get('sg', 0), 
-                               '#f093fb', '🛡️'), width=3),
-        dbc.Col(create_kpi_card("APC Score", 
-                               overall_scores.get('apc', 0), 
-                               '#4facfe', '⚡'), width=3),
-    ], className="mb-4"),
-    
-    # Total Score Card (Centered)
-    dbc.Row([
-        dbc.Col(total_score_card, width=8, className="mx-auto")
-    ], className="mb-4"),
-    
-    # Tabs
-    tabs,
-    
-    # Tab Content
-    html.Div(id="tab-content"),
-    
-    # Footer
-    html.Footer([
-        html.Hr(),
-        html.P([
-            html.Strong("🚀 PPSA Analytics Dashboard v2.0"),
-            " • Powered by Dash & AI • © 2025",
-            html.Br(),
-            html.Small("Advanced Analytics • Real-time Monitoring • Performance Optimization", 
-                      style={'opacity': '0.7'})
-        ], className="text-center text-muted mt-4")
-    ])
-], fluid=True, className="py-4")
+# Interval polling ringkasan snapshot: cepat selama data pertama dimuat, lalu lebih jarang
+LOADING_POLL_MS = 2_000
+SNAPSHOT_SUMMARY_POLL_MS = 30_000
+
+# Main Layout; dibangun per page load sehingga import tidak bergantung pada data.
+# Header dan KPI berisi placeholder "memuat" sampai diisi callback update_summary
+def serve_layout():
+    loading_snapshot = DataSnapshot()
+    return dbc.Container([
+        # Snapshot yang sedang ditampilkan: [versi, masih memuat]
+        dcc.Store(id="snapshot-version"),
+        dcc.Interval(id="snapshot-poll", interval=LOADING_POLL_MS),
+    
+        # Header
+        html.Div(create_header(loading_snapshot, loading=True), id="dashboard-header"),
+    
+        # KPI Row dan Total Score Card
+        html.Div(create_kpi_summary(loading_snapshot, loading=True), id="kpi-summary"),
+    
+        # Filters (cross-filter berisi nilai yang diklik di chart Shift / Tebus)
+        filter_bar,
+        dcc.Store(id="cross-filter", data={}),
+    
+        # Tabs
+        tabs,
+    
+        # Tab Content
+        html.Div(id="tab-content"),
+    
+        # Footer
+        html.Footer([
+            html.Hr(),
+            html.P([
+                html.Strong("🚀 PPSA Analytics Dashboard v2.0"),
+                " • Powered by Dash & AI • © 2025",
+                html.Br(),
+                html.Small("Advanced Analytics • Real-time Monitoring • Performance Optimization", 
+                          style={'opacity': '0.7'})
+            ], className="text-center text-muted mt-4")
+        ])
+    ], fluid=True, className="py-4")
+
+app.layout = serve_layout
 
 # --- CALLBACKS ---
+@app.callback(
+    Output("dashboard-header", "children"),
+    Output("kpi-summary", "children"),
+    Output("snapshot-version", "data"),
+    Output("snapshot-poll", "interval"),
+    Input("snapshot-poll", "n_intervals"),
+    State("snapshot-version", "data"),
+)
+def update_summary(n_intervals, shown):
+    """Isi header dan KPI dari snapshot aktif; hanya dirender ulang jika snapshot berganti"""
+    with METRICS.callback_timer('summary'):
+        snapshot = snapshot_store.get()
+        loading = data_loading(snapshot)
+        interval = LOADING_POLL_MS if loading else SNAPSHOT_SUMMARY_POLL_MS
+        current = [snapshot.version, loading]
+        if shown == current:
+            return dash.no_update, dash.no_update, dash.no_update, interval
+        return create_header(snapshot, loading), create_kpi_summary(snapshot, loading), current, interval
+
 @app.callback(
     Output("tab-content", "children"),
-    Input("tabs", "active_tab")
+    Input("tabs", "active_tab"),
+    Input("filter-date", "start_date"),
+    Input("filter-date", "end_date"),
+    Input("filter-shift", "value"),
+    Input("filter-cashier", "value"),
+    Input("cross-filter", "data"),
+    Input("filter-store", "value"),
+    Input("snapshot-version", "data"),
 )
-def render_tab_content(active_tab):
-    if active_tab == "tab-1":
-        return render_ppsa_analytics()
-    elif active_tab == "tab-2":
-        return render_tebus_analytics()
-    elif active_tab == "tab-3":
-        return render_deep_insights()
-    elif active_tab == "tab-4":
-        return render_performance_alerts()
-    elif active_tab == "tab-5":
-        return render_shift_performance()
-    elif active_tab == "tab-6":
-        return render_daily_performance()
-    elif active_tab == "tab-7":
-        return render_config_debug()
-    return html.Div("Select a tab")
-
-def render_ppsa_analytics():
+def render_tab_content(active_tab, start_date, end_date, shifts, cashiers, cross_filter, stores, shown):
+    renderer = TAB_RENDERERS.get(active_tab)
+    if renderer is None:
+        return html.Div("Select a tab")
+    
+    # Semua tab dirender dari satu snapshot (sudah difilter); hasilnya di-cache
+    # per versi snapshot dan kombinasi filter
+    with METRICS.callback_timer(renderer.__name__):
+        ensure_plot_template()
+        snapshot = snapshot_store.get()
+        if renderer is not render_config_debug and data_loading(snapshot):
+            return create_content_container(None, [
+                dbc.Spinner(color="primary", spinner_class_name="d-block mx-auto my-4"),
+                html.P("⏳ Data sedang dimuat dari Google Sheets, tab akan terisi otomatis.",
+                       className="text-center text-muted"),
+            ])
+        snapshot_filter, selected = resolve_tab_filter(active_tab, start_date, end_date, shifts, cashiers,
+                                                       cross_filter, stores)
+        source = CROSS_FILTER_SOURCES.get(active_tab)
+        cache_key = (active_tab, snapshot.version, snapshot_filter, selected)
+        if source:
+            return render_cache.get_or_render(
+                cache_key, lambda: renderer(snapshot.filtered(snapshot_filter), selected=selected))
+        return render_cache.get_or_render(cache_key, lambda: renderer(snapshot.filtered(snapshot_filter)))
+
+@app.callback(
+    Output({'type': 'paged-table', 'table': MATCH}, "data"),
+    Output({'type': 'paged-table', 'table': MATCH}, "page_count"),
+    Input({'type': 'paged-table', 'table': MATCH}, "page_current"),
+    Input({'type': 'paged-table', 'table': MATCH}, "page_size"),
+    Input({'type': 'paged-table', 'table': MATCH}, "sort_by"),
+    Input({'type': 'paged-table', 'table': MATCH}, "filter_query"),
+    State("tabs", "active_tab"),
+    State("filter-date", "start_date"),
+    State("filter-date", "end_date"),
+    State("filter-shift", "value"),
+    State("filter-cashier", "value"),
+    State("cross-filter", "data"),
+    State("filter-store", "value"),
+    prevent_initial_call=True,
+)
+def page_table(page_current, page_size, sort_by, filter_query,
+               active_tab, start_date, end_date, shifts, cashiers, cross_filter, stores):
+    """Paging, sorting dan filtering DataTable di server; hanya satu halaman yang dikirim"""
+    table_id = dash.ctx.outputs_list[0]['id']['table']
+    with METRICS.callback_timer(f"page_table.{table_id}"):
+        snapshot = snapshot_store.get()
+        snapshot_filter, _ = resolve_tab_filter(active_tab, start_date, end_date, shifts, cashiers,
+                                                cross_filter, stores)
+        frame = table_frame(table_id, snapshot, snapshot_filter, filter_query, sort_by)
+        return page_records(frame, page_current, page_size)
+
+@app.callback(
+    Output("cross-filter", "data"),
+    Input({'type': 'cross-filter-chart', 'column': ALL}, "clickData"),
+    Input("cross-filter-clear", "n_clicks"),
+    State("cross-filter", "data"),
+    prevent_initial_call=True,
+)
+def update_cross_filter(click_data, clear_clicks, cross_filter):
+    """Klik bar memilih nilai tersebut; klik nilai yang sama sekali lagi membatalkannya"""
+    trigger = dash.ctx.triggered_id
+    if trigger == "cross-filter-clear":
+        return {}
+    if not isinstance(trigger, dict) or not dash.ctx.triggered[0]['value']:
+        # Graph baru dipasang saat tab berganti, belum ada klik
+        return dash.no_update
+    
+    column = trigger['column']
+    point = dash.ctx.triggered[0]['value']['points'][0]
+    value = point.get('customdata')
+    cross_filter = dict(cross_filter or {})
+    if cross_filter.get(column) == [value]:
+        cross_filter.pop(column)
+    else:
+        cross_filter[column] = [value]
+    return cross_filter
+
+@app.callback(
+    Output("cross-filter-status", "children"),
+    Input("cross-filter", "data"),
+)
+def show_cross_filter(cross_filter):
+    if not cross_filter:
+        return html.Small("Klik bar di chart Shift, Tebus atau hari untuk cross-filter", className="text-muted")
+    return [dbc.Badge(f"{column}: {', '.join(map(str, values))}", color="primary", className="me-1")
+            for column, values in cross_filter.items()]
+
+@app.callback(
+    Output("filter-date", "min_date_allowed"),
+    Output("filter-date", "max_date_allowed"),
+    Output("filter-shift", "options"),
+    Output("filter-cashier", "options"),
+    Output("filter-store", "options"),
+    Input("tabs", "active_tab"),
+    Input("snapshot-version", "data"),
+)
+def update_filter_options(active_tab, shown):
+    """Isi pilihan filter dari snapshot aktif"""
+    snapshot = snapshot_store.get()
+    if snapshot.empty or snapshot.index is None:
+        return None, None, [], [], []
+    dates = snapshot.index.dates
+    has_dates = dates is not None and len(dates) > 0
+    return (
+        pd.Timestamp(dates[0]).date() if has_dates else None,
+        pd.Timestamp(dates[-1]).date() if has_dates else None,
+        [{'label': shift, 'value': shift} for shift in snapshot.index.values('SHIFT')],
+        [{'label': name, 'value': name} for name in snapshot.index.values('NAMA KASIR')],
+        [{'label': store, 'value': store} for store in snapshot.index.values('STORE')],
+    )
+
+def sheets_client_table():
+    """Counter live Sheets client di worker ini (request, retry, budget, koneksi dipakai ulang)"""
+    if sheets_client is None:
+        return html.P("SHEETS_CLIENT: belum dibuat di worker ini (hanya leader yang mengambil data)",
+                      className="text-muted")
+    stats = sheets_client.stats()
+    budget = stats.pop('budget', {})
+    rows = [{"Metric": name, "Value": value} for name, value in stats.items()]
+    rows += [{"Metric": f"budget.{name}", "Value": value} for name, value in budget.items()]
+    return dash_table.DataTable(
+        data=rows,
+        columns=[{"name": i, "id": i} for i in ("Metric", "Value")],
+        style_cell={'textAlign': 'left', 'padding': '5px', 'fontSize': '12px'},
+        style_header={
+            'backgroundColor': 'rgb(230, 230, 230)',
+            'fontWeight': 'bold'
+        },
+    )
+
+def metrics_summary_table():
+    """Counter Sheets client dan tabel ringkasan histogram METRICS untuk tab Config Debug"""
+    summary = METRICS.summary()
+    if not summary:
+        return [sheets_client_table(), html.P("Belum ada metric yang tercatat", className="text-muted")]
+    return [sheets_client_table(), html.Hr(), dash_table.DataTable(
+        data=summary,
+        columns=[{"name": i, "id": i} for i in summary[0]],
+        sort_action='native',
+        filter_action='native',
+        page_size=15,
+        style_cell={'textAlign': 'left', 'padding': '5px', 'fontSize': '12px'},
+        style_header={
+            'backgroundColor': 'rgb(230, 230, 230)',
+            'fontWeight': 'bold'
+        },
+    )]
+
+@app.callback(
+    Output({'type': 'metrics-summary', 'index': MATCH}, "children"),
+    Input({'type': 'metrics-interval', 'index': MATCH}, "n_intervals"),
+    prevent_initial_call=True,
+)
+def update_metrics_summary(n_intervals):
+    with METRICS.callback_timer('metrics_summary'):
+        return metrics_summary_table()
+
+@METRICS.timed('render')
+def render_ppsa_analytics(snapshot):
+    processed_df, cube = snapshot.processed_df, snapshot.cube
+    
     if processed_df.empty:
         return create_content_container("PPSA Analytics", [
             dbc.Alert([
@@ -1027,11 +1552,12 @@ def render_ppsa_analytics():
             ], color="danger")
         ])
     
-    # Team Performance Metrics
-    cashier_scores = calculate_aggregate_scores_per_cashier(processed_df)
+    # Team Performance Metrics (rollup dari aggregate cube)
+    grouped = rollup_cube(cube, {'cashier': PERFORMANCE_GROUPINGS['cashier']})
+    cashier_scores = calculate_aggregate_scores_per_cashier(processed_df, grouped['cashier'])
     
     # Charts
-    overall_scores = calculate_overall_ppsa_breakdown(processed_df)
+    overall_scores = calculate_overall_ppsa_breakdown(processed_df, cube)
     
     # Component vs Target Chart
     chart_data = pd.DataFrame({
@@ -1058,7 +1584,6 @@ def render_ppsa_analytics():
         line=dict(color='#ef4444', width=3, dash='dash')
     ))
     fig_vs_target.update_layout(
-        template='plotly_white',
         height=350,
         showlegend=True,
         yaxis_title='Score',
@@ -1081,7 +1606,6 @@ def render_ppsa_analytics():
             annotation_text="Target (100)"
         )
         fig_dist.update_layout(
-            template='plotly_white',
             height=350,
             xaxis_title='Total PPSA Score',
             yaxis_title='Frequency',
@@ -1096,7 +1620,7 @@ def render_ppsa_analytics():
         
         # Team Metrics
         html.H3("👥 Team Performance Metrics", className="mt-4 mb-3"),
-        render_team_metrics(),
+        render_team_metrics(processed_df),
         
         # Top Performers
         html.H3("🏅 Top Performers", className="mt-4 mb-3"),
@@ -1107,7 +1631,10 @@ def render_ppsa_analytics():
         render_performance_table(cashier_scores)
     ])
 
-def render_tebus_analytics():
+@METRICS.timed('render')
+def render_tebus_analytics(snapshot, selected=()):
+    processed_df, cube = snapshot.processed_df, snapshot.cube
+    
     if processed_df.empty:
         return create_content_container("Tebus Analytics", [
             dbc.Alert([
@@ -1116,14 +1643,8 @@ def render_tebus_analytics():
             ], color="danger")
         ])
     
-    # Tebus calculations
-    tebus_summary = processed_df.groupby('NAMA KASIR').agg({
-        'TARGET TEBUS 2500': 'sum',
-        'ACTUAL TEBUS 2500': 'sum'
-    }).reset_index()
-    
-    tebus_summary['ACV TEBUS (%)'] = (tebus_summary['ACTUAL TEBUS 2500'] / tebus_summary['TARGET TEBUS 2500'] * 100).fillna(0)
-    tebus_summary = tebus_summary.sort_values('ACV TEBUS (%)', ascending=False)
+    # Tebus calculations (rollup dari aggregate cube)
+    tebus_summary = calculate_tebus_summary(processed_df, cube)
     
     # Tebus Performance Chart
     fig_tebus = go.Figure()
@@ -1135,13 +1656,14 @@ def render_tebus_analytics():
         x=tebus_summary['ACV TEBUS (%)'],
         orientation='h',
         marker_color=colors,
+        marker_opacity=cross_filter_opacity(tebus_summary['NAMA KASIR'], selected),
+        customdata=tebus_summary['NAMA KASIR'],
         text=[f"{acv:.1f}%" for acv in tebus_summary['ACV TEBUS (%)']],
         textposition='outside'
     ))
     
     fig_tebus.add_vline(x=100, line_dash="dash", line_color="red", annotation_text="Target 100%")
     fig_tebus.update_layout(
-        template='plotly_white',
         height=max(400, len(tebus_summary) * 35),
         showlegend=False,
         xaxis_title='Achievement (%)',
@@ -1150,11 +1672,11 @@ def render_tebus_analytics():
     )
     
     # Tebus Insights
-    tebus_insights = calculate_tebus_insights(processed_df)
+    tebus_insights = calculate_tebus_insights(processed_df, tebus_summary)
     
     return create_content_container("Tebus Analytics", [
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=fig_tebus), width=12)
+            dbc.Col(dcc.Graph(id={'type': 'cross-filter-chart', 'column': 'NAMA KASIR'}, figure=fig_tebus), width=12)
         ]),
         
         # Tebus Insights
@@ -1162,7 +1684,10 @@ def render_tebus_analytics():
         render_insights_cards(tebus_insights)
     ])
 
-def render_deep_insights():
+@METRICS.timed('render')
+def render_deep_insights(snapshot):
+    processed_df = snapshot.processed_df
+    
     if processed_df.empty:
         return create_content_container("Deep Insights", [
             dbc.Alert([
@@ -1191,7 +1716,6 @@ def render_deep_insights():
         ))
         
         fig_corr.update_layout(
-            template='plotly_white',
             height=400,
             title="Correlation Matrix - PPSA Components"
         )
@@ -1206,7 +1730,10 @@ def render_deep_insights():
         html.Div("Insufficient data for correlation analysis", className="text-center text-muted")
     ])
 
-def render_performance_alerts():
+@METRICS.timed('render')
+def render_performance_alerts(snapshot):
+    processed_df, cube = snapshot.processed_df, snapshot.cube
+    
     if processed_df.empty:
         return create_content_container("Performance Alerts", [
             dbc.Alert([
@@ -1215,7 +1742,8 @@ def render_performance_alerts():
             ], color="danger")
         ])
     
-    cashier_scores = calculate_aggregate_scores_per_cashier(processed_df)
+    grouped = rollup_cube(cube, {'cashier': PERFORMANCE_GROUPINGS['cashier']})
+    cashier_scores = calculate_aggregate_scores_per_cashier(processed_df, grouped['cashier'])
     alerts = []
     
     # Critical performers
@@ -1230,10 +1758,10 @@ def render_performance_alerts():
         ], color="danger"))
     
     # Component alerts
-    overall_scores = calculate_overall_ppsa_breakdown(processed_df)
+    overall_scores = calculate_overall_ppsa_breakdown(processed_df, cube)
     for comp, score in [('PSM', overall_scores['psm']), ('PWP', overall_scores['pwp']), 
                        ('SG', overall_scores['sg']), ('APC', overall_scores['apc'])]:
-        target = {'PSM': 20, 'PWP': 25, 'SG': 30, 'APC': 25}[comp]
+        target = PPSA_WEIGHTS[comp]
         if score < target * 0.8:
             alerts.append(dbc.Alert([
                 html.H4(f"⚠️ {comp} Component Alert", className="alert-heading"),
@@ -1275,7 +1803,10 @@ def render_performance_alerts():
     
     return create_content_container("Performance Alerts", alerts)
 
-def render_shift_performance():
+@METRICS.timed('render')
+def render_shift_performance(snapshot, selected=()):
+    processed_df, cube = snapshot.processed_df, snapshot.cube
+    
     if processed_df.empty or 'SHIFT' not in processed_df.columns:
         return create_content_container("Shift Performance", [
             dbc.Alert([
@@ -1285,7 +1816,10 @@ def render_shift_performance():
         ])
     
     # Enhanced shift performance calculation
-    shift_performance = calculate_shift_performance(processed_df)
+    # Rollup dari aggregate cube; median tetap dihitung dari data baris
+    grouped = rollup_cube(cube, {'shift': PERFORMANCE_GROUPINGS['shift']},
+                          rows=processed_df, median_groupings=['shift'])
+    shift_performance = calculate_shift_performance(processed_df, grouped['shift'])
     
     if shift_performance.empty:
         return create_content_container("Shift Performance", [
@@ -1298,6 +1832,8 @@ def render_shift_performance():
         y=shift_performance['TOTAL SCORE PPSA'],
         name='Total Score',
         marker_color=['#667eea', '#764ba2', '#f093fb'][:len(shift_performance)],
+        marker_opacity=cross_filter_opacity(shift_performance['SHIFT'], selected),
+        customdata=shift_performance['SHIFT'],
         text=[f"{score:.1f}" for score in shift_performance['TOTAL SCORE PPSA']],
         textposition='outside'
     ))
@@ -1307,13 +1843,13 @@ def render_shift_performance():
         y=shift_performance['Median Score'],
         mode='markers+lines',
         name='Median Score',
+        customdata=shift_performance['SHIFT'],
         marker=dict(size=10, color='#ef4444'),
         line=dict(color='#ef4444', width=2)
     ))
     
     fig_shift.add_hline(y=100, line_dash="dash", line_color="red", annotation_text="Target (100)")
     fig_shift.update_layout(
-        template='plotly_white',
         height=400,
         showlegend=True,
         yaxis_title='Score',
@@ -1337,7 +1873,6 @@ def render_shift_performance():
                 ))
         
         fig_component.update_layout(
-            template='plotly_white',
             height=400,
             barmode='group',
             yaxis_title='Score',
@@ -1347,14 +1882,17 @@ def render_shift_performance():
     
     return create_content_container("Shift Performance", [
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=fig_shift), width=12)
+            dbc.Col(dcc.Graph(id={'type': 'cross-filter-chart', 'column': 'SHIFT'}, figure=fig_shift), width=12)
         ]),
         dbc.Row([
             dbc.Col(dcc.Graph(figure=fig_component), width=12)
         ]) if not component_data.empty else html.Div()
     ])
 
-def render_daily_performance():
+@METRICS.timed('render')
+def render_daily_performance(snapshot, selected=()):
+    processed_df, cube = snapshot.processed_df, snapshot.cube
+    
     if processed_df.empty or 'TANGGAL' not in processed_df.columns:
         return create_content_container("Daily Performance", [
             dbc.Alert([
@@ -1363,7 +1901,10 @@ def render_daily_performance():
             ], color="danger")
         ])
     
-    daily_performance = calculate_daily_performance(processed_df)
+    # Per tanggal dan per hari di-rollup sekaligus dari aggregate cube; median dari baris
+    grouped = rollup_cube(cube, {name: PERFORMANCE_GROUPINGS[name] for name in ['daily', 'weekday']},
+                          rows=processed_df, median_groupings=['daily', 'weekday'])
+    daily_performance = calculate_daily_performance(processed_df, grouped['daily'])
     
     if daily_performance.empty:
         return create_content_container("Daily Performance", [
@@ -1382,7 +1923,6 @@ def render_daily_performance():
     
     fig_daily.add_hline(y=100, line_dash="dash", line_color="red", annotation_text="Target (100)")
     fig_daily.update_layout(
-        template='plotly_white',
         height=400,
         showlegend=True,
         yaxis_title='Score',
@@ -1391,7 +1931,7 @@ def render_daily_performance():
     )
     
     # Day of Week Performance
-    day_performance = calculate_day_of_week_performance(processed_df)
+    day_performance = calculate_day_of_week_performance(processed_df, grouped['weekday'])
     
     fig_day_week = go.Figure()
     if not day_performance.empty:
@@ -1400,13 +1940,14 @@ def render_daily_performance():
             y=day_performance['Avg Score'],
             name='Average Score',
             marker_color=['#667eea', '#764ba2', '#f093fb', '#4facfe', '#00f2fe', '#fa709a', '#fee140'],
+            marker_opacity=cross_filter_opacity(day_performance['Day'], selected),
+            customdata=day_performance['Day'],
             text=[f"{score:.1f}" for score in day_performance['Avg Score']],
             textposition='outside'
         ))
         
         fig_day_week.add_hline(y=100, line_dash="dash", line_color="red", annotation_text="Target (100)")
         fig_day_week.update_layout(
-            template='plotly_white',
             height=400,
             showlegend=False,
             yaxis_title='Score',
@@ -1419,20 +1960,28 @@ def render_daily_performance():
             dbc.Col(dcc.Graph(figure=fig_daily), width=12)
         ]),
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=fig_day_week), width=12)
+            dbc.Col(dcc.Graph(id={'type': 'cross-filter-chart', 'column': 'HARI'}, figure=fig_day_week), width=12)
         ]) if not day_performance.empty else html.Div()
     ])
 
-def render_config_debug():
+@METRICS.timed('render')
+def render_config_debug(snapshot):
     """Debug configuration untuk development"""
+    processed_df = snapshot.processed_df
+    
     config_info = {
         "SPREADSHEET_ID": os.environ.get('SPREADSHEET_ID', 'Not set'),
         "WORKSHEET_NAME": os.environ.get('WORKSHEET_NAME', 'Sheet1 (default)'),
+        "STORES": [f"{source.store} ({source.spreadsheet_id[:12]}.../{source.worksheet_name})" for source in STORE_SOURCES],
+        "SHEETS_API": f"{SHEETS_API_URL} (budget {sheets_budget.capacity} request/menit, retry {SHEETS_MAX_RETRIES}x)",
         "DATA_LOADED": not processed_df.empty,
         "RECORD_COUNT": len(processed_df),
         "COLUMNS": list(processed_df.columns) if not processed_df.empty else []
     }
     
+    # Bytes per kolom: representasi string/float64 dibanding schema compact
+    memory_df = memory_report(expanded_frame(processed_df), processed_df) if not processed_df.empty else pd.DataFrame()
+    
     return create_content_container("🔧 Configuration Debug", [
         html.H4("Environment Variables", className="mb-3"),
         dash_table.DataTable(
@@ -1446,10 +1995,11 @@ def render_config_debug():
         ),
         html.Hr(),
         html.H4("Data Preview", className="mt-4 mb-3"),
-        html.P("5 record pertama:" if not processed_df.empty else "No data available"),
-        dash_table.DataTable(
-            data=processed_df.head().to_dict('records') if not processed_df.empty else [],
-            columns=[{"name": i, "id": i} for i in processed_df.columns] if not processed_df.empty else [],
+        html.P(f"{len(processed_df)} record (urut tanggal):" if not processed_df.empty else "No data available"),
+        create_paged_table(
+            'preview',
+            processed_df,
+            [{"name": i, "id": i} for i in processed_df.columns] if not processed_df.empty else [],
             page_size=5,
             style_cell={
                 'textAlign': 'left',
@@ -1463,12 +2013,42 @@ def render_config_debug():
                 'backgroundColor': 'rgb(230, 230, 230)',
                 'fontWeight': 'bold'
             },
-        )
+        ),
+        html.Hr(),
+        html.H4("Memory Usage", className="mt-4 mb-3"),
+        html.P(
+            f"Total: {memory_df['before_bytes'].sum() / 1e6:.2f} MB (string/float64) -> "
+            f"{memory_df['after_bytes'].sum() / 1e6:.2f} MB (compact)"
+            if not memory_df.empty else "No data available"
+        ),
+        dash_table.DataTable(
+            data=memory_df.to_dict('records'),
+            columns=[{"name": i, "id": i} for i in memory_df.columns],
+            page_size=10,
+            style_cell={'textAlign': 'left', 'padding': '5px', 'fontSize': '12px'},
+            style_header={
+                'backgroundColor': 'rgb(230, 230, 230)',
+                'fontWeight': 'bold'
+            },
+        ),
+        html.Hr(),
+        html.H4("Sheets Client, Latency Pipeline & Callback", className="mt-4 mb-3"),
+        html.P("Counter Sheets client dan p50/p95/p99 per tahap di worker ini, diperbarui setiap 10 detik. "
+               "Histogram lengkap tersedia di /metrics (format Prometheus).", className="text-muted"),
+        # Render tab ini di-cache per snapshot; counter dan ringkasan metric diisi callback terpisah
+        dcc.Interval(id={'type': 'metrics-interval', 'index': 'config'}, interval=10_000),
+        html.Div(metrics_summary_table(), id={'type': 'metrics-summary', 'index': 'config'}),
     ])
 
 # --- FUNGSI RENDER KOMPONEN TAMBAHAN ---
 
-def render_team_metrics():
+def cross_filter_opacity(values, selected):
+    """Redupkan bar yang tidak termasuk pilihan cross-filter"""
+    if not selected:
+        return 1.0
+    return [1.0 if value in selected else 0.35 for value in values]
+
+def render_team_metrics(processed_df):
     """Render team metrics cards"""
     if processed_df.empty:
         return html.Div("No team metrics available", className="text-center text-muted")
@@ -1545,9 +2125,21 @@ def render_top_performers(cashier_scores):
     
     return dbc.Row(cards, className="g-3")
 
-def render_performance_table(cashier_scores):
+# Kolom tabel performa kasir
+PERFORMANCE_TABLE_COLUMNS = [
+    {"name": "Nama Kasir", "id": "NAMA KASIR"},
+    {"name": "Total Score", "id": "TOTAL SCORE PPSA", "type": "numeric", "format": {"specifier": ".1f"}},
+    {"name": "Category", "id": "Performance Category"},
+    {"name": "PSM", "id": "SCORE PSM", "type": "numeric", "format": {"specifier": ".1f"}},
+    {"name": "PWP", "id": "SCORE PWP", "type": "numeric", "format": {"specifier": ".1f"}},
+    {"name": "SG", "id": "SCORE SG", "type": "numeric", "format": {"specifier": ".1f"}},
+    {"name": "APC", "id": "SCORE APC", "type": "numeric", "format": {"specifier": ".1f"}},
+]
+
+def performance_table_frame(cashier_scores):
+    """Kolom tabel performa per kasir, urut dari skor tertinggi"""
     if cashier_scores.empty:
-        return html.Div("No performance data available", className="text-center text-muted")
+        return cashier_scores
     
     # Add performance categories
     display_df = cashier_scores.copy()
@@ -1557,24 +2149,45 @@ def render_performance_table(cashier_scores):
                  "⚠️ Needs Improvement" if x >= 80 else
                  "🚨 Critical"
     )
+    return display_df[[col['id'] for col in PERFORMANCE_TABLE_COLUMNS if col['id'] in display_df.columns]]
+
+def create_paged_table(table_id, frame, columns, page_size=10, **kwargs):
+    """DataTable dengan paging/sorting/filtering di server (lihat callback page_table).
+
+    Hanya halaman pertama yang ikut dirender; halaman lain diambil dari frame
+    yang di-cache di `table_cache`, sehingga ukuran payload tidak bergantung
+    pada jumlah baris.
+    """
+    data, page_count = page_records(frame, 0, page_size)
+    return dash_table.DataTable(
+        id={'type': 'paged-table', 'table': table_id},
+        data=data,
+        columns=columns,
+        page_current=0,
+        page_size=page_size,
+        page_count=page_count,
+        page_action='custom',
+        sort_action='custom',
+        sort_mode='multi',
+        sort_by=[],
+        filter_action='custom',
+        filter_query='',
+        **kwargs
+    )
+
+def render_performance_table(cashier_scores):
+    if cashier_scores.empty:
+        return html.Div("No performance data available", className="text-center text-muted")
     
-    # Create DataTable
-    columns = [
-        {"name": "Nama Kasir", "id": "NAMA KASIR"},
-        {"name": "Total Score", "id": "TOTAL SCORE PPSA", "type": "numeric", "format": {"specifier": ".1f"}},
-        {"name": "Category", "id": "Performance Category"},
-        {"name": "PSM", "id": "SCORE PSM", "type": "numeric", "format": {"specifier": ".1f"}},
-        {"name": "PWP", "id": "SCORE PWP", "type": "numeric", "format": {"specifier": ".1f"}},
-        {"name": "SG", "id": "SCORE SG", "type": "numeric", "format": {"specifier": ".1f"}},
-        {"name": "APC", "id": "SCORE APC", "type": "numeric", "format": {"specifier": ".1f"}},
-    ]
+    display_df = performance_table_frame(cashier_scores)
     
     # Filter available columns
-    available_columns = [col for col in columns if col['id'] in display_df.columns]
+    available_columns = [col for col in PERFORMANCE_TABLE_COLUMNS if col['id'] in display_df.columns]
     
-    return dash_table.DataTable(
-        data=display_df.to_dict('records'),
-        columns=available_columns,
+    return create_paged_table(
+        'performance',
+        display_df,
+        available_columns,
         style_cell={'textAlign': 'left', 'padding': '10px'},
         style_header={
             'backgroundColor': 'rgb(230, 230, 230)',
@@ -1586,7 +2199,6 @@ def render_performance_table(cashier_scores):
                 'backgroundColor': 'rgb(248, 248, 248)'
             }
         ],
-        page_size=10
     )
 
 def render_insights_cards(insights):
@@ -1611,10 +2223,82 @@ def render_insights_cards(insights):
     
     return dbc.Row(insight_cards)
 
+# Tab yang chart-nya menjadi sumber cross-filter, beserta kolom yang difilter
+CROSS_FILTER_SOURCES = {
+    'tab-2': 'NAMA KASIR',
+    'tab-5': 'SHIFT',
+    'tab-6': 'HARI',
+}
+
+def resolve_tab_filter(active_tab, start_date, end_date, shifts, cashiers, cross_filter, stores=None):
+    """Gabungkan filter bar dan cross-filter untuk satu tab.
+
+    Chart sumber cross-filter tetap menampilkan semua nilai dan hanya
+    menandai yang dipilih; tab lain difilter dengan nilai tersebut.
+    Kembalikan (SnapshotFilter, nilai terpilih untuk chart sumber).
+    """
+    cross_filter = cross_filter or {}
+    source = CROSS_FILTER_SOURCES.get(active_tab)
+    selected = tuple(cross_filter.get(source, ())) if source else ()
+    other_filters = {col: values for col, values in cross_filter.items() if col != source}
+    return SnapshotFilter.from_inputs(start_date, end_date, shifts, cashiers, other_filters, stores), selected
+
+TAB_RENDERERS = {
+    "tab-1": render_ppsa_analytics,
+    "tab-2": render_tebus_analytics,
+    "tab-3": render_deep_insights,
+    "tab-4": render_performance_alerts,
+    "tab-5": render_shift_performance,
+    "tab-6": render_daily_performance,
+    "tab-7": render_config_debug,
+}
+
+# Komponen tab yang sudah dirender, dibuang otomatis saat snapshot berganti
+render_cache = RenderCache(max_entries=int(os.environ.get('RENDER_CACHE_SIZE', '32')))
+
+def cashier_table_source(snapshot):
+    grouped = rollup_cube(snapshot.cube, {'cashier': PERFORMANCE_GROUPINGS['cashier']})
+    return performance_table_frame(calculate_aggregate_scores_per_cashier(snapshot.processed_df, grouped['cashier']))
+
+# Sumber data tabel yang dipaging di server: id tabel -> fungsi(snapshot terfilter)
+TABLE_SOURCES = {
+    'performance': cashier_table_source,
+    'preview': lambda snapshot: snapshot.processed_df,
+}
+
+# Frame tabel (sudah difilter dan diurutkan) per versi snapshot, filter dan urutan
+table_cache = RenderCache(max_entries=int(os.environ.get('TABLE_CACHE_SIZE', '16')))
+
+def table_frame(table_id, snapshot, snapshot_filter, filter_query=None, sort_by=None):
+    """Frame lengkap untuk satu tabel; halaman yang diminta cukup di-slice dari sini"""
+    base_key = (table_id, snapshot.version, snapshot_filter, '', ())
+    base = table_cache.get_or_render(
+        base_key, lambda: TABLE_SOURCES[table_id](snapshot.filtered(snapshot_filter)))
+    sort_key = tuple((item['column_id'], item['direction']) for item in sort_by or [])
+    if not filter_query and not sort_key:
+        return base
+    key = (table_id, snapshot.version, snapshot_filter, filter_query or '', sort_key)
+    return table_cache.get_or_render(key, lambda: sort_frame(apply_filter_query(base, filter_query), sort_by))
+
 # --- RUN APP ---
 # Untuk deployment di Render
 server = app.server
 
+# Histogram durasi per tahap & callback di /metrics (format Prometheus), per worker
+METRICS.instrument_dash(server)
+METRICS.register_gauge('snapshot_version', "Versi snapshot aktif di worker ini.",
+                       lambda: snapshot_store.get().version)
+METRICS.register_gauge('snapshot_rows', "Jumlah baris processed_df di snapshot aktif.",
+                       lambda: len(snapshot_store.get().processed_df))
+METRICS.register_gauge('render_cache', "Statistik render cache tab (hits, misses, entries).",
+                       lambda: {k: v for k, v in render_cache.stats().items() if k != 'max_entries'})
+METRICS.register_gauge('sheets_client', "Statistik client Sheets API (request, retry, token refresh, koneksi).",
+                       lambda: {k: v for k, v in sheets_client.stats().items() if k != 'budget'}
+                       if sheets_client is not None else {})
+
+# Template plotly disiapkan di background agar tidak menahan startup worker
+threading.Thread(target=ensure_plot_template, name="plot-template-warmup", daemon=True).start()
+
 if __name__ == '__main__':
     print("🌐 Menjalankan server Dash...")
     app.run_server(debug=False, host='0.0.0.0', port=8050)
@@ -0,0 +1,120 @@
+"""Ukur waktu import app.py (cold start worker) dan cek budget-nya.
+
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --budget-ms 1200 --top 15 --output importtime.json
+
+`import app` dijalankan di subprocess baru dengan `-X importtime`, beberapa
+kali; run tercepat dipakai. Exit code 1 jika waktu import melebihi
+`--budget-ms` atau jika modul yang seharusnya dimuat lazy (hanya dibutuhkan
+saat refresh data) ikut ter-import saat startup.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modul yang hanya dibutuhkan proses leader saat mengambil data dari Google Sheets
+LAZY_MODULES = (
+    'google.oauth2.service_account',
+    'google.auth.transport.requests',
+    'gspread',
+    'plotly.subplots',
+    # Tidak dipakai sama sekali; go.Figure cukup untuk semua chart
+    'plotly.express',
+)
+
+CHILD_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+print(json.dumps({'elapsed_s': elapsed, 'loaded': [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def package_self_times(stderr):
+    """Jumlahkan self time `-X importtime` per package teratas, dalam milidetik.
+
+    Angka cumulative dan indentasi tidak dipakai: app.py menjalankan thread
+    background saat import, dan importtime menghitung nesting secara global
+    sehingga modul yang di-import thread lain bisa tercatat dengan self time
+    negatif (dibulatkan ke 0). Angka per package adalah perkiraan; waktu total
+    `import app` diukur terpisah dengan perf_counter.
+    """
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0.0) + max(int(self_us), 0) / 1000
+    return packages
+
+
+def measure_once():
+    """Import app.py di subprocess tanpa sumber data; kembalikan (hasil child, self time per package)"""
+    env = dict(os.environ)
+    for name in ('STORE_SOURCES', 'SPREADSHEET_ID', 'GCP_SERVICE_ACCOUNT'):
+        env.pop(name, None)
+    env.update(REFRESH_INTERVAL_SECONDS='0', LOG_LEVEL='CRITICAL',
+               SNAPSHOT_CACHE_DIR=tempfile.mkdtemp(prefix='ppsa-importtime-'))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD_SCRIPT],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import app gagal:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    packages = package_self_times(proc.stderr)
+    # Self time app.py ikut tercampur dengan thread background; sisa waktu import lebih jujur
+    packages.pop('app', None)
+    packages['app'] = max(result['elapsed_s'] * 1000 - sum(packages.values()), 0.0)
+    return result, packages
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    arg_parser.add_argument('--budget-ms', type=float, default=1500,
+                            help='batas waktu `import app` (run tercepat) dalam milidetik')
+    arg_parser.add_argument('--top', type=int, default=10, help='jumlah package terberat yang dilaporkan')
+    arg_parser.add_argument('--output', help='tulis laporan JSON ke file ini')
+    args = arg_parser.parse_args(argv)
+
+    # Run pertama juga menulis .pyc sehingga run berikutnya mewakili cold start di server
+    runs = [measure_once() for _ in range(max(args.repeat, 1))]
+    result, packages = min(runs, key=lambda run: run[0]['elapsed_s'])
+    elapsed_ms = result['elapsed_s'] * 1000
+
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    print(f"⏱️ import app: {elapsed_ms:.0f} ms (terbaik dari {len(runs)} run, budget {args.budget_ms:.0f} ms)",
+          file=sys.stderr)
+    for package, self_ms in heaviest:
+        print(f"  {package:<40} {self_ms:10.1f} ms", file=sys.stderr)
+
+    report = {
+        'elapsed_ms': round(elapsed_ms, 1),
+        'budget_ms': args.budget_ms,
+        'runs_ms': [round(run[0]['elapsed_s'] * 1000, 1) for run in runs],
+        'eager_lazy_modules': result['loaded'],
+        'packages_ms': {package: round(self_ms, 1) for package, self_ms in heaviest},
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+
+    failed = False
+    if elapsed_ms > args.budget_ms:
+        print(f"❌ import app {elapsed_ms:.0f} ms melebihi budget {args.budget_ms:.0f} ms", file=sys.stderr)
+        failed = True
+    for name in result['loaded']:
+        print(f"❌ {name} ter-import saat startup; modul ini harus di-import lazy", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
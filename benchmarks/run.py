@@ -0,0 +1,272 @@
+"""Benchmark pipeline ingest, kalkulasi dan render dashboard dengan data sintetis.
+
+    python -m benchmarks.run --rows 1000 100000 1000000 --output bench.json
+    python -m benchmarks.run --rows 100000 --compare bench.json
+
+Hasil ditulis sebagai JSON (satu entry per tahap per ukuran data) sehingga
+dua run bisa dibandingkan; dengan `--compare` tahap yang median-nya (atau
+peak RSS-nya) lebih besar dari `--threshold` x baseline dilaporkan dan exit
+code menjadi 1.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Fungsi per nilai terlalu lambat untuk 1M baris; diukur pada sampel sebesar ini
+PER_VALUE_SAMPLE = 20_000
+
+
+def load_app():
+    """Import app.py tanpa sumber data sehingga startup tidak menghubungi Google Sheets"""
+    for name in ('STORE_SOURCES', 'SPREADSHEET_ID', 'GCP_SERVICE_ACCOUNT'):
+        os.environ.pop(name, None)
+    os.environ['REFRESH_INTERVAL_SECONDS'] = '0'
+    # Handler log menulis ke stdout asli; event per tahap tidak ikut dibuang redirect_stdout
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ['SNAPSHOT_CACHE_DIR'] = tempfile.mkdtemp(prefix='ppsa-bench-')
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+    app.ensure_plot_template()
+    return app
+
+
+def time_call(fn, repeat):
+    """Jalankan fn `repeat` kali (output print dibuang) dan kembalikan durasi tiap run"""
+    durations = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            fn()
+            durations.append(time.perf_counter() - started)
+    return durations
+
+
+def read_status_kb(field):
+    """Nilai field /proc/self/status dalam kB (Linux), None jika tidak tersedia"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """Reset peak RSS (VmHWM) proses ini; False jika OS tidak mendukung (selain Linux)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    peak_kb = read_status_kb('VmHWM')
+    if peak_kb is None:
+        # ru_maxrss adalah peak seumur proses: kB di Linux, byte di macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_kb = peak / 1024 if sys.platform == 'darwin' else peak
+    return peak_kb / 1024
+
+
+def measure_peak_rss(fn):
+    """Jalankan fn sekali; kembalikan (hasil, durasi, dict memori dalam MB).
+
+    `peak_delta_mb` adalah kenaikan peak RSS di atas RSS sebelum fn dijalankan.
+    Tanpa reset VmHWM peak yang dilaporkan adalah peak seumur proses.
+    """
+    gc.collect()
+    rss_before = (read_status_kb('VmRSS') or 0) / 1024
+    per_stage = reset_peak_rss()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    duration = time.perf_counter() - started
+    peak = peak_rss_mb()
+    memory = {
+        'rss_before_mb': round(rss_before, 1),
+        'peak_rss_mb': round(peak, 1),
+        'peak_delta_mb': round(max(peak - rss_before, 0.0), 1),
+        'peak_per_stage': per_stage,
+    }
+    return result, duration, memory
+
+
+def stage_result(name, rows, durations, **extra):
+    result = {
+        'name': name,
+        'rows': rows,
+        'repeat': len(durations),
+        'min_s': round(min(durations), 6),
+        'median_s': round(statistics.median(durations), 6),
+        'max_s': round(max(durations), 6),
+    }
+    result.update(extra)
+    return result
+
+
+def benchmark_size(app, rows, repeat, seed=0):
+    """Ukur semua tahap untuk satu ukuran data; kembalikan list hasil per tahap"""
+    import plotly
+    from benchmarks.synthetic import generate_sheet, sheet_values
+    from utils.fake_sheets import FakeWorksheet
+    from utils.sheet_reader import IncrementalSheetReader
+    from utils.snapshot import SnapshotStore
+
+    results = []
+
+    def measure(name, fn, n=rows, **extra):
+        results.append(stage_result(name, n, time_call(fn, repeat), **extra))
+        print(f"  {name:<48} {results[-1]['median_s'] * 1000:10.1f} ms")
+
+    started = time.perf_counter()
+    raw_df = generate_sheet(rows, seed=seed)
+    print(f"📦 {rows} baris sintetis dibuat dalam {time.perf_counter() - started:.1f}s")
+
+    # Memori jalur ingest lengkap: baris hasil decode respons -> DataFrame -> process_data.
+    # Diukur paling awal, sebelum tahap lain menambah objek di heap
+    worksheet = FakeWorksheet(sheet_values(raw_df))
+    reader = IncrementalSheetReader(select_columns=app.pipeline_source_columns)
+    processed, duration, memory = measure_peak_rss(lambda: app.process_data(reader.fetch_full(worksheet)))
+    results.append(stage_result('memory.ingest', rows, [duration], **memory))
+    print(f"  {'memory.ingest':<48} {memory['peak_delta_mb']:10.1f} MB peak "
+          f"(hasil {processed.memory_usage(index=True, deep=True).sum() / 2 ** 20:.1f} MB)")
+    del worksheet, reader, processed
+
+    # Ingest: versi per nilai (pada sampel) dibanding versi vectorized (seluruh kolom)
+    sample = raw_df.head(PER_VALUE_SAMPLE)
+    sample_rows = len(sample)
+    measure('ingest.parse_date_flexible', lambda: sample['TANGGAL'].map(app.parse_date_flexible),
+            n=sample_rows, sampled=True)
+    measure('ingest.clean_numeric_value', lambda: sample['PSM ACTUAL'].map(app.clean_numeric_value),
+            n=sample_rows, sampled=True)
+    measure('ingest.parse_date_column', lambda: app.parse_date_column(raw_df['TANGGAL']))
+    measure('ingest.clean_numeric_column', lambda: app.clean_numeric_column(raw_df['PSM ACTUAL']))
+    # process_data mengonsumsi kolom mentah frame input, jadi setiap run diberi salinan
+    measure('process_data', lambda: app.process_data(raw_df.copy()))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        processed_df = app.process_data(raw_df.copy())
+    del raw_df
+    store = SnapshotStore()
+    measure('snapshot.swap', lambda: store.swap(processed_df))
+    snapshot = store.get()
+    df = snapshot.processed_df
+
+    calculations = {
+        'calculate_overall_ppsa_breakdown': lambda: app.calculate_overall_ppsa_breakdown(df),
+        'calculate_overall_ppsa_breakdown[cube]': lambda: app.calculate_overall_ppsa_breakdown(df, snapshot.cube),
+        'calculate_aggregate_scores_per_cashier': lambda: app.calculate_aggregate_scores_per_cashier(df),
+        'calculate_team_metrics': lambda: app.calculate_team_metrics(df),
+        'calculate_performance_insights': lambda: app.calculate_performance_insights(df),
+        'calculate_correlation_matrix': lambda: app.calculate_correlation_matrix(df),
+        'calculate_shift_performance': lambda: app.calculate_shift_performance(df),
+        'calculate_daily_performance': lambda: app.calculate_daily_performance(df),
+        'calculate_day_of_week_performance': lambda: app.calculate_day_of_week_performance(df),
+        'calculate_tebus_summary': lambda: app.calculate_tebus_summary(df),
+        'calculate_tebus_insights': lambda: app.calculate_tebus_insights(df),
+        'detect_outliers': lambda: app.detect_outliers(df),
+    }
+    for name, fn in calculations.items():
+        measure(f'calculate.{name}', fn)
+
+    # Render tanpa render cache, lalu serialisasi JSON seperti response callback Dash
+    for tab_id, renderer in app.TAB_RENDERERS.items():
+        measure(f'render.{renderer.__name__}', lambda: renderer(snapshot), tab=tab_id)
+        with contextlib.redirect_stdout(io.StringIO()):
+            component = renderer(snapshot)
+        measure(f'serialize.{renderer.__name__}',
+                lambda: json.dumps(component, cls=plotly.utils.PlotlyJSONEncoder), tab=tab_id)
+    return results
+
+
+def environment():
+    import numpy
+    import pandas
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Tahap yang median atau peak RSS-nya lebih dari threshold x baseline (cocokkan nama dan jumlah baris)"""
+    previous = {(item['name'], item['rows']): item for item in baseline.get('results', [])}
+    regressions = []
+    for item in results:
+        before = previous.get((item['name'], item['rows']))
+        if before is None:
+            continue
+        for metric in ('median_s', 'peak_delta_mb'):
+            if not before.get(metric) or metric not in item:
+                continue
+            ratio = item[metric] / before[metric]
+            if ratio > threshold:
+                regressions.append({'name': item['name'], 'rows': item['rows'], 'metric': metric,
+                                    'ratio': round(ratio, 2), 'baseline': before[metric], 'value': item[metric]})
+    return regressions
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--output', help='tulis hasil JSON ke file ini (default: stdout)')
+    arg_parser.add_argument('--compare', help='file JSON hasil run sebelumnya sebagai baseline')
+    arg_parser.add_argument('--threshold', type=float, default=1.25,
+                            help='rasio median terhadap baseline yang dianggap regresi')
+    args = arg_parser.parse_args(argv)
+
+    app = load_app()
+    results = []
+    for rows in args.rows:
+        print(f"⏱️ Benchmark {rows} baris (repeat={args.repeat})", file=sys.stderr)
+        with contextlib.redirect_stdout(sys.stderr):
+            results.extend(benchmark_size(app, rows, args.repeat, args.seed))
+
+    report = {'environment': environment(), 'results': results}
+    if args.compare:
+        with open(args.compare) as f:
+            report['regressions'] = compare(results, json.load(f), args.threshold)
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(payload + '\n')
+        print(f"💾 Hasil benchmark ditulis ke {args.output}", file=sys.stderr)
+    else:
+        print(payload)
+
+    for item in report.get('regressions', []):
+        print(f"❌ Regresi {item['metric']} {item['name']} @ {item['rows']} baris: {item['ratio']}x baseline",
+              file=sys.stderr)
+    return 1 if report.get('regressions') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
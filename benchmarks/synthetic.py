@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+# Kolom numerik sheet asli (nama sebelum distandarisasi process_data)
+NUMERIC_SHEET_COLUMNS = [
+    'PSM TARGET', 'PSM ACTUAL', 'BOBOT PSM',
+    'PWP TARGET', 'PWP ACTUAL', 'BOBOT PWP',
+    'SG TARGET', 'SG ACTUAL', 'BOBOT SG',
+    'APC TARGET', 'APC ACTUAL', 'BOBOT APC',
+    'TARGET TEBUS', 'ACTUAL TEBUS',
+]
+
+# Penulisan shift yang ditemui di sheet; sebagian kecil tidak dikenali
+SHIFT_SPELLINGS = ['1', '2', '3', 'Pagi', 'Siang', 'Malam', 'Shift 1', 'Shift 2', 'P', 'S', 'M', 'shift3']
+SHIFT_WEIGHTS = [0.22, 0.2, 0.16, 0.1, 0.08, 0.08, 0.05, 0.04, 0.02, 0.02, 0.02, 0.01]
+
+# Format tanggal beserta porsinya; '' adalah sel tanggal kosong
+DATE_STYLES = [('%d/%m/%Y', 0.85), ('%Y-%m-%d', 0.06), ('%d-%m-%y', 0.04), ('%d.%m.%Y', 0.03), ('', 0.02)]
+
+# Rentang nilai per komponen: (target min, target max, actual min, actual max)
+VALUE_RANGES = {
+    'PSM': (50_000, 2_000_000, 0, 2_500_000),
+    'PWP': (20, 400, 0, 500),
+    'SG': (10, 200, 0, 260),
+    'APC': (40_000, 120_000, 20_000, 150_000),
+    'TEBUS': (1, 30, 0, 35),
+}
+
+
+def _number_pool(rng, low, high, size=4000):
+    """String angka dengan format campuran seperti input manual di sheet"""
+    values = rng.integers(low, high + 1, size)
+    styles = rng.choice(5, size, p=[0.55, 0.2, 0.1, 0.1, 0.05])
+    pool = np.empty(size, dtype=object)
+    for i, (value, style) in enumerate(zip(values, styles)):
+        if style == 0:
+            pool[i] = str(value)
+        elif style == 1:
+            pool[i] = f'{value:,}'                          # 1,234,567
+        elif style == 2:
+            pool[i] = 'Rp ' + f'{value:,}'.replace(',', '.')  # Rp 1.234.567
+        elif style == 3:
+            pool[i] = f' {value} '
+        else:
+            pool[i] = ''
+    return pool
+
+
+def _date_pool(rng, start, days):
+    dates = pd.date_range(start, periods=days)
+    formats = [fmt for fmt, _ in DATE_STYLES]
+    weights = [weight for _, weight in DATE_STYLES]
+    # Satu pool per format; baris memilih format lalu tanggal
+    pools = [dates.strftime(fmt).to_numpy(dtype=object) if fmt else np.full(days, '', dtype=object)
+             for fmt in formats]
+    return np.stack(pools), weights
+
+
+def generate_sheet(rows, cashiers=40, days=180, shifts=3, extra_columns=12, start='2024-01-01', seed=0):
+    """DataFrame string seperti hasil get_all_values() pada sheet PPSA.
+
+    Baris diurutkan per tanggal seperti input harian. Tanggal, shift dan angka
+    memakai format campuran (lihat DATE_STYLES, SHIFT_SPELLINGS dan
+    `_number_pool`), dan `extra_columns` kolom teks yang tidak dipakai
+    pipeline meniru lebar sheet asli. Sel diambil dari pool string sehingga
+    1M baris tetap muat di memori.
+    """
+    rng = np.random.default_rng(seed)
+    day_offsets = np.sort(rng.integers(0, days, rows))
+
+    date_pools, date_weights = _date_pool(rng, start, days)
+    date_styles = rng.choice(len(date_weights), rows, p=date_weights)
+    columns = {'TANGGAL': date_pools[date_styles, day_offsets]}
+
+    spellings = [s for s in SHIFT_SPELLINGS if not s[-1].isdigit() or int(s[-1]) <= shifts]
+    weights = np.array([w for s, w in zip(SHIFT_SPELLINGS, SHIFT_WEIGHTS) if s in spellings])
+    columns['SHIFT'] = np.asarray(spellings, dtype=object)[rng.choice(len(spellings), rows, p=weights / weights.sum())]
+
+    names = np.array([f'KASIR {i + 1:03d}' for i in range(cashiers)] + [' kasir 001 '], dtype=object)
+    columns['NAMA KASIR'] = names[rng.choice(len(names), rows, p=[0.99 / cashiers] * cashiers + [0.01])]
+
+    for comp, (target_low, target_high, actual_low, actual_high) in VALUE_RANGES.items():
+        if comp == 'TEBUS':
+            target_col, actual_col = 'TARGET TEBUS', 'ACTUAL TEBUS'
+        else:
+            target_col, actual_col = f'{comp} TARGET', f'{comp} ACTUAL'
+            columns[f'BOBOT {comp}'] = np.asarray(['25', '25%', '0,25'], dtype=object)[
+                rng.choice(3, rows, p=[0.9, 0.05, 0.05])]
+        columns[target_col] = rng.choice(_number_pool(rng, target_low, target_high), rows)
+        columns[actual_col] = rng.choice(_number_pool(rng, actual_low, actual_high), rows)
+
+    notes = np.array(['', '', '', 'OK', 'Promo', 'Stock kosong', 'Mesin EDC error', 'Lembur'], dtype=object)
+    for i in range(extra_columns):
+        columns[f'KETERANGAN {i + 1}'] = rng.choice(notes, rows)
+
+    ordered = ['TANGGAL', 'SHIFT', 'NAMA KASIR'] + NUMERIC_SHEET_COLUMNS
+    ordered += [col for col in columns if col not in ordered]
+    return pd.DataFrame({col: columns[col] for col in ordered})
+
+
+def sheet_values(df):
+    """Header + baris sebagai list of list, format `get_all_values()`/fake Sheets server"""
+    return [list(df.columns)] + df.to_numpy().tolist()
@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(scope='session')
+def app():
+    """Modul app.py tanpa sumber data, sama seperti benchmark (lihat benchmarks.run.load_app)"""
+    from benchmarks.run import load_app
+    return load_app()
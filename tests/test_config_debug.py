@@ -0,0 +1,40 @@
+import pytest
+
+from benchmarks.synthetic import generate_sheet
+from utils.snapshot import SnapshotStore
+
+
+class CountingClient:
+    """Pengganti SheetsApiClient yang counter-nya bisa diubah dari test"""
+
+    def __init__(self):
+        self.requests = 0
+
+    def stats(self):
+        return {'requests': self.requests, 'retries': 0, 'budget': {'available': 60.0}}
+
+
+@pytest.fixture
+def snapshot(app):
+    return SnapshotStore().swap(app.process_data(generate_sheet(500, seed=4)))
+
+
+def test_sheets_client_stats_refresh_outside_cached_panel(app, snapshot, monkeypatch):
+    client = CountingClient()
+    monkeypatch.setattr(app, 'sheets_client', client)
+    panel = str(app.render_config_debug(snapshot))
+    assert 'SHEETS_CLIENT' not in panel
+    assert "'metrics-summary'" in panel
+
+    client.requests = 7
+    live = str(app.update_metrics_summary(1))
+    assert "'Metric': 'requests', 'Value': 7" in live
+    assert "'Metric': 'budget.available', 'Value': 60.0" in live
+
+    client.requests = 9
+    assert "'Metric': 'requests', 'Value': 9" in str(app.update_metrics_summary(2))
+
+
+def test_sheets_client_stats_without_client(app, monkeypatch):
+    monkeypatch.setattr(app, 'sheets_client', None)
+    assert 'belum dibuat' in str(app.update_metrics_summary(1))
@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_sheet
+from utils.cube import build_aggregate_cube, rollup_cube
+from utils.grouping import grouped_scores
+
+
+@pytest.fixture(scope='module')
+def processed_df(app):
+    return app.process_data(generate_sheet(5_000, seed=1))
+
+
+@pytest.mark.parametrize('name', ['shift', 'daily', 'weekday', 'cashier'])
+def test_rollup_cube_matches_grouped_scores(app, processed_df, name):
+    groupings = {name: app.PERFORMANCE_GROUPINGS[name]}
+    expected = grouped_scores(processed_df, groupings)[name]
+    result = rollup_cube(build_aggregate_cube(processed_df), groupings,
+                         rows=processed_df, median_groupings=[name])[name]
+    keys = groupings[name]
+    pd.testing.assert_frame_equal(result.sort_values(keys).reset_index(drop=True),
+                                  expected.sort_values(keys).reset_index(drop=True),
+                                  check_categorical=False, check_like=True, rtol=1e-9)
+
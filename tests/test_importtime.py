@@ -0,0 +1,12 @@
+import json
+
+from benchmarks import importtime
+
+
+def test_import_app_within_budget(tmp_path, capsys):
+    report_path = tmp_path / 'importtime.json'
+    exit_code = importtime.main(['--repeat', '3', '--output', str(report_path)])
+    report = json.loads(report_path.read_text())
+    # Modul refresh (google-auth, plotly.subplots, ...) tidak boleh ikut dimuat saat startup
+    assert report['eager_lazy_modules'] == [], capsys.readouterr().err
+    assert exit_code == 0, capsys.readouterr().err
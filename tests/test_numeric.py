@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_sheet
+
+
+@pytest.fixture(scope='module')
+def sheet():
+    return generate_sheet(20_000, seed=0)
+
+
+def clean_both(app, series):
+    cleaned, failures = app.clean_numeric_column(series, return_failures=True)
+    return cleaned, app.clean_numeric_column(series, compat=True), failures
+
+
+def test_default_path_matches_compat(app, sheet):
+    for col in ('PSM ACTUAL', 'PWP TARGET', 'APC ACTUAL', 'BOBOT PSM'):
+        cleaned, compat, _ = clean_both(app, sheet[col])
+        pd.testing.assert_series_equal(cleaned, compat)
+
+
+def test_single_comma_decimal_cell_does_not_switch_column(app, sheet):
+    series = sheet['PSM ACTUAL'].copy()
+    # Ganti sel angka polos (bukan sel yang memang sudah gagal diparse)
+    series.iloc[series.str.isdigit().to_numpy().argmax()] = '1.234,50'
+    cleaned, compat, failures = clean_both(app, series)
+    pd.testing.assert_series_equal(cleaned, compat)
+    _, baseline_failures = app.clean_numeric_column(sheet['PSM ACTUAL'], return_failures=True)
+    assert failures == baseline_failures + 1
+
+
+def test_comma_decimal_column_is_detected(app):
+    series = pd.Series(['1.234,50', '12.000,25', '7,5', '1.500'] * 10)
+    cleaned, failures = app.clean_numeric_column(series, return_failures=True)
+    assert cleaned.iloc[:4].tolist() == [1234.5, 12000.25, 7.5, 1500.0]
+    assert failures == 0
+
+
+def test_comma_cells_are_counted_per_cell(app):
+    # Satu nilai unik '1.234,50' yang muncul di banyak sel mengalahkan banyak nilai unik '1,234.50'
+    series = pd.Series(['1.234,50'] * 30 + [f'{i},000.5' for i in range(1, 11)])
+    assert app.clean_numeric_column(series).iloc[0] == 1234.5
@@ -0,0 +1,91 @@
+import pandas as pd
+import pytest
+
+from utils.paging import apply_filter_query, page_records, sort_frame, split_filter_part
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'NAMA KASIR': pd.Categorical(['Kasir A', 'kasir b', 'Kasir C', 'Budi Santoso']),
+        'SHIFT': ['Shift 1', 'Shift 2', 'Shift 1', 'Shift 3'],
+        'TOTAL SCORE PPSA': [95.5, 101.0, 101.0, 80.25],
+        'TANGGAL': pd.to_datetime(['2024-01-05', '2024-02-10', '2024-02-11', '2024-03-01']),
+    })
+
+
+def names(frame):
+    return list(frame['NAMA KASIR'])
+
+
+@pytest.mark.parametrize('part, expected', [
+    ('{TOTAL SCORE PPSA} > 100', ('TOTAL SCORE PPSA', '>', 100.0, True)),
+    ('{TOTAL SCORE PPSA} ge 80.25', ('TOTAL SCORE PPSA', '>=', 80.25, True)),
+    ('{NAMA KASIR} icontains "kasir b"', ('NAMA KASIR', 'contains', 'kasir b', False)),
+    ('{NAMA KASIR} scontains kasir', ('NAMA KASIR', 'contains', 'kasir', True)),
+    ("{NAMA KASIR} = 'Budi \\'B\\' Santoso'", ('NAMA KASIR', '=', "Budi 'B' Santoso", True)),
+    ('{SHIFT} ieq `shift 1`', ('SHIFT', '=', 'shift 1', False)),
+    ('{TANGGAL} datestartswith 2024-02', ('TANGGAL', 'datestartswith', '2024-02', True)),
+])
+def test_split_filter_part(part, expected):
+    assert split_filter_part(part) == expected
+
+
+@pytest.mark.parametrize('part', ['{TOTAL SCORE PPSA} ~ 1', 'TOTAL SCORE PPSA > 1', ''])
+def test_split_filter_part_rejects_unknown(part):
+    assert split_filter_part(part) is None
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('{TOTAL SCORE PPSA} = 101', ['kasir b', 'Kasir C']),
+    ('{TOTAL SCORE PPSA} != 101', ['Kasir A', 'Budi Santoso']),
+    ('{TOTAL SCORE PPSA} < 95.5', ['Budi Santoso']),
+    ('{TOTAL SCORE PPSA} <= 95.5', ['Kasir A', 'Budi Santoso']),
+    ('{TOTAL SCORE PPSA} > 95.5', ['kasir b', 'Kasir C']),
+    ('{TOTAL SCORE PPSA} >= 95.5', ['Kasir A', 'kasir b', 'Kasir C']),
+    ('{NAMA KASIR} contains Kasir', ['Kasir A', 'Kasir C']),
+    ('{NAMA KASIR} icontains KASIR', ['Kasir A', 'kasir b', 'Kasir C']),
+    ('{TANGGAL} datestartswith 2024-02', ['kasir b', 'Kasir C']),
+    ('{SHIFT} = "Shift 1" && {TOTAL SCORE PPSA} > 100', ['Kasir C']),
+])
+def test_operators(df, query, expected):
+    assert names(apply_filter_query(df, query)) == expected
+
+
+def test_quoted_value_with_spaces(df):
+    assert names(apply_filter_query(df, '{NAMA KASIR} = "Budi Santoso"')) == ['Budi Santoso']
+    assert names(apply_filter_query(df, '{NAMA KASIR} contains "i S"')) == ['Budi Santoso']
+
+
+def test_case_insensitive_equality(df):
+    assert names(apply_filter_query(df, '{NAMA KASIR} i= "KASIR B"')) == ['kasir b']
+    assert names(apply_filter_query(df, '{NAMA KASIR} ine "kasir a"')) == ['kasir b', 'Kasir C', 'Budi Santoso']
+    assert names(apply_filter_query(df, '{NAMA KASIR} = "KASIR B"')) == []
+
+
+def test_numeric_and_string_columns(df):
+    # Angka dibandingkan sebagai angka; angka terhadap kolom teks tidak cocok, bukan error
+    assert names(apply_filter_query(df, '{TOTAL SCORE PPSA} = "101"')) == []
+    assert names(apply_filter_query(df, '{SHIFT} > 1')) == []
+    assert names(apply_filter_query(df, '{TOTAL SCORE PPSA} contains 101')) == ['kasir b', 'Kasir C']
+
+
+def test_unknown_column_and_part_are_ignored(df):
+    assert len(apply_filter_query(df, '{TIDAK ADA} = 1 && garbage')) == len(df)
+    assert apply_filter_query(df, '') is df
+
+
+def test_sort_by_multiple_columns(df):
+    sort_by = [{'column_id': 'TOTAL SCORE PPSA', 'direction': 'desc'},
+               {'column_id': 'SHIFT', 'direction': 'desc'},
+               {'column_id': 'TIDAK ADA', 'direction': 'asc'}]
+    assert names(sort_frame(df, sort_by)) == ['kasir b', 'Kasir C', 'Kasir A', 'Budi Santoso']
+    sort_by[1]['direction'] = 'asc'
+    assert names(sort_frame(df, sort_by)) == ['Kasir C', 'kasir b', 'Kasir A', 'Budi Santoso']
+    assert sort_frame(df, []) is df
+
+
+def test_page_records(df):
+    records, page_count = page_records(df, page_current=5, page_size=3)
+    assert page_count == 2
+    assert [record['NAMA KASIR'] for record in records] == ['Budi Santoso']
@@ -0,0 +1,44 @@
+import pytest
+import requests
+
+from benchmarks.synthetic import generate_sheet, sheet_values
+from utils.fake_sheets import FakeSheetsServer
+from utils.sheet_reader import IncrementalSheetReader
+from utils.sheets_api import SheetsApiClient, SheetsWorksheet
+from utils.snapshot import BackgroundRefresher, SnapshotStore
+from utils.sources import StoreSource
+
+
+@pytest.fixture
+def fake_store(app, monkeypatch):
+    """Satu toko yang dibaca dari fake Sheets server, tanpa retry"""
+    source = StoreSource('TOKO TEST', 'sheet-id')
+    with FakeSheetsServer({'sheet-id': {'Sheet1': sheet_values(generate_sheet(200))}}) as server, \
+            requests.Session() as session:
+        client = SheetsApiClient(session, base_url=server.base_url, max_retries=0)
+        worksheet = SheetsWorksheet(client, 'sheet-id', 'Sheet1')
+        monkeypatch.setattr(app, 'STORE_SOURCES', [source])
+        monkeypatch.setattr(app, 'sheet_readers', {
+            source.store: IncrementalSheetReader(select_columns=app.pipeline_source_columns)})
+        monkeypatch.setattr(app, 'open_worksheet', lambda source: worksheet)
+        monkeypatch.setattr(app, 'snapshot_store', SnapshotStore())
+        yield server
+
+
+def test_load_and_process_reads_store(app, fake_store):
+    df = app.load_and_process()
+    assert len(df) > 0
+    assert set(df['STORE']) == {'TOKO TEST'}
+
+
+def test_failed_fetch_fails_the_refresh(app, fake_store):
+    fake_store.fail_next(503)
+    with pytest.raises(RuntimeError):
+        app.load_and_process()
+
+    fake_store.fail_next(503)
+    store = SnapshotStore()
+    refresher = BackgroundRefresher(store, app.load_and_process, interval_seconds=0)
+    assert refresher.refresh_once() is None
+    assert refresher.last_error is not None
+    assert store.get().empty
@@ -0,0 +1,58 @@
+from utils.render_cache import RenderCache
+from utils.snapshot_index import SnapshotFilter
+
+
+def counting_render(calls, value):
+    def render():
+        calls.append(value)
+        return value
+    return render
+
+
+def test_hit_renders_once():
+    cache, calls = RenderCache(), []
+    key = ('tab-1', 1, SnapshotFilter())
+    assert cache.get_or_render(key, counting_render(calls, 'a')) == 'a'
+    assert cache.get_or_render(key, counting_render(calls, 'b')) == 'a'
+    assert calls == ['a']
+    assert cache.stats()['hits'] == 1
+
+
+def test_new_snapshot_version_invalidates_old_entries():
+    cache = RenderCache()
+    cache.put(('tab-1', 1, None), 'v1 tab-1')
+    cache.put(('tab-2', 1, None), 'v1 tab-2')
+    cache.put(('tab-1', 2, None), 'v2 tab-1')
+    assert cache.get(('tab-2', 1, None)) is None
+    assert cache.get(('tab-1', 2, None)) == 'v2 tab-1'
+    assert cache.stats()['entries'] == 1
+
+    # Render versi lama yang selesai terlambat tidak disimpan
+    cache.put(('tab-2', 1, None), 'stale')
+    assert cache.get(('tab-2', 1, None)) is None
+
+
+def test_lru_bound():
+    cache = RenderCache(max_entries=2)
+    cache.put(('tab-1', 1, None), 'a')
+    cache.put(('tab-2', 1, None), 'b')
+    assert cache.get(('tab-1', 1, None)) == 'a'
+    cache.put(('tab-3', 1, None), 'c')
+    # tab-2 paling lama tidak dipakai, jadi dibuang lebih dulu
+    assert cache.get(('tab-2', 1, None)) is None
+    assert cache.get(('tab-1', 1, None)) == 'a'
+    assert cache.get(('tab-3', 1, None)) == 'c'
+    assert cache.stats()['entries'] == 2
+
+
+def test_keys_separate_tabs_and_filters():
+    cache, calls = RenderCache(), []
+    january = SnapshotFilter.from_inputs('2024-01-01', '2024-01-31')
+    shift_1 = SnapshotFilter.from_inputs(shifts=['Shift 1'])
+    keys = [('tab-1', 1, SnapshotFilter(), ()), ('tab-2', 1, SnapshotFilter(), ()),
+            ('tab-1', 1, january, ()), ('tab-1', 1, shift_1, ()), ('tab-5', 1, shift_1, ('Shift 1',))]
+    for i, key in enumerate(keys):
+        cache.get_or_render(key, counting_render(calls, i))
+    assert calls == list(range(len(keys)))
+    # Filter yang sama dari input yang sama menghasilkan key yang sama
+    assert cache.get(('tab-1', 1, SnapshotFilter.from_inputs('2024-01-01', '2024-01-31'), ())) == 2
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.scoring import PPSA_WEIGHTS, add_aggregate_scores, calculate_acv, score_components
+
+
+def test_calculate_acv_zero_target_is_zero():
+    acv = calculate_acv([50, 30, 0, 12], [100, 0, 0, 8])
+    np.testing.assert_array_equal(acv, [50.0, 0.0, 0.0, 150.0])
+
+
+def test_calculate_acv_broadcasts_scalar_target():
+    np.testing.assert_array_equal(calculate_acv([1, 2], 4), [25.0, 50.0])
+
+
+def test_score_components_uses_row_weights():
+    targets = {'PSM': [100, 200], 'PWP': [10, 0], 'SG': [40, 40], 'APC': [50_000, 50_000]}
+    actuals = {'PSM': [120, 100], 'PWP': [5, 7], 'SG': [40, 20], 'APC': [60_000, 25_000]}
+    weights = {'PSM': [25, 20], 'PWP': [25, 25], 'SG': [25, 30], 'APC': [25, 25]}
+    scored = score_components(targets, actuals, weights)
+
+    np.testing.assert_allclose(scored['acv']['PSM'], [120.0, 50.0])
+    np.testing.assert_allclose(scored['acv']['PWP'], [50.0, 0.0])
+    np.testing.assert_allclose(scored['score']['PSM'], [30.0, 10.0])
+    np.testing.assert_allclose(scored['score']['PWP'], [12.5, 0.0])
+    np.testing.assert_allclose(scored['score']['SG'], [25.0, 15.0])
+    np.testing.assert_allclose(scored['score']['APC'], [30.0, 12.5])
+    np.testing.assert_allclose(scored['total'], [97.5, 37.5])
+
+
+def test_score_components_skips_missing_components():
+    scored = score_components({'PSM': [100]}, {'PSM': [50]})
+    assert list(scored['score']) == ['PSM']
+    np.testing.assert_allclose(scored['total'], [50 * PPSA_WEIGHTS['PSM'] / 100])
+    assert score_components({}, {})['total'] is None
+
+
+def test_add_aggregate_scores_matches_hand_computed_row():
+    frame = pd.DataFrame({
+        'PSM Target_sum': [1_000_000.0], 'PSM Actual_sum': [1_100_000.0],
+        'PWP Target_sum': [200.0], 'PWP Actual_sum': [150.0],
+        'SG Target_sum': [80.0], 'SG Actual_sum': [0.0],
+        'APC Target_mean': [80_000.0], 'APC Actual_mean': [100_000.0],
+    })
+    add_aggregate_scores(frame, ' Target_sum', ' Actual_sum', 'APC Target_mean', 'APC Actual_mean')
+
+    # PSM 110% x 20 + PWP 75% x 25 + SG 0% x 30 + APC 125% x 25
+    row = frame.iloc[0]
+    assert row['ACV PSM (%)'] == pytest.approx(110.0)
+    assert row['SCORE PSM'] == pytest.approx(22.0)
+    assert row['SCORE PWP'] == pytest.approx(18.75)
+    assert row['SCORE SG'] == pytest.approx(0.0)
+    assert row['SCORE APC'] == pytest.approx(31.25)
+    assert row['TOTAL SCORE PPSA'] == pytest.approx(72.0)
@@ -0,0 +1,52 @@
+import pytest
+
+from utils.shared_snapshot import SnapshotCoordinator
+from utils.snapshot import BackgroundRefresher, DataSnapshot, SnapshotStore
+from utils.sources import StoreSource
+
+
+@pytest.fixture
+def coordinators(tmp_path):
+    leader = SnapshotCoordinator(SnapshotStore(), str(tmp_path), 'fingerprint')
+    follower = SnapshotCoordinator(SnapshotStore(), str(tmp_path), 'fingerprint')
+    assert leader.try_acquire_leadership()
+    assert not follower.try_acquire_leadership()
+    return leader, follower
+
+
+def test_follower_reads_leader_status(coordinators, tmp_path):
+    leader, follower = coordinators
+    assert follower.read_status() is None
+    leader.publish_status('loading')
+    assert follower.read_status()['state'] == 'loading'
+    leader.publish_status('done', error='Quota habis', version=0)
+    assert follower.read_status()['error'] == 'Quota habis'
+    # Status sumber data lain diabaikan
+    assert SnapshotCoordinator(SnapshotStore(), str(tmp_path), 'other').read_status() is None
+
+
+def test_refresher_reports_failed_refresh():
+    finished = []
+
+    def failing_loader():
+        raise RuntimeError('Semua toko gagal diambil')
+
+    refresher = BackgroundRefresher(SnapshotStore(), failing_loader, 0, on_finish=finished.append)
+    refresher.refresh_once()
+    assert finished == [refresher]
+    assert refresher.last_error == 'Semua toko gagal diambil'
+
+
+def test_follower_stops_loading_when_leader_fails(app, coordinators, monkeypatch):
+    leader, follower = coordinators
+    monkeypatch.setattr(app, 'shared_snapshot', follower)
+    monkeypatch.setattr(app, 'STORE_SOURCES', [StoreSource('TOKO TEST', 'sheet-id')])
+    empty = DataSnapshot()
+
+    assert app.data_loading(empty)
+    leader.publish_status('loading')
+    assert app.data_loading(empty)
+    leader.publish_status('done', error='GCP_SERVICE_ACCOUNT tidak diatur')
+    assert not app.data_loading(empty)
+    assert app.refresh_error() == 'GCP_SERVICE_ACCOUNT tidak diatur'
+    assert 'GCP_SERVICE_ACCOUNT tidak diatur' in str(app.create_header(empty))
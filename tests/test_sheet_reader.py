@@ -0,0 +1,146 @@
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_sheet, sheet_values
+from utils.fake_sheets import FakeWorksheet
+from utils.schema import concat_frames
+from utils.sheet_reader import IncrementalSheetReader
+
+
+class RecordingWorksheet(FakeWorksheet):
+    """FakeWorksheet yang mencatat range setiap request batchGet"""
+
+    def __init__(self, rows):
+        super().__init__(rows)
+        self.requests = []
+
+    def batch_get(self, ranges):
+        self.requests.append(list(ranges))
+        return super().batch_get(ranges)
+
+
+@pytest.fixture
+def values():
+    return sheet_values(generate_sheet(300, extra_columns=3, seed=4))
+
+
+@pytest.fixture(params=[False, True], ids=['all-columns', 'projected'])
+def reader(app, request):
+    return IncrementalSheetReader(tail_rows=5, select_columns=app.pipeline_source_columns if request.param else None)
+
+
+def test_append_matches_full_reload(app, reader, values):
+    worksheet = FakeWorksheet(values[:201])
+    first = app.process_data(reader.fetch_full(worksheet))
+
+    worksheet.rows = values
+    mode, new_rows = reader.fetch(worksheet)
+    assert mode == 'append'
+    assert list(new_rows.index) == list(range(200, 300))
+    assert reader.row_count == len(values)
+
+    appended = concat_frames([first, app.process_data(new_rows)])
+    full = app.process_data(IncrementalSheetReader(select_columns=reader.select_columns).fetch_full(worksheet))
+    pd.testing.assert_frame_equal(appended, full)
+
+
+def test_unchanged_sheet(reader, values):
+    worksheet = RecordingWorksheet(values)
+    reader.fetch_full(worksheet)
+    mode, new_rows = reader.fetch(worksheet)
+    assert mode == 'unchanged'
+    assert new_rows.empty
+    # Header, tail dan baris baru diminta dalam satu batchGet
+    assert len(worksheet.requests) == (1 if reader.select_columns is None else 2) + 1
+
+
+def test_edit_inside_tail_forces_full_reload(reader, values):
+    worksheet = FakeWorksheet([list(row) for row in values])
+    reader.fetch_full(worksheet)
+    worksheet.rows[-2][2] = 'KASIR BARU'
+    mode, df = reader.fetch(worksheet)
+    assert mode == 'full'
+    assert df.loc[len(values) - 3, 'NAMA KASIR'] == 'KASIR BARU'
+    assert reader.incremental_fetches == 0
+
+
+def test_edit_before_tail_is_not_detected(reader, values):
+    worksheet = FakeWorksheet([list(row) for row in values])
+    reader.fetch_full(worksheet)
+    worksheet.rows[10][2] = 'KASIR BARU'
+    assert reader.fetch(worksheet)[0] == 'unchanged'
+    # Full reload berkala yang akhirnya membaca edit lama
+    assert reader.fetch(worksheet, incremental=False)[1].loc[9, 'NAMA KASIR'] == 'KASIR BARU'
+
+
+def test_header_change_resets_state(reader, values):
+    worksheet = FakeWorksheet([list(row) for row in values])
+    reader.fetch_full(worksheet)
+    worksheet.rows[0] = ['TGL' if name == 'TANGGAL' else name for name in values[0]]
+    worksheet.rows.append(list(values[-1]))
+
+    mode, df = reader.fetch(worksheet)
+    assert mode == 'full'
+    assert 'TGL' in reader.header and 'TANGGAL' not in reader.header
+    assert 'TGL' in df.columns
+    assert reader.row_count == len(worksheet.rows)
+    assert reader.fetch(worksheet)[0] == 'unchanged'
+
+
+def test_full_reload_every(values):
+    reader = IncrementalSheetReader(full_reload_every=2)
+    worksheet = FakeWorksheet(values)
+    reader.fetch_full(worksheet)
+    assert [reader.fetch(worksheet)[0] for _ in range(3)] == ['unchanged', 'unchanged', 'full']
+
+
+def test_empty_sheet(reader):
+    assert reader.fetch_full(FakeWorksheet([])).empty
+    assert not reader.has_state
+    assert reader.fetch(FakeWorksheet([]))[0] == 'full'
+
+
+PROJECTION_ROWS = [
+    ['TANGGAL', 'KETERANGAN', 'SHIFT', 'NAMA KASIR', 'CATATAN', 'PSM ACTUAL', 'PSM TARGET', 'LAIN'],
+    ['01/01/2024', 'x', '1', 'KASIR 001', 'y', '100', '200', 'z'],
+    # Sel kosong di ujung baris dipotong API: blok terakhir kosong untuk baris ini
+    ['02/01/2024', 'x', '2', 'KASIR 002'],
+    ['03/01/2024', '', '', '', '', '', '300'],
+    # Baris kosong di akhir setiap range juga dipotong
+    ['04/01/2024', 'x', '1'],
+]
+
+
+def test_projection_requests_only_pipeline_columns(app):
+    worksheet = RecordingWorksheet(PROJECTION_ROWS)
+    reader = IncrementalSheetReader(select_columns=app.pipeline_source_columns)
+    df = reader.fetch_full(worksheet)
+
+    assert reader.column_names == ['TANGGAL', 'SHIFT', 'NAMA KASIR', 'PSM ACTUAL', 'PSM TARGET']
+    assert worksheet.requests == [['1:1'], ['A2:A', 'C2:D', 'F2:G']]
+    expected = pd.DataFrame({
+        'TANGGAL': ['01/01/2024', '02/01/2024', '03/01/2024', '04/01/2024'],
+        'SHIFT': ['1', '2', '', '1'],
+        'NAMA KASIR': ['KASIR 001', 'KASIR 002', '', ''],
+        'PSM ACTUAL': ['100', '', '', ''],
+        'PSM TARGET': ['200', '', '300', ''],
+    })
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+
+
+def test_projection_incremental_ranges(app):
+    worksheet = RecordingWorksheet([list(row) for row in PROJECTION_ROWS])
+    reader = IncrementalSheetReader(tail_rows=2, select_columns=app.pipeline_source_columns)
+    reader.fetch_full(worksheet)
+    worksheet.rows.append(['05/01/2024', '', '3', 'KASIR 003', '', '50'])
+
+    mode, df = reader.fetch(worksheet)
+    assert mode == 'append'
+    assert worksheet.requests[-1] == ['1:1', 'A4:A5', 'C4:D5', 'F4:G5', 'A6:A', 'C6:D', 'F6:G']
+    assert df.loc[4].tolist() == ['05/01/2024', '3', 'KASIR 003', '50', '']
+
+
+def test_projection_falls_back_to_all_columns(app):
+    rows = [['A', 'B'], ['1', '2']]
+    reader = IncrementalSheetReader(select_columns=app.pipeline_source_columns)
+    assert list(reader.fetch_full(FakeWorksheet(rows)).columns) == ['A', 'B']
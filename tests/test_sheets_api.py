@@ -0,0 +1,149 @@
+import pytest
+import requests
+
+from utils.fake_sheets import FakeSheetsServer
+from utils.sheets_api import (RequestBudget, RequestBudgetExceeded, SheetsApiClient, SheetsApiError,
+                              SheetsWorksheet)
+
+ROWS = [
+    ['TANGGAL', 'SHIFT', 'NAMA KASIR', 'PSM ACTUAL'],
+    ['01/01/2024', '1', 'KASIR 001', '1,000'],
+    ['02/01/2024', '2', 'KASIR 002', ''],
+    ['03/01/2024', '3', 'KASIR 003', '2500'],
+]
+
+
+@pytest.fixture(scope='module')
+def fake_server():
+    with FakeSheetsServer({'sheet-id': {'Sheet1': ROWS, "Toko 'B'": ROWS[:2]}}) as server:
+        yield server
+
+
+@pytest.fixture
+def server(fake_server):
+    fake_server.requests.clear()
+    return fake_server
+
+
+@pytest.fixture
+def sleeps():
+    return []
+
+
+@pytest.fixture
+def client(server, sleeps):
+    session = requests.Session()
+    yield SheetsApiClient(session, base_url=server.base_url, max_retries=3, backoff_base=0.01,
+                          backoff_cap=10.0, sleep=sleeps.append)
+    session.close()
+
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_retries_transient_status(server, client, sleeps, status):
+    server.fail_next(status, count=2)
+    assert client.values_batch_get('sheet-id', ["'Sheet1'!A1:B1"]) == [[['TANGGAL', 'SHIFT']]]
+    assert client.requests == 3
+    assert client.retries == 2
+    assert len(sleeps) == 2
+
+
+def test_retry_honors_retry_after(server, client, sleeps):
+    server.fail_next(429, retry_after=7)
+    client.values_batch_get('sheet-id', ["'Sheet1'!A1"])
+    assert sleeps == [7.0]
+
+
+def test_gives_up_after_max_retries(server, client):
+    server.fail_next(503, count=4)
+    with pytest.raises(SheetsApiError) as excinfo:
+        client.values_batch_get('sheet-id', ["'Sheet1'!A1"])
+    assert excinfo.value.status == 503
+    assert client.requests == 4
+
+
+def test_does_not_retry_bad_request(server, client, sleeps):
+    server.fail_next(400)
+    with pytest.raises(SheetsApiError) as excinfo:
+        client.values_batch_get('sheet-id', ["'Sheet1'!A1"])
+    assert excinfo.value.status == 400
+    assert client.requests == 1
+    assert sleeps == []
+
+
+def test_request_budget_exceeded(server):
+    budget = RequestBudget(requests_per_minute=1, max_wait=5, clock=lambda: 0.0)
+    with requests.Session() as session:
+        client = SheetsApiClient(session, base_url=server.base_url, budget=budget)
+        client.values_batch_get('sheet-id', ["'Sheet1'!A1"])
+        with pytest.raises(RequestBudgetExceeded) as excinfo:
+            client.values_batch_get('sheet-id', ["'Sheet1'!A1"])
+    assert excinfo.value.status == 429
+    assert len(server.requests) == 1
+
+
+def test_worksheet_falls_back_to_first_title(server, client):
+    worksheet = SheetsWorksheet(client, 'sheet-id', 'Tidak Ada')
+    assert worksheet.batch_get(['A1:A2']) == [[['TANGGAL'], ['01/01/2024']]]
+    assert worksheet.title == 'Sheet1'
+    # Request pertama (400), daftar worksheet, lalu request ulang
+    assert [path.rsplit('/', 1)[-1] for path, _ in server.requests] == [
+        'values:batchGet', 'sheet-id', 'values:batchGet']
+
+
+def test_multi_range_batch_get(server, client):
+    worksheet = SheetsWorksheet(client, 'sheet-id', 'Sheet1')
+    header, names, tail = worksheet.batch_get(['1:1', 'C2:C', 'A4:D'])
+    assert header == [ROWS[0]]
+    assert names == [['KASIR 001'], ['KASIR 002'], ['KASIR 003']]
+    assert tail == [ROWS[3]]
+    # Semua range dikirim dalam satu request batchGet
+    assert len(server.requests) == 1
+    assert server.requests[0][1]['ranges'] == ["'Sheet1'!1:1", "'Sheet1'!C2:C", "'Sheet1'!A4:D"]
+
+
+def test_quoted_worksheet_title(server, client):
+    worksheet = SheetsWorksheet(client, 'sheet-id', "Toko 'B'")
+    assert worksheet.get_all_values() == ROWS[:2]
+
+
+class FlakyCredentials:
+    """Credentials palsu: `refresh()` menaikkan error dari `failures` satu per satu, lalu berhasil"""
+
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.token = None
+        self.expiry = None
+
+    def refresh(self, request):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.token = 'token'
+
+    def apply(self, headers):
+        headers['authorization'] = f'Bearer {self.token}'
+
+
+def auth_client(server, sleeps, failures):
+    return SheetsApiClient(requests.Session(), base_url=server.base_url, max_retries=3, backoff_base=0.01,
+                           sleep=sleeps.append, credentials=FlakyCredentials(failures))
+
+
+def test_retries_token_endpoint_transport_error(server, sleeps):
+    from google.auth.exceptions import RefreshError, TransportError
+    client = auth_client(server, sleeps, [TransportError('connection reset'),
+                                          RefreshError('HTTP 503', retryable=True)])
+    assert client.values_batch_get('sheet-id', ["'Sheet1'!A1"]) == [[['TANGGAL']]]
+    assert client.retries == 2
+    assert client.token_refreshes == 1
+    assert len(sleeps) == 2
+
+
+def test_rejected_credentials_are_not_retried(server, sleeps):
+    from google.auth.exceptions import RefreshError
+    client = auth_client(server, sleeps, [RefreshError('invalid_grant')])
+    with pytest.raises(SheetsApiError) as excinfo:
+        client.values_batch_get('sheet-id', ["'Sheet1'!A1"])
+    assert excinfo.value.status is None
+    assert isinstance(excinfo.value.__cause__, RefreshError)
+    assert client.retries == 0
+    assert server.requests == []
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+WAITERS = 8
+
+
+def start_callers(flight, key, fn, results):
+    def call():
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(WAITERS)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def wait_for_waiters(flight, key):
+    # Semua thread sudah masuk do() dan menunggu call yang sama
+    for _ in range(500):
+        with flight._lock:
+            call = flight._calls.get(key)
+            if call is not None and call.waiters == WAITERS - 1:
+                return
+        threading.Event().wait(0.01)
+    pytest.fail('thread tidak menunggu call yang sama')
+
+
+def test_concurrent_calls_run_once():
+    flight, release, calls, results = SingleFlight(), threading.Event(), [], []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return object()
+
+    threads = start_callers(flight, 'tab-1', slow, results)
+    wait_for_waiters(flight, 'tab-1')
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == WAITERS and all(result is results[0] for result in results)
+    assert flight.stats() == {'in_flight': 0, 'executed': 1, 'coalesced': WAITERS - 1}
+
+
+def test_exception_reaches_every_waiter_and_releases_key():
+    flight, release, results = SingleFlight(), threading.Event(), []
+
+    def failing():
+        release.wait(5)
+        raise ValueError('render gagal')
+
+    threads = start_callers(flight, 'tab-1', failing, results)
+    wait_for_waiters(flight, 'tab-1')
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(results) == WAITERS
+    assert all(isinstance(result, ValueError) and result is results[0] for result in results)
+    assert flight.stats()['in_flight'] == 0
+    # Key sudah dilepas: pemanggilan berikutnya menjalankan fn lagi
+    assert flight.do('tab-1', lambda: 'ok') == 'ok'
+    assert flight.stats()['executed'] == 2
+
+
+def test_different_keys_do_not_coalesce():
+    flight, release, results = SingleFlight(), threading.Event(), []
+    thread = threading.Thread(target=lambda: results.append(flight.do('tab-1', lambda: release.wait(5))))
+    thread.start()
+    assert flight.do('tab-2', lambda: 'tab-2') == 'tab-2'
+    release.set()
+    thread.join(5)
+    assert flight.stats()['coalesced'] == 0
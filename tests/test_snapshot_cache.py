@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_sheet
+from utils.snapshot_cache import column_buffers, is_memory_mapped, load_snapshot, save_snapshot
+
+
+@pytest.fixture(scope='module')
+def processed_df(app):
+    return app.process_data(generate_sheet(2_000, seed=3))
+
+
+def test_round_trip_keeps_every_column_memory_mapped(processed_df, tmp_path):
+    save_snapshot(processed_df, tmp_path, 'fingerprint', version=7)
+    loaded, meta = load_snapshot(tmp_path, 'fingerprint')
+
+    pd.testing.assert_frame_equal(loaded, processed_df, check_index_type=False)
+    assert meta['version'] == 7
+    assert meta['copied_columns'] == []
+    for name in loaded.columns:
+        buffers = column_buffers(loaded[name])
+        assert buffers and all(is_memory_mapped(buffer) for buffer in buffers), name
+
+
+def test_nullable_column_with_missing_values(tmp_path):
+    df = pd.DataFrame({'MINGGU': pd.array([1, None, 3], dtype='UInt32'),
+                       'FLAG': pd.array([True, None, False], dtype='boolean')})
+    save_snapshot(df, tmp_path, 'fingerprint')
+    loaded, meta = load_snapshot(tmp_path, 'fingerprint')
+    pd.testing.assert_frame_equal(loaded, df, check_index_type=False)
+    assert meta['copied_columns'] == []
+
+
+def test_copied_columns_are_reported(tmp_path):
+    df = pd.DataFrame({'VALUE': [1.0, 2.0, 3.0], 'SPARSE': pd.arrays.SparseArray([0.0, 0.0, 2.5])})
+    save_snapshot(df, tmp_path, 'fingerprint')
+    loaded, meta = load_snapshot(tmp_path, 'fingerprint')
+    pd.testing.assert_frame_equal(loaded, df, check_index_type=False)
+    assert meta['copied_columns'] == ['SPARSE']
+
+
+def test_fingerprint_mismatch_is_ignored(processed_df, tmp_path):
+    save_snapshot(processed_df.head(10), tmp_path, 'fingerprint')
+    assert load_snapshot(tmp_path, 'other') == (None, None)
+    assert not is_memory_mapped(np.zeros(3))
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from utils.grouping import STAT_MEASURE, finalize_groups, group_codes, rollup, row_measures
+
+# Grain cube: tanggal x toko x shift x kasir. HARI ditentukan oleh TANGGAL
+# sehingga tidak menambah jumlah sel, tapi ikut disimpan agar bisa di-rollup langsung.
+CUBE_KEYS = ['TANGGAL', 'HARI', 'STORE', 'SHIFT', 'NAMA KASIR']
+
+
+def build_aggregate_cube(df):
+    """Bangun cube measure aditif (count, jumlah tiap measure, m2) dari processed_df.
+
+    Baris dengan key kosong (misalnya tanggal gagal diparse) tetap masuk
+    sebagai sel tersendiri supaya total per kasir/shift tidak berubah.
+    """
+    keys = [key for key in CUBE_KEYS if key in df.columns]
+    if df.empty or not keys:
+        return pd.DataFrame()
+
+    group_ids, cube = group_codes(df, keys, dropna=False)
+    agg = rollup(row_measures(df), group_ids, len(cube))
+    for name, values in agg.items():
+        cube[name] = values
+    return cube
+
+
+def cube_measures(cube):
+    measure_cols = [col for col in cube.columns if col not in CUBE_KEYS]
+    return {col: cube[col].to_numpy(dtype='float64') for col in measure_cols}
+
+
+def cube_totals(cube):
+    """Jumlah seluruh measure di cube (dipakai untuk skor PPSA keseluruhan)"""
+    return {name: values.sum() for name, values in cube_measures(cube).items()}
+
+
+def rollup_cube(cube, groupings, rows=None, median_groupings=()):
+    """Rollup cube ke beberapa grouping; hasilnya sama dengan `grouped_scores()`.
+
+    Median tidak bisa dihitung dari measure aditif, jadi hanya grouping di
+    `median_groupings` yang mediannya dihitung dari `rows` (processed_df).
+    """
+    measures = cube_measures(cube)
+    cache = {}
+    results = {}
+    for name, keys in groupings.items():
+        group_ids, key_frame = group_codes(cube, keys, cache)
+        agg = rollup(measures, group_ids, len(key_frame))
+        medians = None
+        if rows is not None and name in median_groupings:
+            row_medians = rows.groupby(keys, observed=True)[STAT_MEASURE].median()
+            medians = key_frame.join(row_medians, on=keys)[STAT_MEASURE].to_numpy()
+        results[name] = finalize_groups(agg, key_frame, medians)
+    return results
@@ -0,0 +1,186 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from utils.sheets_api import column_number
+
+_VALUES_PATH = re.compile(r'^/v4/spreadsheets/(?P<id>[^/]+)/values:batchGet$')
+_SPREADSHEET_PATH = re.compile(r'^/v4/spreadsheets/(?P<id>[^/:]+)$')
+_CELL = re.compile(r'^(?P<col>[A-Za-z]*)(?P<row>\d*)$')
+
+
+def _split_range(a1_range):
+    """"'Sheet 1'!A1:F" -> ('Sheet 1', 'A1:F'); tanpa '!' berarti seluruh worksheet"""
+    if not a1_range.startswith("'"):
+        title, _, cells = a1_range.partition('!')
+        return title, cells
+    end = a1_range.index("'", 1)
+    while a1_range[end + 1:end + 2] == "'":
+        end = a1_range.index("'", end + 2)
+    return a1_range[1:end].replace("''", "'"), a1_range[end + 2:]
+
+
+def _grid_range(cells):
+    """'A2:F' -> (start_row, end_row, start_col, end_col) berbasis 0, end eksklusif; None = terbuka"""
+    start, _, end = cells.partition(':')
+    start, end = _CELL.match(start), _CELL.match(end or start)
+    return (
+        int(start['row']) - 1 if start['row'] else 0,
+        int(end['row']) if end['row'] else None,
+        column_number(start['col']) - 1 if start['col'] else 0,
+        column_number(end['col']) if end['col'] else None,
+    )
+
+
+def _trim(rows):
+    """Sheets API membuang sel kosong di ujung baris dan baris kosong di akhir range"""
+    trimmed = []
+    for row in rows:
+        row = list(row)
+        while row and row[-1] == '':
+            row.pop()
+        trimmed.append(row)
+    while trimmed and not trimmed[-1]:
+        trimmed.pop()
+    return trimmed
+
+
+def sheet_range(sheet, cells):
+    """Nilai range A1 (tanpa nama worksheet) dari sheet [[sel]], seperti respons values API"""
+    if not cells:
+        return _trim(sheet)
+    start_row, end_row, start_col, end_col = _grid_range(cells)
+    return _trim([row[start_col:end_col] for row in sheet[start_row:end_row]])
+
+
+class FakeWorksheet:
+    """Worksheet di memori dengan interface SheetsWorksheet, tanpa HTTP.
+
+    Hasil setiap pemanggilan melewati encode/decode JSON seperti respons API
+    (list dan string baru, tidak berbagi objek dengan `rows`), sehingga cocok
+    untuk mengukur memori jalur ingest.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def batch_get(self, ranges):
+        return json.loads(json.dumps([sheet_range(self.rows, a1_range) for a1_range in ranges]))
+
+    def get_all_values(self):
+        return self.batch_get([''])[0]
+
+
+class FakeSheetsServer:
+    """Server HTTP lokal yang meniru endpoint Sheets API v4 yang dipakai SheetsApiClient.
+
+    Data disimpan di memori sebagai {spreadsheet_id: {judul worksheet: [[sel]]}}.
+    `fail_next(status, count)` membuat request berikutnya gagal dengan status
+    tersebut, untuk mencoba retry/backoff terhadap 429 dan 5xx.
+
+        with FakeSheetsServer({'sheet-id': {'Sheet1': rows}}) as server:
+            client = SheetsApiClient(requests.Session(), base_url=server.base_url)
+    """
+
+    def __init__(self, spreadsheets=None, host='127.0.0.1', port=0, latency=0.0):
+        self.spreadsheets = spreadsheets or {}
+        self.latency = latency
+        self.requests = []
+        self._failures = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v4"
+
+    def fail_next(self, status, count=1, retry_after=None):
+        with self._lock:
+            self._failures.extend([(status, retry_after)] * count)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-sheets', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _values(self, spreadsheet_id, a1_range):
+        title, cells = _split_range(a1_range)
+        sheet = self.spreadsheets[spreadsheet_id].get(title)
+        if sheet is None:
+            return None
+        return sheet_range(sheet, cells)
+
+    def handle(self, path, query):
+        """Kembalikan (status, body dict, headers) untuk satu request GET"""
+        with self._lock:
+            self.requests.append((path, query))
+            failure = self._failures.pop(0) if self._failures else None
+        if failure is not None:
+            status, retry_after = failure
+            headers = {'Retry-After': str(retry_after)} if retry_after is not None else {}
+            return status, {'error': {'code': status, 'message': 'Injected failure'}}, headers
+
+        match = _VALUES_PATH.match(path)
+        if match:
+            spreadsheet_id = unquote(match.group('id'))
+            if spreadsheet_id not in self.spreadsheets:
+                return 404, {'error': {'code': 404, 'message': 'Requested entity was not found.'}}, {}
+            value_ranges = []
+            for a1_range in query.get('ranges', []):
+                values = self._values(spreadsheet_id, a1_range)
+                if values is None:
+                    return 400, {'error': {'code': 400, 'message': f'Unable to parse range: {a1_range}'}}, {}
+                value_range = {'range': a1_range, 'majorDimension': 'ROWS'}
+                if values:
+                    value_range['values'] = values
+                value_ranges.append(value_range)
+            return 200, {'spreadsheetId': spreadsheet_id, 'valueRanges': value_ranges}, {}
+
+        match = _SPREADSHEET_PATH.match(path)
+        if match:
+            spreadsheet_id = unquote(match.group('id'))
+            if spreadsheet_id not in self.spreadsheets:
+                return 404, {'error': {'code': 404, 'message': 'Requested entity was not found.'}}, {}
+            sheets = [{'properties': {'title': title}} for title in self.spreadsheets[spreadsheet_id]]
+            return 200, {'sheets': sheets}, {}
+
+        return 404, {'error': {'code': 404, 'message': 'Not found'}}, {}
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                if fake.latency:
+                    threading.Event().wait(fake.latency)
+                url = urlparse(self.path)
+                status, body, headers = fake.handle(url.path, parse_qs(url.query))
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+from utils.scoring import add_aggregate_scores
+
+# Measure yang diagregasi dengan SUM dan MEAN; semua disimpan sebagai jumlah
+# supaya bisa di-rollup ulang (mean = sum / count)
+SUM_MEASURES = [
+    'PSM Target', 'PSM Actual', 'PWP Target', 'PWP Actual', 'SG Target', 'SG Actual',
+    'ACTUAL TEBUS 2500', 'TARGET TEBUS 2500',
+]
+MEAN_MEASURES = ['APC Target', 'APC Actual', 'SCORE PSM', 'SCORE PWP', 'SCORE SG', 'SCORE APC']
+# Measure dengan statistik lengkap (mean, median, std, count)
+STAT_MEASURE = 'TOTAL SCORE PPSA'
+
+
+def row_measures(df):
+    """Ubah baris processed_df menjadi sel measure aditif (count=1, m2=0)"""
+    measures = {'count': np.ones(len(df), dtype='float64')}
+    for col in SUM_MEASURES + MEAN_MEASURES + [STAT_MEASURE]:
+        if col in df.columns:
+            measures[col] = df[col].to_numpy(dtype='float64')
+    if STAT_MEASURE in measures:
+        measures['m2'] = np.zeros(len(df), dtype='float64')
+    return measures
+
+
+def group_codes(df, keys, cache=None, dropna=True):
+    """Factorize kolom key (sorted, NaN = -1) dan gabungkan menjadi satu group id.
+
+    `cache` dipakai bersama antar grouping agar setiap kolom hanya
+    di-factorize sekali. Dengan `dropna=False` NaN menjadi group tersendiri.
+    Kembalikan (codes, DataFrame key per group).
+    """
+    cache = {} if cache is None else cache
+    code_list, uniques_list = [], []
+    for key in keys:
+        if key not in cache:
+            cache[key] = _factorize_sorted(df[key], dropna)
+        codes, uniques = cache[key]
+        code_list.append(codes)
+        uniques_list.append(uniques)
+
+    if len(keys) == 1:
+        return code_list[0], pd.DataFrame({keys[0]: uniques_list[0]})
+
+    valid = np.logical_and.reduce([codes >= 0 for codes in code_list])
+    combined = np.zeros(len(df), dtype='int64')
+    for codes, uniques in zip(code_list, uniques_list):
+        combined = combined * len(uniques) + codes
+    # Kode campuran tetap urut leksikografis, lalu dipadatkan menjadi 0..n-1
+    present, dense = np.unique(combined[valid], return_inverse=True)
+    group_ids = np.full(len(df), -1, dtype='int64')
+    group_ids[valid] = dense
+
+    key_frame = {}
+    for position in range(len(keys) - 1, -1, -1):
+        size = len(uniques_list[position])
+        key_frame[keys[position]] = uniques_list[position].take(present % size)
+        present = present // size
+    key_frame = pd.DataFrame({key: key_frame[key] for key in keys})
+    return group_ids, key_frame
+
+
+def _factorize_sorted(series, dropna):
+    """pd.factorize(sort=True); kolom categorical dengan kategori terurut langsung memakai codes-nya"""
+    dtype = series.dtype
+    if not isinstance(dtype, pd.CategoricalDtype) or not dtype.categories.is_monotonic_increasing:
+        return pd.factorize(series, sort=True, use_na_sentinel=dropna)
+
+    codes = series.cat.codes.to_numpy()
+    categories = dtype.categories
+    # Padatkan kategori yang tidak muncul agar hasilnya sama dengan factorize
+    observed = np.bincount(codes[codes >= 0], minlength=len(categories)) > 0
+    remap = np.cumsum(observed) - 1
+    uniques = categories[observed]
+    dense = np.where(codes >= 0, remap[codes], -1)
+    if not dropna and (codes < 0).any():
+        dense[codes < 0] = len(uniques)
+        uniques = uniques.append(pd.Index([np.nan], dtype=uniques.dtype))
+    return dense, uniques
+
+
+def rollup(measures, group_ids, n_groups):
+    """Jumlahkan sel measure per group; m2 digabung dengan rumus paralel (Chan)"""
+    valid = group_ids >= 0
+    if not valid.all():
+        group_ids = group_ids[valid]
+        measures = {name: values[valid] for name, values in measures.items()}
+
+    result = {}
+    for name, values in measures.items():
+        if name == 'm2':
+            continue
+        result[name] = np.bincount(group_ids, weights=values, minlength=n_groups)
+
+    if 'm2' in measures:
+        count = measures['count']
+        cell_mean = measures[STAT_MEASURE] / count
+        group_mean = _safe_divide(result[STAT_MEASURE], result['count'])
+        spread = count * (cell_mean - group_mean[group_ids]) ** 2
+        result['m2'] = np.bincount(group_ids, weights=measures['m2'] + spread, minlength=n_groups)
+    return result
+
+
+def grouped_median(values, group_ids, n_groups):
+    """Median per group (NaN diabaikan seperti pandas)"""
+    valid = group_ids >= 0
+    medians = pd.Series(values[valid]).groupby(group_ids[valid]).median()
+    return medians.reindex(range(n_groups)).to_numpy(dtype='float64')
+
+
+def _safe_divide(numerator, denominator):
+    result = np.full(np.shape(numerator), np.nan)
+    np.divide(numerator, denominator, out=result, where=denominator != 0)
+    return result
+
+
+def finalize_groups(agg, key_frame, medians=None):
+    """Bangun DataFrame hasil agregasi beserta ACV, SCORE dan TOTAL SCORE PPSA.
+
+    Kolom mengikuti nama hasil `groupby().agg()` yang di-flatten, misalnya
+    'PSM Target_sum', 'APC Target_mean', 'TOTAL SCORE PPSA_std'.
+    """
+    frame = key_frame.copy()
+    count = agg['count']
+    for col in SUM_MEASURES:
+        if col in agg:
+            frame[f'{col}_sum'] = agg[col]
+    for col in MEAN_MEASURES:
+        if col in agg:
+            frame[f'{col}_mean'] = _safe_divide(agg[col], count)
+    if STAT_MEASURE in agg:
+        frame[f'{STAT_MEASURE}_mean'] = _safe_divide(agg[STAT_MEASURE], count)
+        # Median tidak aditif; tanpa data baris kolom ini berisi NaN
+        frame[f'{STAT_MEASURE}_median'] = medians if medians is not None else np.nan
+        frame[f'{STAT_MEASURE}_std'] = np.sqrt(_safe_divide(agg['m2'], count - 1))
+    frame[f'{STAT_MEASURE}_count'] = count.astype('int64')
+
+    # Skor group dihitung dari total target/actual, bukan rata-rata skor baris
+    return add_aggregate_scores(frame, ' Target_sum', ' Actual_sum', 'APC Target_mean', 'APC Actual_mean')
+
+
+def grouped_scores(df, groupings):
+    """Hitung agregat + skor PPSA untuk beberapa grouping dalam satu kali jalan.
+
+    `groupings` adalah dict nama -> list kolom key. Measure diekstrak dari
+    `df` sekali dan hasil factorize key dipakai bersama antar grouping.
+    Kembalikan dict nama -> DataFrame (lihat `finalize_groups`).
+    """
+    measures = row_measures(df)
+    stat_values = measures.get(STAT_MEASURE)
+    cache = {}
+    results = {}
+    for name, keys in groupings.items():
+        group_ids, key_frame = group_codes(df, keys, cache)
+        agg = rollup(measures, group_ids, len(key_frame))
+        medians = grouped_median(stat_values, group_ids, len(key_frame)) if stat_values is not None else None
+        results[name] = finalize_groups(agg, key_frame, medians)
+    return results
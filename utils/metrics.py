@@ -0,0 +1,195 @@
+import bisect
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Batas bucket histogram dalam detik, dari operasi kolom (ms) sampai full reload Sheets (menit)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """Histogram durasi dengan bucket tetap, seperti tipe histogram Prometheus"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # bucket terakhir adalah +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Perkiraan kuantil dengan interpolasi linear di dalam bucket (seperti
+        histogram_quantile), dibatasi ke nilai minimum/maksimum yang teramati"""
+        if self.count == 0:
+            return math.nan
+        rank = q * self.count
+        cumulative = 0
+        estimate = self.max
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                if i < len(self.buckets):
+                    lower = self.buckets[i - 1] if i > 0 else 0.0
+                    estimate = lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+                break
+            cumulative += count
+        return min(max(estimate, self.min), self.max)
+
+
+class StageMetrics:
+    """Histogram durasi per tahap pipeline dan callback, per proses worker.
+
+    Tahap diberi nama bertitik, mis. `ingest.parse_dates`, `calculate.<fungsi>`,
+    `render.<fungsi>`, `callback.<tab>` dan `serialize.<tab>`. Selain histogram,
+    gauge bisa didaftarkan sebagai fungsi yang dibaca saat `/metrics` diminta.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, namespace='ppsa'):
+        self.buckets = tuple(buckets)
+        self.namespace = namespace
+        self._histograms = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def timed(self, prefix):
+        """Decorator: catat durasi setiap panggilan sebagai `<prefix>.<nama fungsi>`"""
+        def decorator(fn):
+            stage = f"{prefix}.{fn.__name__}"
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.time(stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def register_gauge(self, name, help_text, fn):
+        """`fn()` mengembalikan angka, atau dict {nilai label: angka} untuk label `key`"""
+        with self._lock:
+            self._gauges[name] = (help_text, fn)
+
+    def summary(self, quantiles=(0.5, 0.95, 0.99)):
+        """Satu dict per tahap: count, total dan kuantil dalam milidetik, urut nama tahap"""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            rows = []
+            for stage, histogram in histograms:
+                row = {'stage': stage, 'count': histogram.count, 'total_s': round(histogram.sum, 3)}
+                for q in quantiles:
+                    row[f'p{int(q * 100)}_ms'] = round(histogram.quantile(q) * 1000, 1)
+                rows.append(row)
+        return rows
+
+    def render_prometheus(self):
+        """Semua metric dalam format teks Prometheus (exposition format 0.0.4)"""
+        name = f"{self.namespace}_stage_duration_seconds"
+        lines = [f"# HELP {name} Durasi tahap pipeline dan callback dashboard.", f"# TYPE {name} histogram"]
+        with self._lock:
+            for stage, histogram in sorted(self._histograms.items()):
+                label = _escape_label(stage)
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{label}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stage="{label}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{stage="{label}"}} {histogram.sum:.6f}')
+                lines.append(f'{name}_count{{stage="{label}"}} {histogram.count}')
+            gauges = sorted(self._gauges.items())
+
+        for gauge_name, (help_text, fn) in gauges:
+            try:
+                value = fn()
+            except Exception:
+                continue
+            full_name = f"{self.namespace}_{gauge_name}"
+            lines += [f"# HELP {full_name} {help_text}", f"# TYPE {full_name} gauge"]
+            if isinstance(value, dict):
+                for key, item in sorted(value.items()):
+                    lines.append(f'{full_name}{{key="{_escape_label(str(key))}"}} {float(item):g}')
+            else:
+                lines.append(f"{full_name} {float(value):g}")
+        return '\n'.join(lines) + '\n'
+
+    def instrument_dash(self, server, metrics_path='/metrics'):
+        """Catat latency setiap callback Dash dan pasang endpoint Prometheus di server Flask.
+
+        `callback.<label>` adalah durasi seluruh request; jika callback mencatat
+        durasi handler-nya dengan `callback_timer()`, sisanya (serialisasi JSON
+        dan overhead Dash) dicatat sebagai `serialize.<label>`. Label default
+        adalah id output callback.
+        """
+        import flask
+
+        @server.before_request
+        def _start_timer():
+            if flask.request.path.endswith('/_dash-update-component'):
+                flask.g.metrics_started = time.perf_counter()
+
+        @server.after_request
+        def _record_latency(response):
+            started = flask.g.pop('metrics_started', None)
+            if started is None:
+                return response
+            total = time.perf_counter() - started
+            label = flask.g.pop('metrics_label', None)
+            if label is None:
+                body = flask.request.get_json(silent=True) or {}
+                # Multi-output berbentuk '..id.prop...id.prop..'; output pertama cukup sebagai label
+                label = body.get('output', 'unknown').strip('.').split('...')[0]
+            self.observe(f"callback.{label}", total)
+            handler = flask.g.pop('metrics_handler_seconds', None)
+            if handler is not None:
+                self.observe(f"serialize.{label}", max(total - handler, 0.0))
+            return response
+
+        @server.route(metrics_path)
+        def _metrics():
+            return flask.Response(self.render_prometheus(), mimetype=None,
+                                  headers={'Content-Type': PROMETHEUS_CONTENT_TYPE})
+
+    @contextmanager
+    def callback_timer(self, label):
+        """Dipakai di dalam callback Dash: beri label request dan ukur durasi handler"""
+        import flask
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if flask.has_request_context():
+                flask.g.metrics_label = label
+                flask.g.metrics_handler_seconds = time.perf_counter() - started
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Registry bersama untuk seluruh proses, seperti REGISTRY default prometheus_client
+METRICS = StageMetrics()
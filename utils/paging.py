@@ -0,0 +1,93 @@
+import math
+import operator
+import re
+
+import numpy as np
+import pandas as pd
+
+# Operator filter_query DataTable (bentuk kata dan simbol) dan padanannya
+FILTER_OPERATORS = {
+    'eq': '=', '=': '=', 'ne': '!=', '!=': '!=',
+    'lt': '<', '<': '<', 'le': '<=', '<=': '<=',
+    'gt': '>', '>': '>', 'ge': '>=', '>=': '>=',
+    'contains': 'contains', 'datestartswith': 'datestartswith',
+}
+
+OPERATOR_FUNCTIONS = {
+    '=': operator.eq, '!=': operator.ne, '<': operator.lt,
+    '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+}
+
+_FILTER_PART = re.compile(r'^\{(?P<column>.+?)\}\s+(?P<case>[si]?)(?P<operator>\S+)\s+(?P<value>.*)$')
+
+
+def split_filter_part(part):
+    """Pecah satu bagian filter_query, mis. '{TOTAL SCORE PPSA} > 100', menjadi
+    (kolom, operator, nilai, case_sensitive); None jika tidak dikenali"""
+    match = _FILTER_PART.match(part.strip())
+    if match is None or match.group('operator') not in FILTER_OPERATORS:
+        return None
+    op = FILTER_OPERATORS[match.group('operator')]
+    value = match.group('value').strip()
+    if len(value) >= 2 and value[0] in ('"', "'", '`') and value[-1] == value[0]:
+        value = value[1:-1].replace('\\' + value[0], value[0])
+    elif op not in ('contains', 'datestartswith'):
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+    return match.group('column'), op, value, match.group('case') != 'i'
+
+
+def apply_filter_query(df, filter_query):
+    """Terapkan filter_query DataTable (bagian digabung dengan '&&')"""
+    if not filter_query:
+        return df
+    mask = np.ones(len(df), dtype=bool)
+    for part in filter_query.split(' && '):
+        parsed = split_filter_part(part)
+        if parsed is None or parsed[0] not in df.columns:
+            continue
+        column, op, value, case_sensitive = parsed
+        series = df[column]
+        if op in ('contains', 'datestartswith'):
+            text = series.astype(str)
+            if op == 'contains':
+                matched = text.str.contains(str(value), case=case_sensitive, regex=False)
+            else:
+                matched = text.str.startswith(str(value))
+        else:
+            if not case_sensitive and isinstance(value, str) and op in ('=', '!='):
+                # Prefix 'i' (mis. 'i=' atau 'ieq'): bandingkan teks tanpa membedakan huruf besar/kecil
+                series, value = series.astype('string').str.casefold(), value.casefold()
+            try:
+                matched = OPERATOR_FUNCTIONS[op](series, value)
+            except (TypeError, ValueError):
+                # Perbandingan angka dengan kolom teks (atau sebaliknya) tidak cocok
+                matched = pd.Series(False, index=df.index)
+        mask &= matched.fillna(False).to_numpy(dtype=bool)
+    return df[mask]
+
+
+def sort_frame(df, sort_by):
+    """Urutkan sesuai sort_by DataTable; stable agar urutan awal tetap jadi tie-breaker"""
+    sort_by = [item for item in (sort_by or []) if item['column_id'] in df.columns]
+    if not sort_by:
+        return df
+    return df.sort_values(
+        [item['column_id'] for item in sort_by],
+        ascending=[item['direction'] == 'asc' for item in sort_by],
+        kind='stable',
+    )
+
+
+def page_records(df, page_current, page_size):
+    """Kembalikan (records untuk satu halaman, jumlah halaman)"""
+    page_size = max(1, page_size or 10)
+    page_count = max(1, math.ceil(len(df) / page_size))
+    page_current = min(page_current or 0, page_count - 1)
+    start = page_current * page_size
+    page = df.iloc[start:start + page_size]
+    # NA (mis. kolom nullable) tidak bisa di-serialize ke JSON
+    page = page.astype(object).where(page.notna(), None)
+    return page.to_dict('records'), page_count
@@ -0,0 +1,90 @@
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from utils.metrics import METRICS
+
+LOGGER_NAME = 'ppsa'
+
+
+class JsonFormatter(logging.Formatter):
+    """Satu baris JSON per record: waktu, level, event dan field tambahan dari `extra={'fields': ...}`"""
+
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'event': record.getMessage(),
+        }
+        payload.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            payload['error'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str, separators=(',', ':'))
+
+
+class TextFormatter(logging.Formatter):
+    """Format baris biasa untuk development: `event key=value ...`"""
+
+    def format(self, record):
+        fields = ' '.join(f"{key}={value}" for key, value in (getattr(record, 'fields', None) or {}).items())
+        line = f"[{record.levelname.lower()}] {record.getMessage()}" + (f" {fields}" if fields else '')
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+
+def configure_logging(level=None, fmt=None, stream=None):
+    """Pasang handler untuk logger `ppsa`.
+
+    LOG_LEVEL (default INFO) mengatur detail: DEBUG menampilkan sample data
+    dan mapping per kolom, WARNING adalah mode produksi yang senyap (hanya
+    peringatan dan error). LOG_FORMAT `json` (default) atau `text`.
+    """
+    level = (level or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+    fmt = (fmt or os.environ.get('LOG_FORMAT', 'json')).lower()
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(getattr(logging, level, logging.INFO))
+    logger.propagate = False
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(TextFormatter() if fmt == 'text' else JsonFormatter())
+    logger.addHandler(handler)
+    return logger
+
+
+def get_logger(name='pipeline'):
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def log_event(logger, event, level=logging.INFO, exc_info=False, **fields):
+    """Log satu event terstruktur; field tidak diformat jika level tidak aktif"""
+    if logger.isEnabledFor(level):
+        logger.log(level, event, exc_info=exc_info, extra={'fields': fields})
+
+
+@contextmanager
+def pipeline_stage(logger, stage, level=logging.INFO, **fields):
+    """Ukur satu tahap pipeline: durasi masuk histogram METRICS dan satu event log.
+
+    Yield dict field yang boleh ditambah di dalam blok (jumlah baris, kegagalan
+    parsing, ...). Jika blok gagal, event dicatat sebagai error lalu exception
+    diteruskan.
+    """
+    started = time.perf_counter()
+    try:
+        yield fields
+    except Exception as e:
+        duration = time.perf_counter() - started
+        METRICS.observe(stage, duration)
+        log_event(logger, stage, logging.ERROR, exc_info=True, status='error',
+                  duration_ms=round(duration * 1000, 1), error_message=str(e), **fields)
+        raise
+    duration = time.perf_counter() - started
+    METRICS.observe(stage, duration)
+    log_event(logger, stage, level, **fields, duration_ms=round(duration * 1000, 1))
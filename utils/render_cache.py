@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+
+from utils.singleflight import SingleFlight
+
+
+class RenderCache:
+    """Cache LRU untuk komponen tab yang sudah dirender.
+
+    Key berupa tuple (tab_id, versi snapshot, parameter filter). Begitu entry
+    dengan versi snapshot yang lebih baru disimpan, semua entry versi lama
+    dibuang karena datanya sudah tidak berlaku.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._latest_version = None
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        version = key[1]
+        with self._lock:
+            if self._latest_version is None or version > self._latest_version:
+                self._latest_version = version
+                for old_key in [k for k in self._entries if k[1] < version]:
+                    del self._entries[old_key]
+            elif version < self._latest_version:
+                # Render yang selesai setelah snapshot berganti tidak perlu disimpan
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_render(self, key, render):
+        """Ambil dari cache; pada miss, render yang sama hanya dijalankan sekali
+        walaupun banyak request datang bersamaan"""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        return self._flights.do(key, lambda: self._render_and_store(key, render))
+
+    def _render_and_store(self, key, render):
+        # Request sebelumnya mungkin sudah selesai merender saat kita menunggu lock
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+        value = render()
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                     'max_entries': self.max_entries}
+        stats.update(self._flights.stats())
+        return stats
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Dimensi dengan kardinalitas rendah yang disimpan sebagai categorical
+DIMENSION_COLUMNS = ['STORE', 'SHIFT', 'NAMA KASIR', 'HARI', 'BULAN']
+
+# Kolom hasil process_data(); kolom mentah lain dari sheet dibuang setelah
+# distandarisasi
+PROCESSED_COLUMNS = [
+    'STORE', 'TANGGAL', 'HARI', 'BULAN', 'MINGGU', 'SHIFT', 'NAMA KASIR',
+    'PSM Target', 'PSM Actual', 'BOBOT PSM',
+    'PWP Target', 'PWP Actual', 'BOBOT PWP',
+    'SG Target', 'SG Actual', 'BOBOT SG',
+    'APC Target', 'APC Actual', 'BOBOT APC',
+    'TARGET TEBUS 2500', 'ACTUAL TEBUS 2500',
+    '(%) PSM ACV', '(%) PWP ACV', '(%) SG ACV', '(%) APC ACV', '(%) ACV TEBUS 2500',
+    'SCORE PSM', 'SCORE PWP', 'SCORE SG', 'SCORE APC', 'TOTAL SCORE PPSA',
+]
+
+
+def to_sorted_categorical(series):
+    """Categorical dengan kategori terurut, sehingga urutan codes sama dengan urutan nilainya"""
+    categorical = series.astype('category')
+    return categorical.cat.reorder_categories(categorical.cat.categories.sort_values())
+
+
+def downcast_float(series):
+    """float32 jika semua nilai bisa bolak-balik tanpa perubahan, selain itu tetap"""
+    if series.dtype != 'float64':
+        return series
+    values = series.to_numpy()
+    narrowed = values.astype('float32')
+    if np.array_equal(narrowed.astype('float64'), values, equal_nan=True):
+        return pd.Series(narrowed, index=series.index, name=series.name)
+    return series
+
+
+def compact_frame(df):
+    """Buang kolom mentah, ubah dimensi ke categorical dan perkecil kolom measure"""
+    columns = {}
+    # Kolom dibaca satu per satu; df[[...]] akan menyalin semua kolom sekali lagi
+    for col in (col for col in PROCESSED_COLUMNS if col in df.columns):
+        if col in DIMENSION_COLUMNS:
+            columns[col] = to_sorted_categorical(df[col])
+        else:
+            columns[col] = downcast_float(df[col])
+    return pd.DataFrame(columns, index=df.index)
+
+
+def concat_frames(frames):
+    """pd.concat yang mempertahankan kolom categorical walau kategorinya berbeda"""
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+
+    aligned = [frame.copy(deep=False) for frame in frames]
+    for col in DIMENSION_COLUMNS:
+        if not all(col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype)
+                   for frame in aligned):
+            continue
+        categories = union_categoricals([frame[col].array for frame in aligned]).categories
+        for frame in aligned:
+            frame[col] = frame[col].cat.set_categories(categories.sort_values())
+    return pd.concat(aligned)
+
+
+def memory_report(before, after):
+    """Bytes per kolom sebelum dan sesudah compact_frame(), diurutkan dari penghematan terbesar"""
+    before_bytes = before.memory_usage(index=False, deep=True)
+    after_bytes = after.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        'before_dtype': before.dtypes.astype(str),
+        'before_bytes': before_bytes,
+        'after_dtype': after.dtypes.astype(str).reindex(before.columns, fill_value='(dropped)'),
+        'after_bytes': after_bytes.reindex(before.columns, fill_value=0),
+    })
+    report.index.name = 'column'
+    report['saved_bytes'] = report['before_bytes'] - report['after_bytes']
+    return report.sort_values('saved_bytes', ascending=False).reset_index()
+
+
+def expanded_frame(df):
+    """Kebalikan compact_frame(): categorical menjadi string, float32 menjadi float64"""
+    columns = {}
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            columns[col] = df[col].astype(dtype.categories.dtype)
+        elif dtype == 'float32':
+            columns[col] = df[col].astype('float64')
+        else:
+            columns[col] = df[col]
+    return pd.DataFrame(columns, index=df.index)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+# Bobot standar PPSA untuk score agregat (per kasir, shift, hari, dst)
+PPSA_WEIGHTS = {'PSM': 20, 'PWP': 25, 'SG': 30, 'APC': 25}
+PPSA_COMPONENTS = ['PSM', 'PWP', 'SG', 'APC']
+
+
+def calculate_acv(actual, target):
+    """ACV (%) = actual / target * 100, bernilai 0 jika target == 0"""
+    actual = np.asarray(actual, dtype='float64')
+    target = np.asarray(target, dtype='float64')
+    ratio = np.zeros(np.broadcast(actual, target).shape, dtype='float64')
+    np.divide(actual, target, out=ratio, where=target != 0)
+    return ratio * 100
+
+
+def score_components(targets, actuals, weights=None):
+    """Hitung ACV, score berbobot dan total PPSA untuk banyak baris sekaligus.
+
+    `targets` dan `actuals` adalah dict komponen -> array. `weights` boleh berisi
+    angka tetap (agregat) atau array per baris (kolom BOBOT). Komponen yang tidak
+    ada di `targets` dilewati. Kembalikan dict dengan key 'acv', 'score' (dict
+    komponen -> array) dan 'total'.
+    """
+    weights = PPSA_WEIGHTS if weights is None else weights
+    result = {'acv': {}, 'score': {}, 'total': None}
+    for comp in PPSA_COMPONENTS:
+        if comp not in targets or comp not in actuals:
+            continue
+        acv = calculate_acv(actuals[comp], targets[comp])
+        result['acv'][comp] = acv
+        result['score'][comp] = (acv * np.asarray(weights[comp], dtype='float64')) / 100
+
+    scores = list(result['score'].values())
+    result['total'] = np.sum(scores, axis=0) if scores else None
+    return result
+
+
+def add_aggregate_scores(frame, target_suffix, actual_suffix, apc_target, apc_actual,
+                         acv_name='ACV {comp} (%)'):
+    """Tambahkan kolom ACV, SCORE dan TOTAL SCORE PPSA ke hasil agregasi.
+
+    PSM/PWP/SG memakai kolom `'{comp}{target_suffix}'`, APC memakai
+    `apc_target`/`apc_actual` (rata-rata). Kolom yang tidak tersedia dilewati.
+    """
+    targets, actuals = {}, {}
+    for comp in PPSA_COMPONENTS:
+        if comp == 'APC':
+            target_col, actual_col = apc_target, apc_actual
+        else:
+            target_col, actual_col = f'{comp}{target_suffix}', f'{comp}{actual_suffix}'
+        if target_col in frame.columns and actual_col in frame.columns:
+            targets[comp] = frame[target_col].to_numpy()
+            actuals[comp] = frame[actual_col].to_numpy()
+
+    scored = score_components(targets, actuals)
+    for comp in scored['score']:
+        if acv_name:
+            frame[acv_name.format(comp=comp)] = scored['acv'][comp]
+        frame[f'SCORE {comp}'] = scored['score'][comp]
+    if scored['total'] is not None:
+        frame['TOTAL SCORE PPSA'] = scored['total']
+    return frame
+
+
+def tebus_acv(frame, actual_col='ACTUAL TEBUS 2500_sum', target_col='TARGET TEBUS 2500_sum'):
+    """ACV Tebus (%) per baris hasil agregasi"""
+    return pd.Series(calculate_acv(frame[actual_col], frame[target_col]), index=frame.index)
@@ -0,0 +1,127 @@
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: tidak ada flock, setiap proses menjadi leader
+    fcntl = None
+
+from utils.pipeline_log import get_logger, log_event
+from utils.snapshot_cache import load_snapshot, read_current_name, read_status, save_snapshot, write_status
+
+LOCK_FILE = 'refresh.lock'
+
+logger = get_logger('snapshot')
+
+
+class SnapshotCoordinator:
+    """Bagikan satu snapshot read-only ke semua worker gunicorn lewat mmap.
+
+    Hanya satu proses (leader, pemegang `flock` pada `refresh.lock`) yang
+    mengambil data dari Google Sheets dan menulis snapshot ke `cache_dir`.
+    Worker lain (follower) hanya memantau pointer CURRENT dan me-load snapshot
+    baru secara memory-mapped, sehingga halaman data dipakai bersama lewat
+    page cache OS. Jika leader mati, lock terlepas dan salah satu follower
+    mengambil alih pada polling berikutnya lalu memanggil `on_leader(meta)`.
+    """
+
+    def __init__(self, store, cache_dir, fingerprint, poll_seconds=5, on_leader=None):
+        self.store = store
+        self.cache_dir = cache_dir
+        self.fingerprint = fingerprint
+        self.poll_seconds = poll_seconds
+        self.on_leader = on_leader
+        self.is_leader = False
+        self.current_name = None
+        self.last_meta = None
+        self._lock_file = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def try_acquire_leadership(self):
+        """Coba ambil lock refresh tanpa blocking; kembalikan True jika proses ini leader"""
+        if self.is_leader:
+            return True
+        if fcntl is None:
+            self.is_leader = True
+            return True
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        lock_file = open(os.path.join(self.cache_dir, LOCK_FILE), 'a')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # File harus tetap terbuka selama proses hidup agar lock tidak terlepas
+        self._lock_file = lock_file
+        self.is_leader = True
+        return True
+
+    def sync_from_disk(self):
+        """Load snapshot terbaru di disk jika pointer CURRENT berubah.
+
+        Kembalikan metadata snapshot yang dipasang, atau None jika tidak ada
+        snapshot baru yang valid.
+        """
+        name = read_current_name(self.cache_dir)
+        if name is None or name == self.current_name:
+            return None
+        processed_df, meta = load_snapshot(self.cache_dir, self.fingerprint, name)
+        if processed_df is None:
+            return None
+
+        self.current_name = name
+        self.last_meta = meta
+        self.store.swap(processed_df, version=meta.get('version'))
+        return meta
+
+    def publish(self, snapshot, reader_state=None):
+        """Tulis snapshot leader ke disk agar bisa di-load oleh worker lain"""
+        if snapshot.processed_df.empty:
+            return None
+        name = save_snapshot(snapshot.processed_df, self.cache_dir, self.fingerprint,
+                             reader_state=reader_state, version=snapshot.version)
+        self.current_name = name
+        return name
+
+    def publish_status(self, state, error=None, version=None):
+        """Leader: tulis status refresh ('loading' atau 'done') agar follower menampilkan hal yang sama"""
+        write_status(self.cache_dir, {'fingerprint': self.fingerprint, 'state': state, 'error': error,
+                                      'version': version, 'pid': os.getpid(), 'updated_at': time.time()})
+
+    def read_status(self):
+        """Status refresh terakhir dari leader untuk sumber data yang sama, atau None"""
+        status = read_status(self.cache_dir)
+        if status is None or status.get('fingerprint') != self.fingerprint:
+            return None
+        return status
+
+    def _poll(self):
+        while not self._stop_event.wait(self.poll_seconds):
+            if self.is_leader:
+                continue
+            try:
+                meta = self.sync_from_disk()
+                if meta is not None:
+                    log_event(logger, 'snapshot.sync', version=meta.get('version'), rows=meta.get('row_count'),
+                              copied_columns=meta.get('copied_columns'))
+                if self.try_acquire_leadership():
+                    log_event(logger, 'snapshot.leader', pid=os.getpid(), takeover=True)
+                    if self.on_leader is not None:
+                        self.on_leader(self.last_meta)
+            except Exception as e:
+                log_event(logger, 'snapshot.sync', logging.ERROR, exc_info=True, status='error',
+                          error_message=str(e))
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._poll, name="snapshot-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import logging
+
+import pandas as pd
+
+from utils.metrics import METRICS
+from utils.pipeline_log import get_logger, log_event
+from utils.sheets_api import column_letter
+
+logger = get_logger('pipeline')
+
+
+class IncrementalSheetReader:
+    """Baca worksheet append-only secara incremental.
+
+    Reader mengingat jumlah baris yang sudah dibaca dan checksum dari header
+    plus `tail_rows` baris terakhir. Pada fetch berikutnya hanya range baru yang
+    diminta; jika checksum tail berubah (ada baris lama yang diedit) atau sudah
+    `full_reload_every` kali fetch incremental, reader kembali ke full reload.
+
+    `select_columns(header)` mengembalikan nama kolom yang dipakai pipeline.
+    Jika diisi, full load membaca baris header lebih dulu lalu hanya mengambil
+    blok kolom tersebut dalam satu request batchGet; kolom lain tidak pernah
+    diunduh. Jika tidak ada kolom yang cocok, semua kolom diambil.
+    """
+
+    def __init__(self, tail_rows=20, full_reload_every=12, select_columns=None):
+        self.tail_rows = tail_rows
+        self.full_reload_every = full_reload_every
+        self.select_columns = select_columns
+        self.reset()
+
+    def reset(self):
+        self.header = None
+        self.row_count = 0  # Jumlah baris sheet yang sudah dibaca, termasuk header
+        self.tail_checksum = None
+        self.incremental_fetches = 0
+        self.columns = []  # Posisi kolom header yang diambil, urut dari kiri
+        self.blocks = []   # Kolom yang bersebelahan digabung: [(awal, akhir)] inklusif
+
+    def _set_header(self, header):
+        self.header = header
+        wanted = set(self.select_columns(header)) if self.select_columns is not None and header else set()
+        self.columns = [i for i, name in enumerate(header or []) if name in wanted] or list(range(len(header or [])))
+        self.blocks = []
+        for col in self.columns:
+            if self.blocks and self.blocks[-1][1] == col - 1:
+                self.blocks[-1] = (self.blocks[-1][0], col)
+            else:
+                self.blocks.append((col, col))
+
+    @property
+    def column_names(self):
+        return [self.header[i] for i in self.columns]
+
+    def export_state(self):
+        return {'header': self.header, 'row_count': self.row_count, 'tail_checksum': self.tail_checksum}
+
+    def restore_state(self, state):
+        """Pulihkan state dari cache agar fetch berikutnya bisa langsung incremental"""
+        self.reset()
+        if state:
+            self._set_header(state.get('header'))
+            self.row_count = state.get('row_count', 0)
+            self.tail_checksum = state.get('tail_checksum')
+
+    @property
+    def has_state(self):
+        return self.header is not None and self.row_count > 1
+
+    def _pad(self, rows, width=None):
+        width = len(self.columns) if width is None else width
+        # Baris yang sudah selebar blok dipakai apa adanya, tidak disalin
+        return [row if len(row) == width else (list(row) + [''] * width)[:width] for row in rows]
+
+    def _block_ranges(self, first_row, last_row=''):
+        return [f"{column_letter(start + 1)}{first_row}:{column_letter(end + 1)}{last_row}"
+                for start, end in self.blocks]
+
+    def _merge(self, block_values):
+        """Gabungkan hasil per blok kolom menjadi baris dengan lebar len(self.columns).
+
+        Sheets API memotong sel kosong di ujung baris dan baris kosong di akhir
+        setiap range, jadi panjang tiap blok bisa berbeda; blok yang lebih pendek
+        diisi string kosong.
+        """
+        if len(block_values) == 1:
+            return self._pad(block_values[0])
+        row_count = max((len(values) for values in block_values), default=0)
+        rows = [[] for _ in range(row_count)]
+        for (start, end), values in zip(self.blocks, block_values):
+            width = end - start + 1
+            padded = self._pad(values, width) + [[''] * width] * (row_count - len(values))
+            for row, cells in zip(rows, padded):
+                row.extend(cells)
+        return rows
+
+    def _checksum(self, header, tail):
+        payload = json.dumps([header, tail], ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _tail_start(self):
+        return max(2, self.row_count - self.tail_rows + 1)
+
+    def _to_frame(self, rows, first_row_number):
+        # Index mengikuti posisi baris data di sheet agar append tetap konsisten
+        start = first_row_number - 2
+        with METRICS.time('ingest.dataframe'):
+            return pd.DataFrame(rows, columns=self.column_names, index=pd.RangeIndex(start, start + len(rows)))
+
+    def fetch_full(self, worksheet):
+        """Ambil worksheet (hanya kolom terpilih) dan simpan state untuk fetch incremental"""
+        self.reset()
+        if self.select_columns is None:
+            data = worksheet.get_all_values()
+            self._set_header(list(data[0]) if data else [])
+            rows = self._pad(data[1:])
+        else:
+            header_range, = worksheet.batch_get(['1:1'])
+            self._set_header(list(header_range[0]) if header_range else [])
+            rows = self._merge(worksheet.batch_get(self._block_ranges(2))) if self.header else []
+        if not rows:
+            self.reset()
+            return pd.DataFrame()
+
+        self.row_count = len(rows) + 1
+        tail = rows[self._tail_start() - 2:]
+        self.tail_checksum = self._checksum(self.header, tail)
+        return self._to_frame(rows, 2)
+
+    def fetch(self, worksheet, incremental=True):
+        """Kembalikan tuple (mode, DataFrame) dengan mode 'full', 'append' atau 'unchanged'"""
+        if (not incremental or not self.has_state
+                or self.incremental_fetches >= self.full_reload_every):
+            return 'full', self.fetch_full(worksheet)
+
+        tail_start = self._tail_start()
+        header_range, *block_values = worksheet.batch_get(
+            ['1:1'] + self._block_ranges(tail_start, self.row_count) + self._block_ranges(self.row_count + 1))
+        tail_values, new_values = block_values[:len(self.blocks)], block_values[len(self.blocks):]
+
+        header = list(header_range[0]) if header_range else []
+        # Sheets API memotong sel kosong di ujung baris; header yang lebih panjang
+        # berarti ada kolom baru di kanan
+        header += [''] * (len(self.header) - len(header))
+        tail = self._merge(tail_values)
+        if header != self.header or self._checksum(self.header, tail) != self.tail_checksum:
+            log_event(logger, 'ingest.full_reload', logging.WARNING, message="Data lama di sheet berubah",
+                      header_changed=header != self.header)
+            return 'full', self.fetch_full(worksheet)
+
+        self.incremental_fetches += 1
+        new_rows = self._merge(new_values)
+        if not new_rows:
+            return 'unchanged', pd.DataFrame()
+
+        first_new_row = self.row_count + 1
+        self.row_count += len(new_rows)
+        tail = self._pad((tail + new_rows)[-(self.row_count - self._tail_start() + 1):])
+        self.tail_checksum = self._checksum(self.header, tail)
+        return 'append', self._to_frame(new_rows, first_new_row)
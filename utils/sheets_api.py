@@ -0,0 +1,314 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.metrics import METRICS
+from utils.pipeline_log import get_logger, log_event
+
+DEFAULT_BASE_URL = 'https://sheets.googleapis.com/v4'
+
+# Status yang layak dicoba ulang: kuota per menit habis dan error sementara di server
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+logger = get_logger('sheets')
+
+
+class SheetsApiError(Exception):
+    """Request Sheets API gagal; `status` None jika gagal sebelum ada response"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class RequestBudgetExceeded(SheetsApiError):
+    """Budget request per proses habis dan tidak pulih dalam waktu tunggu maksimum"""
+
+
+class RequestBudget:
+    """Token bucket untuk membatasi request Sheets API per proses.
+
+    Bucket berisi `requests_per_minute` token dan terisi kembali secara
+    merata. `acquire()` menunggu token berikutnya selama paling lama
+    `max_wait` detik; jika lebih lama, RequestBudgetExceeded dinaikkan agar
+    refresh gagal cepat dan snapshot lama tetap dipakai.
+    """
+
+    def __init__(self, requests_per_minute=50, max_wait=30.0, clock=time.monotonic, sleep=time.sleep):
+        self.capacity = max(1, requests_per_minute)
+        self.rate = self.capacity / 60.0
+        self.max_wait = max_wait
+        self.acquired = 0
+        self.waited_seconds = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        with self._lock:
+            self._refill()
+            wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+            if wait > self.max_wait:
+                raise RequestBudgetExceeded(
+                    f"Budget {self.capacity} request/menit habis (perlu menunggu {wait:.0f}s)", status=429)
+            # Token dipesan sekarang agar thread lain antre di belakangnya
+            self._tokens -= 1
+            self.acquired += 1
+            self.waited_seconds += wait
+        if wait > 0:
+            self._sleep(wait)
+
+    def stats(self):
+        with self._lock:
+            self._refill()
+            return {
+                'requests_per_minute': self.capacity,
+                'available': round(max(self._tokens, 0.0), 1),
+                'acquired': self.acquired,
+                'waited_seconds': round(self.waited_seconds, 1),
+            }
+
+
+def backoff_delay(attempt, base=1.0, cap=32.0, rng=random):
+    """Exponential backoff dengan full jitter: acak antara 0 dan min(cap, base * 2^attempt)"""
+    return rng.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def create_pooled_session(pool_size=10):
+    """requests.Session dengan pool koneksi keep-alive untuk dipakai ulang antar refresh"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def connection_stats(session):
+    """Jumlah koneksi baru dibanding request yang dikirim lewat pool urllib3 milik session"""
+    opened = sent = 0
+    for adapter in set(session.adapters.values()):
+        pools = getattr(getattr(adapter, 'poolmanager', None), 'pools', None)
+        if pools is None:
+            continue
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                sent += pool.num_requests
+    return {'connections_opened': opened, 'connections_reused': max(sent - opened, 0)}
+
+
+def quote_sheet_title(title):
+    """Nama worksheet dalam notasi A1, mis. Sheet 1 -> 'Sheet 1'"""
+    return "'" + title.replace("'", "''") + "'"
+
+
+def column_letter(col):
+    """Nomor kolom (mulai 1) ke huruf kolom A1, mis. 1 -> A, 28 -> AB"""
+    letters = ''
+    while col > 0:
+        col, remainder = divmod(col - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def column_number(letters):
+    """Kebalikan column_letter(): AB -> 28"""
+    col = 0
+    for char in letters.upper():
+        col = col * 26 + ord(char) - ord('A') + 1
+    return col
+
+
+class SheetsApiClient:
+    """Client tipis untuk endpoint values Sheets API v4 di atas requests.Session.
+
+    Client dibuat sekali per worker: session (lihat `create_pooled_session()`)
+    menjaga koneksi keep-alive, dan access token dari `credentials` hanya
+    di-refresh jika sisa masa berlakunya kurang dari `token_refresh_margin`
+    detik. Tanpa credentials request dikirim tanpa autentikasi, untuk fake
+    server lokal (lihat `base_url`). Setiap request melewati budget per proses
+    dan dicoba ulang dengan backoff ber-jitter untuk status 429/5xx dan error
+    koneksi.
+    """
+
+    def __init__(self, session, base_url=DEFAULT_BASE_URL, budget=None, max_retries=5,
+                 backoff_base=1.0, backoff_cap=32.0, timeout=60, sleep=time.sleep,
+                 credentials=None, token_refresh_margin=300):
+        self.session = session
+        self.base_url = base_url.rstrip('/')
+        self.budget = budget
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.credentials = credentials
+        self.token_refresh_margin = timedelta(seconds=token_refresh_margin)
+        self.requests = 0
+        self.retries = 0
+        self.token_refreshes = 0
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._auth_request = None
+        self._auth_errors = ()
+        self._auth_transport_error = None
+        if credentials is not None:
+            # google-auth hanya dibutuhkan saat refresh, tidak ikut dimuat saat startup.
+            # Token endpoint juga lewat session yang sama sehingga ikut memakai pool koneksi
+            from google.auth.exceptions import RefreshError, TransportError
+            from google.auth.transport.requests import Request as AuthRequest
+            self._auth_request = AuthRequest(session)
+            self._auth_errors = (TransportError, RefreshError)
+            self._auth_transport_error = TransportError
+        self._token_lock = threading.Lock()
+
+    def _retry_delay(self, attempt, response):
+        delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.backoff_cap))
+            except ValueError:
+                pass
+        return delay
+
+    def _token_expiring(self):
+        if self.credentials.token is None or self.credentials.expiry is None:
+            return self.credentials.token is None
+        # expiry milik google-auth berupa datetime UTC tanpa timezone
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return self.credentials.expiry - now < self.token_refresh_margin
+
+    def _auth_headers(self):
+        if self.credentials is None:
+            return None
+        # Satu lock agar thread fetch toko yang berjalan bersamaan tidak refresh bersamaan
+        with self._token_lock:
+            if self._token_expiring():
+                self.credentials.refresh(self._auth_request)
+                self.token_refreshes += 1
+            headers = {}
+            self.credentials.apply(headers)
+        return headers
+
+    def request(self, method, path, params=None):
+        """Kirim request dan kembalikan body JSON; SheetsApiError jika tetap gagal"""
+        url = f"{self.base_url}/{path}"
+        for attempt in range(self.max_retries + 1):
+            if self.budget is not None:
+                self.budget.acquire()
+            with self._lock:
+                self.requests += 1
+
+            response = None
+            try:
+                response = self.session.request(method, url, params=params, headers=self._auth_headers(),
+                                                timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = SheetsApiError(f"{method} {path} gagal: {e}")
+            except self._auth_errors as e:
+                # Gangguan jaringan ke token endpoint (TransportError) atau refresh yang ditandai
+                # retryable diperlakukan seperti error koneksi; credentials yang ditolak tidak dicoba ulang
+                error = SheetsApiError(f"Refresh token untuk {method} {path} gagal: {e}")
+                if not isinstance(e, self._auth_transport_error) and not e.retryable:
+                    raise error from e
+            else:
+                if response.status_code < 400:
+                    return response.json()
+                error = SheetsApiError(
+                    f"{method} {path} -> HTTP {response.status_code}: {response.text[:200]}",
+                    status=response.status_code)
+                if response.status_code not in RETRY_STATUSES:
+                    raise error
+
+            if attempt == self.max_retries:
+                raise error
+            delay = self._retry_delay(attempt, response)
+            with self._lock:
+                self.retries += 1
+            log_event(logger, 'sheets.retry', logging.WARNING, status=error.status, error_message=str(error),
+                      delay_s=round(delay, 2), attempt=attempt + 1, max_retries=self.max_retries)
+            self._sleep(delay)
+
+    def values_batch_get(self, spreadsheet_id, ranges):
+        """Ambil beberapa range (boleh dari worksheet berbeda) dalam satu request.
+
+        Kembalikan list baris per range dengan urutan yang sama dengan `ranges`.
+        """
+        with METRICS.time('ingest.fetch'):
+            body = self.request('GET', f"spreadsheets/{quote(spreadsheet_id, safe='')}/values:batchGet",
+                                params=[('ranges', a1_range) for a1_range in ranges])
+        value_ranges = body.get('valueRanges', [])
+        return [value_range.get('values', []) for value_range in value_ranges]
+
+    def sheet_titles(self, spreadsheet_id):
+        """Nama semua worksheet sesuai urutan tab"""
+        body = self.request('GET', f"spreadsheets/{quote(spreadsheet_id, safe='')}",
+                            params={'fields': 'sheets.properties.title'})
+        return [sheet['properties']['title'] for sheet in body.get('sheets', [])]
+
+    def stats(self):
+        with self._lock:
+            stats = {'requests': self.requests, 'retries': self.retries, 'token_refreshes': self.token_refreshes}
+        stats.update(connection_stats(self.session))
+        if self.budget is not None:
+            stats['budget'] = self.budget.stats()
+        return stats
+
+
+class SheetsWorksheet:
+    """Worksheet berbasis values:batchGet dengan interface yang dipakai IncrementalSheetReader.
+
+    Membuka worksheet tidak memerlukan request; nama worksheet baru dicek saat
+    request pertama. Jika nama tidak ditemukan, worksheet pertama dipakai,
+    sama seperti perilaku gspread sebelumnya.
+    """
+
+    def __init__(self, client, spreadsheet_id, title=None):
+        self.client = client
+        self.spreadsheet_id = spreadsheet_id
+        self.title = title
+        self._resolved = False
+
+    def _resolve_title(self):
+        titles = self.client.sheet_titles(self.spreadsheet_id)
+        if not titles:
+            raise SheetsApiError(f"Spreadsheet {self.spreadsheet_id} tidak punya worksheet")
+        if self.title not in titles:
+            log_event(logger, 'sheets.worksheet', logging.WARNING, spreadsheet_id=self.spreadsheet_id,
+                      message="Worksheet tidak ditemukan, menggunakan worksheet pertama",
+                      worksheet=self.title, fallback=titles[0])
+            self.title = titles[0]
+        self._resolved = True
+
+    def _qualify(self, a1_range):
+        sheet = quote_sheet_title(self.title)
+        return f"{sheet}!{a1_range}" if a1_range else sheet
+
+    def batch_get(self, ranges):
+        if not self.title:
+            self._resolve_title()
+        try:
+            return self.client.values_batch_get(self.spreadsheet_id, [self._qualify(r) for r in ranges])
+        except SheetsApiError as e:
+            # Nama worksheet yang salah dilaporkan sebagai range yang tidak valid (400)
+            if e.status != 400 or self._resolved:
+                raise
+            self._resolve_title()
+            return self.client.values_batch_get(self.spreadsheet_id, [self._qualify(r) for r in ranges])
+
+    def get_all_values(self):
+        return self.batch_get([''])[0]
@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+
+import pandas as pd
+
+from utils.cube import build_aggregate_cube
+from utils.pipeline_log import get_logger, log_event
+from utils.snapshot_index import SnapshotIndex, sort_by_date
+
+logger = get_logger('snapshot')
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """Immutable hasil proses data yang dibaca oleh semua fungsi render"""
+    processed_df: pd.DataFrame = field(default_factory=pd.DataFrame)
+    # Cube tanggal x toko x shift x kasir yang dibangun sekali per refresh
+    cube: pd.DataFrame = field(default_factory=pd.DataFrame)
+    version: int = 0
+    loaded_at: datetime = None
+    # Index TANGGAL/shift/kasir untuk filter; None pada snapshot hasil filter
+    index: SnapshotIndex = None
+
+    @property
+    def empty(self):
+        return self.processed_df.empty
+
+    def filtered(self, snapshot_filter):
+        """Snapshot dengan baris dan sel cube yang lolos filter (versi tetap sama)"""
+        if snapshot_filter is None or snapshot_filter.empty or self.empty:
+            return self
+        positions = self.index.positions(snapshot_filter)
+        cube = self.cube[snapshot_filter.cube_mask(self.cube)] if not self.cube.empty else self.cube
+        return replace(self, processed_df=self.processed_df.iloc[positions], cube=cube, index=None)
+
+
+class SnapshotStore:
+    """Menyimpan snapshot aktif; pergantian snapshot bersifat atomic"""
+
+    def __init__(self, initial=None):
+        self._lock = threading.Lock()
+        self._snapshot = initial if initial is not None else DataSnapshot()
+
+    def get(self):
+        # Pembacaan satu referensi atribut sudah atomic, tidak perlu lock
+        return self._snapshot
+
+    def swap(self, processed_df, version=None):
+        """Bangun struktur turunan, pasang snapshot baru dan kembalikan snapshot tersebut.
+
+        `version` dipakai saat snapshot berasal dari proses lain (lihat
+        `utils.shared_snapshot`) agar semua worker memakai nomor versi yang sama.
+        """
+        processed_df = sort_by_date(processed_df)
+        cube = build_aggregate_cube(processed_df)
+        index = SnapshotIndex(processed_df)
+        with self._lock:
+            if version is None:
+                version = self._snapshot.version + 1
+            snapshot = DataSnapshot(
+                processed_df=processed_df,
+                cube=cube,
+                version=version,
+                loaded_at=datetime.now(),
+                index=index,
+            )
+            self._snapshot = snapshot
+        return snapshot
+
+
+class BackgroundRefresher:
+    """Thread daemon yang memanggil loader secara periodik di luar request path.
+
+    `loader` harus mengembalikan DataFrame hasil `process_data()`. Jika loader
+    gagal atau mengembalikan DataFrame kosong, snapshot terakhir tetap dipakai.
+    `on_finish(refresher)` dipanggil setelah setiap refresh, berhasil atau tidak.
+    """
+
+    def __init__(self, store, loader, interval_seconds, on_swap=None, on_finish=None):
+        self.store = store
+        self.loader = loader
+        self.interval_seconds = interval_seconds
+        self.on_swap = on_swap
+        self.on_finish = on_finish
+        self.last_error = None
+        self.last_attempt_at = None
+        # Diisi setelah refresh pertama selesai (berhasil atau tidak), untuk status "memuat data"
+        self.last_finished_at = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def refresh_once(self):
+        self.last_attempt_at = datetime.now()
+        try:
+            return self._refresh()
+        finally:
+            self.last_finished_at = datetime.now()
+            if self.on_finish is not None:
+                try:
+                    self.on_finish(self)
+                except Exception as e:
+                    log_event(logger, 'snapshot.on_finish', logging.WARNING, exc_info=True, error_message=str(e))
+
+    def _refresh(self):
+        started = time.monotonic()
+        try:
+            processed_df = self.loader()
+        except Exception as e:
+            self.last_error = str(e)
+            log_event(logger, 'snapshot.refresh', logging.ERROR, exc_info=True, status='error',
+                      message="Refresh data gagal, tetap memakai snapshot terakhir", error_message=str(e))
+            return None
+
+        if processed_df is None or processed_df.empty:
+            self.last_error = "Loader mengembalikan data kosong"
+            log_event(logger, 'snapshot.refresh', logging.WARNING, status='empty',
+                      message="Refresh menghasilkan data kosong, tetap memakai snapshot terakhir")
+            return None
+
+        self.last_error = None
+        if processed_df is self.store.get().processed_df:
+            # Loader tidak menemukan perubahan, versi snapshot tidak perlu naik
+            log_event(logger, 'snapshot.refresh', status='unchanged',
+                      duration_ms=round((time.monotonic() - started) * 1000, 1))
+            return None
+        snapshot = self.store.swap(processed_df)
+        log_event(logger, 'snapshot.refresh', status='swapped', version=snapshot.version, rows=len(processed_df),
+                  duration_ms=round((time.monotonic() - started) * 1000, 1))
+        if self.on_swap is not None:
+            try:
+                self.on_swap(snapshot)
+            except Exception as e:
+                log_event(logger, 'snapshot.on_swap', logging.WARNING, exc_info=True, error_message=str(e))
+        return snapshot
+
+    def _run(self, run_immediately):
+        if run_immediately:
+            self.refresh_once()
+        while not self._stop_event.wait(self.interval_seconds):
+            self.refresh_once()
+
+    def start(self, run_immediately=False):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(run_immediately,),
+                                        name="data-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+# Naikkan setiap kali format file atau kolom hasil process_data() berubah
+SCHEMA_VERSION = 5
+
+CURRENT_POINTER = 'CURRENT'
+META_FILE = 'meta.json'
+# Status refresh terakhir milik leader, dibaca follower untuk status "memuat data"
+STATUS_FILE = 'STATUS.json'
+
+
+def source_fingerprint(*parts):
+    """Fingerprint sumber data (spreadsheet, worksheet, versi schema)"""
+    payload = json.dumps([SCHEMA_VERSION] + [str(p) for p in parts])
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _is_masked_dtype(dtype):
+    # Int*/UInt*/Float*/boolean nullable: array nilai + mask NA
+    return pd.api.types.is_extension_array_dtype(dtype) and issubclass(
+        dtype.construct_array_type(), (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray))
+
+
+def _encode_column(series):
+    """Ubah satu kolom menjadi (ndarray, mask atau None, metadata) yang bisa disimpan sebagai .npy"""
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+        return series.to_numpy(), None, {'kind': 'numeric', 'dtype': str(dtype)}
+    if isinstance(dtype, np.dtype) and dtype.kind == 'M':
+        return series.to_numpy().view('int64'), None, {'kind': 'datetime', 'dtype': str(dtype)}
+    if _is_masked_dtype(dtype):
+        values = series.array.to_numpy(dtype=dtype.numpy_dtype, na_value=dtype.numpy_dtype.type(0))
+        return values, series.isna().to_numpy(), {'kind': 'masked', 'dtype': str(dtype)}
+
+    # Kolom string/kategori disimpan sebagai codes + daftar nilai unik.
+    # Kolom string dibaca kembali sebagai Categorical supaya codes tetap
+    # memory-mapped (zero-copy) di semua worker; kategori diurutkan agar
+    # sort/groupby menghasilkan urutan yang sama dengan kolom string aslinya.
+    is_text = (isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_object_dtype(dtype)
+               or pd.api.types.is_string_dtype(dtype))
+    try:
+        codes, uniques = pd.factorize(series, sort=is_text, use_na_sentinel=True)
+    except TypeError:
+        # Nilai campuran (mis. str dan angka) tidak bisa diurutkan
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    meta = {
+        'kind': 'categorical' if is_text else 'factorized',
+        'dtype': str(dtype),
+        'values': np.asarray(uniques, dtype=object).tolist(),
+    }
+    return codes.astype(_codes_dtype(len(uniques))), None, meta
+
+
+def _codes_dtype(n_categories):
+    # Sama dengan dtype codes yang dipilih pandas, jadi from_codes tidak menyalin
+    for dtype in ('int8', 'int16', 'int32'):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return 'int64'
+
+
+def _decode_column(values, meta, mask=None):
+    kind = meta['kind']
+    if kind == 'numeric':
+        return values
+    if kind == 'datetime':
+        return values.view(meta['dtype'])
+    if kind == 'masked':
+        array_type = pd.api.types.pandas_dtype(meta['dtype']).construct_array_type()
+        return array_type(values, mask, copy=False)
+    if kind == 'categorical':
+        return pd.Categorical.from_codes(values, categories=meta['values'])
+    uniques = pd.array(meta['values'], dtype=pd.api.types.pandas_dtype(meta['dtype']))
+    return uniques.take(np.asarray(values), allow_fill=True)
+
+
+def save_snapshot(df, cache_dir, fingerprint, reader_state=None, version=0):
+    """Simpan DataFrame ke direktori baru lalu pindahkan pointer CURRENT secara atomic"""
+    os.makedirs(cache_dir, exist_ok=True)
+    name = f"snapshot-{time.time_ns()}"
+    tmp_path = os.path.join(cache_dir, f".tmp-{name}")
+    os.makedirs(tmp_path)
+
+    columns = []
+    for position in range(df.shape[1]):
+        values, mask, meta = _encode_column(df.iloc[:, position])
+        meta['name'] = df.columns[position]
+        meta['file'] = f"col_{position}.npy"
+        np.save(os.path.join(tmp_path, meta['file']), np.ascontiguousarray(values))
+        if mask is not None:
+            meta['mask_file'] = f"mask_{position}.npy"
+            np.save(os.path.join(tmp_path, meta['mask_file']), np.ascontiguousarray(mask))
+        columns.append(meta)
+    np.save(os.path.join(tmp_path, 'index.npy'), df.index.to_numpy(dtype='int64'))
+
+    meta = {
+        'schema_version': SCHEMA_VERSION,
+        'fingerprint': fingerprint,
+        'version': version,
+        'saved_at': time.time(),
+        'row_count': len(df),
+        'columns': columns,
+        'reader_state': reader_state,
+    }
+    with open(os.path.join(tmp_path, META_FILE), 'w') as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    os.rename(tmp_path, os.path.join(cache_dir, name))
+    pointer_tmp = os.path.join(cache_dir, f".{CURRENT_POINTER}.tmp")
+    with open(pointer_tmp, 'w') as f:
+        f.write(name)
+    os.replace(pointer_tmp, os.path.join(cache_dir, CURRENT_POINTER))
+
+    _remove_stale_snapshots(cache_dir, keep=name)
+    return name
+
+
+def _remove_stale_snapshots(cache_dir, keep):
+    # Snapshot sebelumnya disisakan untuk worker yang sedang membacanya; file
+    # yang masih di-mmap tetap valid setelah di-unlink (POSIX)
+    entries = sorted(entry for entry in os.listdir(cache_dir) if entry.startswith('snapshot-'))
+    for entry in entries[:-2]:
+        if entry != keep:
+            shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
+
+
+def read_current_name(cache_dir):
+    """Nama direktori snapshot yang ditunjuk pointer CURRENT, atau None"""
+    try:
+        with open(os.path.join(cache_dir, CURRENT_POINTER)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def write_status(cache_dir, status):
+    """Tulis status refresh (dict JSON) secara atomic di samping pointer CURRENT"""
+    os.makedirs(cache_dir, exist_ok=True)
+    status_tmp = os.path.join(cache_dir, f".{STATUS_FILE}.tmp")
+    with open(status_tmp, 'w') as f:
+        json.dump(status, f, ensure_ascii=False)
+    os.replace(status_tmp, os.path.join(cache_dir, STATUS_FILE))
+
+
+def read_status(cache_dir):
+    """Status refresh terakhir yang ditulis `write_status()`, atau None"""
+    try:
+        with open(os.path.join(cache_dir, STATUS_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_memory_mapped(array):
+    """True jika buffer array (atau array asalnya) adalah np.memmap"""
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+def column_buffers(series):
+    """Array numpy yang menyimpan data satu kolom (codes untuk categorical, nilai + mask untuk nullable)"""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return [series.array.codes]
+    if _is_masked_dtype(dtype):
+        return [series.array._data, series.array._mask]
+    if isinstance(dtype, np.dtype):
+        return [series.to_numpy()]
+    return []
+
+
+def load_snapshot(cache_dir, fingerprint, name=None):
+    """Load snapshot memory-mapped; kembalikan (DataFrame, meta) atau (None, None).
+
+    Kolom numerik, tanggal, categorical dan nullable tetap berupa view atas
+    file yang di-mmap sehingga halaman memorinya dibagi semua worker. Kolom
+    yang ternyata tersalin (mis. dtype 'factorized') dicatat di
+    `meta['copied_columns']`.
+    """
+    name = name or read_current_name(cache_dir)
+    if name is None:
+        return None, None
+    path = os.path.join(cache_dir, name)
+    try:
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+    meta['name'] = name
+
+    if meta.get('schema_version') != SCHEMA_VERSION or meta.get('fingerprint') != fingerprint:
+        return None, None
+
+    data = {}
+    for position, column in enumerate(meta['columns']):
+        values = np.load(os.path.join(path, column['file']), mmap_mode='r')
+        mask = np.load(os.path.join(path, column['mask_file']), mmap_mode='r') if 'mask_file' in column else None
+        data[position] = _decode_column(values, column, mask)
+    index = np.load(os.path.join(path, 'index.npy'), mmap_mode='r')
+
+    df = pd.DataFrame(data, index=pd.Index(index), copy=False)
+    df.columns = [column['name'] for column in meta['columns']]
+    meta['copied_columns'] = [
+        name for position, name in enumerate(df.columns)
+        if not all(is_memory_mapped(buffer) for buffer in column_buffers(df.iloc[:, position]) or [None])
+    ]
+    return df, meta
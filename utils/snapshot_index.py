@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Kolom yang punya bitmap per nilai: filter bar dan sumber cross-filter (lihat CROSS_FILTER_SOURCES di app.py)
+BITMAP_COLUMNS = ['STORE', 'SHIFT', 'NAMA KASIR', 'HARI']
+
+_ONE_DAY = np.timedelta64(1, 'D')
+
+
+@dataclass(frozen=True)
+class SnapshotFilter:
+    """Filter dashboard; hashable sehingga bisa menjadi bagian key render cache.
+
+    `start`/`end` adalah tanggal inklusif. `selections` berisi pasangan
+    (kolom, tuple nilai): nilai dalam satu pasangan digabung dengan OR,
+    antar pasangan dengan AND (mis. dropdown shift dan klik chart shift).
+    """
+    start: pd.Timestamp = None
+    end: pd.Timestamp = None
+    selections: tuple = ()
+
+    @classmethod
+    def from_inputs(cls, start=None, end=None, shifts=None, cashiers=None, cross_filter=None, stores=None):
+        """Bangun filter dari nilai komponen Dash (string tanggal, list dropdown, dict cross-filter)"""
+        selections = []
+        if stores:
+            selections.append(('STORE', tuple(sorted(stores))))
+        if shifts:
+            selections.append(('SHIFT', tuple(sorted(shifts))))
+        if cashiers:
+            selections.append(('NAMA KASIR', tuple(sorted(cashiers))))
+        for column, values in sorted((cross_filter or {}).items()):
+            if values:
+                selections.append((column, tuple(sorted(values))))
+        return cls(
+            start=pd.Timestamp(start).normalize() if start else None,
+            end=pd.Timestamp(end).normalize() if end else None,
+            selections=tuple(selections),
+        )
+
+    @property
+    def empty(self):
+        return self.start is None and self.end is None and not self.selections
+
+    def cube_mask(self, cube):
+        """Mask baris cube (tanggal x toko x shift x kasir) yang lolos filter"""
+        mask = np.ones(len(cube), dtype=bool)
+        if self.start is not None:
+            mask &= (cube['TANGGAL'] >= self.start).to_numpy()
+        if self.end is not None:
+            mask &= (cube['TANGGAL'] < self.end + pd.Timedelta(days=1)).to_numpy()
+        for column, values in self.selections:
+            mask &= cube[column].isin(values).to_numpy()
+        return mask
+
+
+def sort_by_date(df):
+    """Urutkan processed_df berdasarkan TANGGAL (NaT di akhir); tanpa copy jika sudah urut"""
+    if df.empty or 'TANGGAL' not in df.columns:
+        return df
+    dates = df['TANGGAL']
+    n_dated = int(dates.notna().sum())
+    if dates.iloc[:n_dated].notna().all() and dates.iloc[:n_dated].is_monotonic_increasing:
+        return df
+    return df.sort_values('TANGGAL', kind='stable', na_position='last')
+
+
+class SnapshotIndex:
+    """Index baca-saja untuk processed_df yang sudah diurutkan dengan `sort_by_date()`.
+
+    Rentang tanggal menjadi slice lewat binary search pada kolom TANGGAL.
+    Setiap nilai STORE, SHIFT, NAMA KASIR dan HARI punya bitmap baris
+    (`np.packbits`) yang dihitung sekali per snapshot, sehingga kombinasi
+    filter hanya berupa OR/AND bitwise atas byte dalam rentang tanggal.
+    """
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        if 'TANGGAL' in df.columns:
+            dates = df['TANGGAL'].to_numpy()
+            # NaT ada di akhir; hanya prefix bertanggal yang dipakai binary search
+            self.dates = dates[:int(df['TANGGAL'].notna().sum())]
+        else:
+            self.dates = None
+        self.bitmaps = {col: self._build_bitmaps(df[col]) for col in BITMAP_COLUMNS if col in df.columns}
+
+    @staticmethod
+    def _build_bitmaps(series):
+        codes, uniques = pd.factorize(series)
+        bitmaps = {}
+        for code, value in enumerate(uniques):
+            bitmaps[value] = np.packbits(codes == code)
+        return bitmaps
+
+    def values(self, column):
+        """Nilai yang tersedia untuk filter (terurut)"""
+        return sorted(self.bitmaps.get(column, {}))
+
+    def date_bounds(self, start=None, end=None):
+        """Posisi [lo, hi) untuk rentang tanggal inklusif"""
+        if self.dates is None or (start is None and end is None):
+            return 0, self.n_rows
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(start), side='left'))
+        hi = len(self.dates) if end is None else int(
+            np.searchsorted(self.dates, np.datetime64(end) + _ONE_DAY, side='left'))
+        return lo, max(lo, hi)
+
+    def positions(self, snapshot_filter):
+        """Posisi baris yang lolos filter, atau slice jika hanya rentang tanggal"""
+        lo, hi = self.date_bounds(snapshot_filter.start, snapshot_filter.end)
+        if not snapshot_filter.selections:
+            return slice(lo, hi)
+
+        # Hanya byte yang mencakup rentang tanggal yang ikut dioperasikan
+        first_byte, last_byte = lo // 8, (hi + 7) // 8
+        combined = None
+        for column, values in snapshot_filter.selections:
+            bitmaps = self.bitmaps.get(column, {})
+            selected = np.zeros(last_byte - first_byte, dtype='uint8')
+            for value in values:
+                if value in bitmaps:
+                    selected |= bitmaps[value][first_byte:last_byte]
+            combined = selected if combined is None else combined & selected
+
+        offset = first_byte * 8
+        positions = np.flatnonzero(np.unpackbits(combined)) + offset
+        return positions[np.searchsorted(positions, lo):np.searchsorted(positions, hi)]
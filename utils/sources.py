@@ -0,0 +1,69 @@
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from utils.pipeline_log import get_logger, log_event
+
+DEFAULT_STORE = '2GC6 BAROS PANDEGLANG'
+
+logger = get_logger('pipeline')
+
+
+@dataclass(frozen=True)
+class StoreSource:
+    """Satu toko beserta spreadsheet dan worksheet sumber datanya"""
+    store: str
+    spreadsheet_id: str
+    worksheet_name: str = 'Sheet1'
+
+
+def parse_store_sources(store_sources_json=None, spreadsheet_id=None, worksheet_name='Sheet1',
+                        default_store=DEFAULT_STORE):
+    """Baca daftar sumber dari JSON `STORE_SOURCES`.
+
+    Format: `[{"store": "...", "spreadsheet_id": "...", "worksheet": "..."}]`.
+    Tanpa STORE_SOURCES, SPREADSHEET_ID/WORKSHEET_NAME dipakai sebagai satu toko.
+    """
+    if not store_sources_json:
+        if not spreadsheet_id:
+            return []
+        return [StoreSource(default_store, spreadsheet_id, worksheet_name or 'Sheet1')]
+
+    sources = []
+    for entry in json.loads(store_sources_json):
+        sources.append(StoreSource(
+            store=entry['store'],
+            spreadsheet_id=entry['spreadsheet_id'],
+            worksheet_name=entry.get('worksheet') or 'Sheet1',
+        ))
+    stores = [source.store for source in sources]
+    if len(set(stores)) != len(stores):
+        raise ValueError(f"Nama toko di STORE_SOURCES harus unik: {stores}")
+    return sources
+
+
+def fetch_concurrently(sources, fetch, max_workers=4):
+    """Jalankan `fetch(source)` untuk semua toko lewat thread pool terbatas.
+
+    Kembalikan dict store -> hasil. Toko yang gagal dicatat dan hasilnya None
+    agar toko lain tetap bisa dipakai.
+    """
+    if not sources:
+        return {}
+    started = time.monotonic()
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sources))),
+                            thread_name_prefix='store-fetch') as pool:
+        futures = {source.store: pool.submit(fetch, source) for source in sources}
+        for store, future in futures.items():
+            try:
+                results[store] = future.result()
+            except Exception as e:
+                log_event(logger, 'ingest.store', logging.ERROR, exc_info=True, store=store, error_message=str(e))
+                results[store] = None
+    log_event(logger, 'ingest.fetch_stores', stores=len(sources),
+              failed=[store for store, result in results.items() if result is None],
+              duration_ms=round((time.monotonic() - started) * 1000, 1))
+    return results